@@ -1,11 +1,248 @@
-from flask import Flask, request, render_template_string
+import gzip
+import hashlib
+import json
+import os
+import zlib
+
+from flask import Flask, Response, abort, jsonify, request, stream_with_context, url_for
+from werkzeug.datastructures import MultiDict
 from datetime import date
-from padel_logic import search_all
+from padel_breaker import breaker_states, open_circuits
+from padel_http import hedge_stats, limiter_stats
+from padel_logic import FREE_COURTS_DEFAULT, iter_search, search_all, search_free_courts, search_param_errors, search_range
+from padel_index import MATCH_EXACT, MATCH_WINDOW
+from padel_metrics import RENDER_SECONDS, render_metrics
+from padel_prefetch import start_prefetcher
+from padel_profile import PROFILE_MODES, PROFILE_QUERY_PARAM, PROFILE_TOKEN_HEADER, profile_allowed, profile_request
+from padel_trace import TRACE_HEADER, TRACE_QUERY_PARAM, span, start_trace
+
+try:
+    import brotli
+except ImportError:  # optionnel : gzip seulement si absent
+    brotli = None
 
 app = Flask(__name__)
 
+# Assets : cache d'un an seulement sur les URL versionnées par empreinte
+# (?v=..., voir _compress_response) ; sans version, revalidation
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Compression des réponses HTML / JSON au-delà de cette taille (octets).
+# Les fichiers statiques (direct_passthrough) ne sont pas compressés ici.
+COMPRESS_MIN_SIZE = 500
+COMPRESS_MIMETYPES = {"text/html", "application/json"}
+
+# Recherche sur une journée : envoie chaque club dès qu'il répond
+STREAM_RESULTS = True
+
+# Préchargement en arrière-plan des prochains jours (PADEL_PREFETCH=1)
+PREFETCH_ENABLED = os.environ.get("PADEL_PREFETCH", "0") == "1"
+
+WEEKDAY_CHOICES = [
+    (0, "Lun"), (1, "Mar"), (2, "Mer"), (3, "Jeu"),
+    (4, "Ven"), (5, "Sam"), (6, "Dim"),
+]
+
+
+RESULT_MACROS = """
+{% macro stale_badge(club) %}{% if club.stale %}<span class="stale-badge" title="Donnée en cache, rafraîchissement en cours">il y a {{ (club.age_s // 60) or 1 }} min</span>{% endif %}{% endmacro %}
+
+{% macro doinsport_club(club) %}
+<div style="margin-bottom:10px;">
+    <strong style="font-size:0.85rem;">{{ club.club_name }}</strong> {{ stale_badge(club) }}
+    {% if club.slots %}
+        <table>
+            <thead>
+                <tr>
+                    <th>Heure</th>
+                    <th>Durée</th>
+                    <th>Terrain</th>
+                    <th>Prix / joueur</th>
+                    <th>Nb joueurs</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for s in club.slots %}
+                <tr>
+                    <td>{{ s.startAt }}</td>
+                    <td>{{ s.duration_min }} min</td>
+                    <td>{{ s.terrain }}</td>
+                    <td>
+                        {% if s.price_per_participant %}
+                            {{ "%.2f"|format(s.price_per_participant / 100) }} €
+                        {% else %}
+                            -
+                        {% endif %}
+                    </td>
+                    <td>{{ s.participant_count or "-" }}</td>
+                </tr>
+                {% endfor %}
+            </tbody>
+        </table>
+    {% else %}
+        <p class="no-slots">Aucun créneau correspondant pour ce club.</p>
+    {% endif %}
+</div>
+{% endmacro %}
+
+{% macro rpadel_block(rpadel) %}
+<div class="club-block">
+    <div class="club-header">
+        <h3>{{ rpadel.club_name }} {{ stale_badge(rpadel) }}</h3>
+        <span>mymobileapp.fr</span>
+    </div>
+
+    {% if rpadel.slots %}
+        <table>
+            <thead>
+                <tr>
+                    <th>Heure</th>
+                    <th>Durée</th>
+                    <th>Détail</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for s in rpadel.slots %}
+                <tr>
+                    <td>{{ s.startAt }}</td>
+                    <td>{{ s.duration_min }} min</td>
+                    <td>{{ s.raw_text }}</td>
+                </tr>
+                {% endfor %}
+            </tbody>
+        </table>
+    {% else %}
+        <p class="no-slots">Aucun créneau correspondant.</p>
+    {% endif %}
+</div>
+{% endmacro %}
+
+{% macro padelshot_block(padelshot) %}
+<div class="club-block">
+    <div class="club-header">
+        <h3>{{ padelshot.club_name }} {{ stale_badge(padelshot) }}</h3>
+        <span>Matchpoint</span>
+    </div>
+
+    {% if padelshot.slots %}
+        <table>
+            <thead>
+                <tr>
+                    <th>Heure</th>
+                    <th>Durée</th>
+                    <th>Terrain</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for s in padelshot.slots %}
+                <tr>
+                    <td>{{ s.startAt }}</td>
+                    <td>{{ s.duration_min }} min</td>
+                    <td>{{ s.terrain }}</td>
+                </tr>
+                {% endfor %}
+            </tbody>
+        </table>
+    {% else %}
+        <p class="no-slots">Aucun créneau correspondant.</p>
+    {% endif %}
+</div>
+{% endmacro %}
+
+{% macro errors_block(errors, circuits=None) %}
+<div class="errors">
+    <h3>Erreurs rencontrées</h3>
+    <ul>
+        {% for err in errors %}
+            <li>{{ err }}</li>
+        {% endfor %}
+        {% for c in circuits or [] %}
+            <li class="circuit">
+                <span class="circuit-badge">{{ "en test" if c.state == "half_open" else "coupé" }}</span>
+                {{ c.name }} : fournisseur court-circuité après {{ c.failures }} échecs
+                {%- if c.state == "open" %}, nouvel essai dans {{ c.retry_in_s }} s{% endif %}
+            </li>
+        {% endfor %}
+    </ul>
+</div>
+{% endmacro %}
+
+{% macro trace_waterfall(trace) %}
+<details class="trace" open>
+    <summary>Trace {{ trace.trace_id }} — {{ trace.total_ms|round|int }} ms</summary>
+    <div class="trace-rows">
+        {% for s in trace.spans %}
+        {% set left = (s.start_ms / trace.total_ms * 100) if trace.total_ms else 0 %}
+        {% set width = (s.duration_ms / trace.total_ms * 100) if trace.total_ms else 0 %}
+        <div class="trace-row{% if s.attrs.error %} trace-error{% endif %}" title="{{ s.attrs|tojson }}">
+            <span class="trace-name" style="padding-left: {{ s.depth * 10 }}px;">{{ s.name }}</span>
+            <span class="trace-track">
+                <span class="trace-bar" style="left: {{ '%.2f'|format(left) }}%; width: {{ '%.2f'|format([width, 0.3]|max) }}%;"></span>
+            </span>
+            <span class="trace-ms">{{ s.duration_ms|round(1) }} ms</span>
+        </div>
+        {% endfor %}
+    </div>
+</details>
+{% endmacro %}
+
+{% macro day_results(results) %}
+<!-- Doinsport -->
+<div class="club-block">
+    <div class="club-header">
+        <h3>Doinsport (Stadium / Pommeraie / Area)</h3>
+        <span>3 complexes</span>
+    </div>
+
+    {% for club in results.doinsport %}
+        {{ doinsport_club(club) }}
+    {% endfor %}
+</div>
+
+<!-- R Padel Arena -->
+{% if results.rpadel %}
+{{ rpadel_block(results.rpadel) }}
+{% endif %}
+
+<!-- Padelshot -->
+{% if results.padelshot %}
+{{ padelshot_block(results.padelshot) }}
+{% endif %}
+
+{% if results.errors or results.circuits %}
+{{ errors_block(results.errors, results.circuits) }}
+{% endif %}
+{% endmacro %}
+"""
+
+# Bloc envoyé au navigateur dès qu'un club répond (affichage progressif)
+STREAM_ITEM_TEMPLATE = RESULT_MACROS + """
+<div class="stream-item" style="order: {{ order }};">
+{% if circuits %}
+    {{ errors_block([], circuits) }}
+{% elif error %}
+    {{ errors_block([error]) }}
+{% elif key == "doinsport" %}
+    <div class="club-block">
+        <div class="club-header">
+            <h3>Doinsport</h3>
+            <span>{{ result.club_name }}</span>
+        </div>
+        {{ doinsport_club(result) }}
+    </div>
+{% elif key == "rpadel" %}
+    {{ rpadel_block(result) }}
+{% else %}
+    {{ padelshot_block(result) }}
+{% endif %}
+</div>
+"""
+
+# Emplacement où les blocs streamés sont insérés dans la page
+STREAM_MARKER = "<!--STREAM-->"
 
-HTML_TEMPLATE = """
+
+HTML_TEMPLATE = RESULT_MACROS + """
 <!doctype html>
 <html lang="fr">
 <head>
@@ -13,408 +250,7 @@ HTML_TEMPLATE = """
     <title>Padel Finder – Caen</title>
     <meta name="viewport" content="width=device-width, initial-scale=1">
 
-    <style>
-        :root {
-            --bg-body: #020617;
-            --bg-panel: #020617;
-            --bg-card: rgba(15,23,42,0.9);
-            --accent: #22c55e;
-            --accent-soft: rgba(34,197,94,0.18);
-            --accent-strong: #16a34a;
-            --text-main: #e5e7eb;
-            --text-muted: #9ca3af;
-            --border-subtle: rgba(148,163,184,0.4);
-            --error: #f97373;
-            --shadow-soft: 0 18px 45px rgba(15,23,42,0.9);
-            --radius-lg: 18px;
-            --radius-xl: 22px;
-        }
-
-        * {
-            box-sizing: border-box;
-        }
-
-        body {
-            margin: 0;
-            min-height: 100vh;
-            font-family: system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
-            background: radial-gradient(circle at top, #0f172a 0, #020617 55%, #000 100%);
-            color: var(--text-main);
-            display: flex;
-            justify-content: center;
-            padding: 20px 12px;
-        }
-
-        .app-shell {
-            width: 100%;
-            max-width: 1120px;
-            background: linear-gradient(135deg, rgba(15,23,42,0.98), rgba(15,23,42,0.9));
-            border-radius: 28px;
-            border: 1px solid rgba(148,163,184,0.5);
-            box-shadow: var(--shadow-soft);
-            padding: 22px 22px 26px;
-            backdrop-filter: blur(18px);
-        }
-
-        header {
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 18px;
-        }
-
-        .title-block h1 {
-            font-size: 1.4rem;
-            margin: 0;
-            letter-spacing: 0.03em;
-        }
-
-        .title-block p {
-            margin: 6px 0 0;
-            font-size: 0.86rem;
-            color: var(--text-muted);
-        }
-
-        .header-right {
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }
-
-        .pill-env {
-            font-size: 0.76rem;
-            padding: 6px 11px;
-            border-radius: 999px;
-            border: 1px solid rgba(148,163,184,0.5);
-            background: radial-gradient(circle at top left, rgba(34,197,94,0.18), rgba(15,23,42,0.85));
-            display: inline-flex;
-            align-items: center;
-            gap: 6px;
-        }
-
-        .pill-env-dot {
-            width: 7px;
-            height: 7px;
-            border-radius: 999px;
-            background:#22c55e;
-        }
-
-        .bmc-btn {
-            font-size: 0.76rem;
-            padding: 7px 13px;
-            border-radius: 999px;
-            border: 1px solid rgba(234,179,8,0.9);
-            background: radial-gradient(circle at top left, rgba(234,179,8,0.18), rgba(30,64,175,0.95));
-            color: #fefce8;
-            text-decoration: none;
-            display: inline-flex;
-            align-items: center;
-            gap: 6px;
-            box-shadow: 0 12px 30px rgba(15,23,42,0.8);
-            transition: transform 0.08s ease, box-shadow 0.08s ease, filter 0.08s ease;
-        }
-
-        .bmc-btn span.icon {
-            font-size: 0.9rem;
-        }
-
-        .bmc-btn:hover {
-            filter: brightness(1.05);
-            box-shadow: 0 15px 38px rgba(15,23,42,0.9);
-            transform: translateY(-1px);
-        }
-
-        .bmc-btn:active {
-            transform: translateY(0);
-            box-shadow: 0 10px 26px rgba(15,23,42,0.9);
-        }
-
-        main {
-            display: grid;
-            grid-template-columns: minmax(0, 320px) minmax(0, 1.6fr);
-            gap: 18px;
-        }
-
-        @media (max-width: 880px) {
-            main {
-                grid-template-columns: minmax(0, 1fr);
-            }
-
-            .header-right {
-                width: 100%;
-                justify-content: flex-start;
-            }
-        }
-
-        .card {
-            background: var(--bg-card);
-            border-radius: var(--radius-xl);
-            border: 1px solid rgba(148,163,184,0.35);
-            padding: 16px 16px 18px;
-        }
-
-        .card-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: baseline;
-            margin-bottom: 10px;
-        }
-
-        .card-header h2 {
-            font-size: 1.02rem;
-            margin: 0;
-        }
-
-        .card-header span {
-            font-size: 0.8rem;
-            color: var(--text-muted);
-        }
-
-        /* Formulaire */
-        form {
-            display: flex;
-            flex-direction: column;
-            gap: 12px;
-            font-size: 0.87rem;
-        }
-
-        .field-group {
-            display: grid;
-            grid-template-columns: repeat(2, minmax(0, 1fr));
-            gap: 10px;
-        }
-
-        .field {
-            display: flex;
-            flex-direction: column;
-            gap: 5px;
-        }
-
-        label span {
-            color: var(--text-muted);
-            font-size: 0.8rem;
-        }
-
-        input[type="date"],
-        input[type="time"],
-        .duration-pills label {
-            font: inherit;
-        }
-
-        input[type="date"],
-        input[type="time"] {
-            padding: 7px 9px;
-            border-radius: 11px;
-            border: 1px solid rgba(148,163,184,0.6);
-            background: rgba(15,23,42,0.96);
-            color: var(--text-main);
-            outline: none;
-        }
-
-        input[type="date"]:focus,
-        input[type="time"]:focus {
-            border-color: var(--accent);
-            box-shadow: 0 0 0 1px rgba(34,197,94,0.65);
-        }
-
-        .duration-pills {
-            display: flex;
-            flex-wrap: wrap;
-            gap: 7px;
-            margin-top: 3px;
-        }
-
-        .duration-pills label {
-            padding: 5px 10px;
-            border-radius: 999px;
-            border: 1px solid rgba(148,163,184,0.6);
-            color: var(--text-muted);
-            display: inline-flex;
-            align-items: center;
-            gap: 6px;
-            cursor: pointer;
-            font-size: 0.8rem;
-            background: rgba(15,23,42,0.9);
-        }
-
-        .duration-pills input {
-            display: none;
-        }
-
-        .duration-pills input:checked + span {
-            color: var(--accent);
-        }
-
-        .duration-pills input:checked ~ .pill-bg {
-            background: var(--accent-soft);
-            border-color: var(--accent);
-        }
-
-        .pill-bg {
-            position: absolute;
-            inset: 0;
-            border-radius: inherit;
-            border: 1px solid transparent;
-            z-index: -1;
-        }
-
-        .duration-pill-wrapper {
-            position: relative;
-        }
-
-        button[type="submit"] {
-            margin-top: 4px;
-            padding: 9px 13px;
-            border-radius: 999px;
-            border: none;
-            font-size: 0.86rem;
-            letter-spacing: 0.03em;
-            text-transform: uppercase;
-            cursor: pointer;
-            background: linear-gradient(135deg, var(--accent), var(--accent-strong));
-            color: #022c22;
-            font-weight: 600;
-            box-shadow: 0 10px 30px rgba(16,185,129,0.35);
-        }
-
-        button[type="submit"]:hover {
-            filter: brightness(1.05);
-        }
-
-        button[type="submit"]:active {
-            transform: translateY(1px);
-            box-shadow: 0 6px 18px rgba(16,185,129,0.45);
-        }
-
-        /* Résultats */
-        .results-meta {
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-            align-items: center;
-            font-size: 0.8rem;
-            margin-bottom: 10px;
-        }
-
-        .chip {
-            border-radius: 999px;
-            border: 1px solid rgba(148,163,184,0.6);
-            padding: 3px 9px;
-            display: inline-flex;
-            align-items: center;
-            gap: 6px;
-        }
-
-        .chip strong {
-            font-weight: 500;
-        }
-
-        .chip-accent {
-            border-color: rgba(34,197,94,0.7);
-            background: rgba(22,163,74,0.05);
-        }
-
-        .chip-dot {
-            width: 8px;
-            height: 8px;
-            border-radius: 999px;
-            background: var(--accent);
-        }
-
-        .club-block {
-            margin-top: 14px;
-            padding-top: 10px;
-            border-top: 1px dashed rgba(148,163,184,0.45);
-        }
-
-        .club-block:first-of-type {
-            border-top: none;
-            padding-top: 2px;
-        }
-
-        .club-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 6px;
-        }
-
-        .club-header h3 {
-            margin: 0;
-            font-size: 0.95rem;
-        }
-
-        .club-header span {
-            font-size: 0.76rem;
-            color: var(--text-muted);
-        }
-
-        table {
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 5px;
-            font-size: 0.8rem;
-        }
-
-        thead {
-            background: rgba(15,23,42,0.96);
-        }
-
-        th, td {
-            padding: 6px 8px;
-            border-bottom: 1px solid rgba(15,23,42,0.9);
-        }
-
-        th {
-            text-align: left;
-            color: var(--text-muted);
-            font-weight: 500;
-            font-size: 0.78rem;
-        }
-
-        tbody tr:nth-child(2n) {
-            background: rgba(15,23,42,0.7);
-        }
-
-        .no-slots {
-            font-size: 0.8rem;
-            color: var(--text-muted);
-            font-style: italic;
-            margin: 3px 0 8px;
-        }
-
-        .errors {
-            margin-top: 12px;
-            padding: 8px 10px;
-            border-radius: 12px;
-            border: 1px solid rgba(248,113,113,0.7);
-            background: rgba(127,29,29,0.24);
-            font-size: 0.8rem;
-        }
-
-        .errors h3 {
-            margin: 0 0 4px;
-            font-size: 0.86rem;
-            color: var(--error);
-        }
-
-        .errors ul {
-            margin: 0;
-            padding-left: 18px;
-        }
-
-        .errors li {
-            margin: 2px 0;
-        }
-
-        .hint {
-            margin-top: 6px;
-            font-size: 0.76rem;
-            color: var(--text-muted);
-        }
-    </style>
+    <link rel="stylesheet" href="{{ css_url }}">
 </head>
 <body>
     <div class="app-shell">
@@ -451,6 +287,13 @@ HTML_TEMPLATE = """
                         </label>
                     </div>
 
+                    <div class="field">
+                        <label>
+                            <span>Jusqu'au (optionnel, recherche multi-jours)</span>
+                            <input type="date" name="date_end" value="{{ form_values.date_end }}">
+                        </label>
+                    </div>
+
                     <div class="field-group">
                         <div class="field">
                             <label>
@@ -466,6 +309,17 @@ HTML_TEMPLATE = """
                         </div>
                     </div>
 
+                    <div class="field">
+                        <div class="duration-pills">
+                            <label class="duration-pill-wrapper">
+                                <input type="checkbox" name="mode" value="window"
+                                    {% if form_values.mode == "window" %}checked{% endif %}>
+                                <span>Début n'importe quand dans la plage</span>
+                                <span class="pill-bg"></span>
+                            </label>
+                        </div>
+                    </div>
+
                     <div class="field">
                         <span>Durées souhaitées</span>
                         <div class="duration-pills">
@@ -490,6 +344,20 @@ HTML_TEMPLATE = """
                         </div>
                     </div>
 
+                    <div class="field">
+                        <span>Jours de la semaine (optionnel)</span>
+                        <div class="duration-pills">
+                            {% for wd_value, wd_label in weekday_choices %}
+                            <label class="duration-pill-wrapper">
+                                <input type="checkbox" name="weekdays" value="{{ wd_value }}"
+                                    {% if wd_value in form_values.weekdays %}checked{% endif %}>
+                                <span>{{ wd_label }}</span>
+                                <span class="pill-bg"></span>
+                            </label>
+                            {% endfor %}
+                        </div>
+                    </div>
+
                     <button type="submit">Lancer la recherche</button>
                 </form>
             </section>
@@ -507,11 +375,11 @@ HTML_TEMPLATE = """
                     </span>
                 </div>
 
-                {% if results %}
+                {% if results and results.days is defined %}
                 <div class="results-meta">
                     <div class="chip chip-accent">
                         <span class="chip-dot"></span>
-                        <span><strong>Date :</strong> {{ results.date_iso }}</span>
+                        <span><strong>Du</strong> {{ results.start_iso }} <strong>au</strong> {{ results.end_iso }}</span>
                     </div>
                     <div class="chip">
                         <span><strong>Plage :</strong> {{ results.window_from }} → {{ results.window_to }}</span>
@@ -519,131 +387,62 @@ HTML_TEMPLATE = """
                     <div class="chip">
                         <span><strong>Durées :</strong> {{ results.durations|join(", ") }} min</span>
                     </div>
-                </div>
-
-                <!-- Doinsport -->
-                <div class="club-block">
-                    <div class="club-header">
-                        <h3>Doinsport (Stadium / Pommeraie / Area)</h3>
-                        <span>3 complexes</span>
+                    {% if results.mode == "window" %}
+                    <div class="chip">
+                        <span>Début libre dans la plage</span>
                     </div>
-
-                    {% for club in results.doinsport %}
-                        <div style="margin-bottom:10px;">
-                            <strong style="font-size:0.85rem;">{{ club.club_name }}</strong>
-                            {% if club.slots %}
-                                <table>
-                                    <thead>
-                                        <tr>
-                                            <th>Heure</th>
-                                            <th>Durée</th>
-                                            <th>Terrain</th>
-                                            <th>Prix / joueur</th>
-                                            <th>Nb joueurs</th>
-                                        </tr>
-                                    </thead>
-                                    <tbody>
-                                        {% for s in club.slots %}
-                                        <tr>
-                                            <td>{{ s.startAt }}</td>
-                                            <td>{{ s.duration_min }} min</td>
-                                            <td>{{ s.terrain }}</td>
-                                            <td>
-                                                {% if s.price_per_participant %}
-                                                    {{ "%.2f"|format(s.price_per_participant / 100) }} €
-                                                {% else %}
-                                                    -
-                                                {% endif %}
-                                            </td>
-                                            <td>{{ s.participant_count or "-" }}</td>
-                                        </tr>
-                                        {% endfor %}
-                                    </tbody>
-                                </table>
-                            {% else %}
-                                <p class="no-slots">Aucun créneau correspondant pour ce club.</p>
-                            {% endif %}
-                        </div>
-                    {% endfor %}
+                    {% endif %}
                 </div>
 
-                <!-- R Padel Arena -->
-                {% if results.rpadel %}
-                <div class="club-block">
-                    <div class="club-header">
-                        <h3>{{ results.rpadel.club_name }}</h3>
-                        <span>mymobileapp.fr</span>
-                    </div>
-
-                    {% if results.rpadel.slots %}
-                        <table>
-                            <thead>
-                                <tr>
-                                    <th>Heure</th>
-                                    <th>Durée</th>
-                                    <th>Détail</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                {% for s in results.rpadel.slots %}
-                                <tr>
-                                    <td>{{ s.startAt }}</td>
-                                    <td>{{ s.duration_min }} min</td>
-                                    <td>{{ s.raw_text }}</td>
-                                </tr>
-                                {% endfor %}
-                            </tbody>
-                        </table>
-                    {% else %}
-                        <p class="no-slots">Aucun créneau correspondant.</p>
-                    {% endif %}
+                {% for day in results.days %}
+                <div class="day-block">
+                    <h3 class="day-title">{{ day.date_iso }}</h3>
+                    {{ day_results(day) }}
                 </div>
+                {% else %}
+                <p class="no-slots">Aucun jour ne correspond à cette plage de dates.</p>
+                {% endfor %}
+
+                {% if results.circuits %}
+                {{ errors_block([], results.circuits) }}
                 {% endif %}
 
-                <!-- Padelshot -->
-                {% if results.padelshot %}
-                <div class="club-block">
-                    <div class="club-header">
-                        <h3>{{ results.padelshot.club_name }}</h3>
-                        <span>Matchpoint</span>
+                {% elif results %}
+                <div class="results-meta">
+                    <div class="chip chip-accent">
+                        <span class="chip-dot"></span>
+                        <span><strong>Date :</strong> {{ results.date_iso }}</span>
+                    </div>
+                    <div class="chip">
+                        <span><strong>Plage :</strong> {{ results.window_from }} → {{ results.window_to }}</span>
+                    </div>
+                    <div class="chip">
+                        <span><strong>Durées :</strong> {{ results.durations|join(", ") }} min</span>
+                    </div>
+                    {% if results.mode == "window" %}
+                    <div class="chip">
+                        <span>Début libre dans la plage</span>
                     </div>
-
-                    {% if results.padelshot.slots %}
-                        <table>
-                            <thead>
-                                <tr>
-                                    <th>Heure</th>
-                                    <th>Durée</th>
-                                    <th>Terrain</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                {% for s in results.padelshot.slots %}
-                                <tr>
-                                    <td>{{ s.startAt }}</td>
-                                    <td>{{ s.duration_min }} min</td>
-                                    <td>{{ s.terrain }}</td>
-                                </tr>
-                                {% endfor %}
-                            </tbody>
-                        </table>
-                    {% else %}
-                        <p class="no-slots">Aucun créneau correspondant.</p>
                     {% endif %}
                 </div>
-                {% endif %}
 
-                {% if results.errors %}
-                <div class="errors">
-                    <h3>Erreurs rencontrées</h3>
-                    <ul>
-                        {% for err in results.errors %}
-                            <li>{{ err }}</li>
-                        {% endfor %}
-                    </ul>
+                {% if streaming %}
+                <div class="stream-results">
+                    <p id="stream-pending" class="no-slots" style="order: 9999;">Recherche en cours…</p>
+                    <!--STREAM-->
                 </div>
+                {% else %}
+                {{ day_results(results) }}
+                {% endif %}
+
                 {% endif %}
 
+                {% if form_errors %}
+                {{ errors_block(form_errors) }}
+                {% endif %}
+
+                {% if trace %}
+                {{ trace_waterfall(trace) }}
                 {% endif %}
             </section>
         </main>
@@ -653,57 +452,446 @@ HTML_TEMPLATE = """
 """
 
 
+# Templates compilés une seule fois au démarrage
+_page_template = app.jinja_env.from_string(HTML_TEMPLATE)
+_stream_item_template = app.jinja_env.from_string(STREAM_ITEM_TEMPLATE)
+
+
+def _file_fingerprint(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+CSS_VERSION = _file_fingerprint(os.path.join(app.static_folder, "app.css"))
+
+
+def _render_page(**context):
+    """Rend la page principale avec le template précompilé."""
+    css_url = url_for("static", filename="app.css", v=CSS_VERSION)
+    with RENDER_SECONDS.time("page"):
+        return _page_template.render(css_url=css_url, **context)
+
+
+DEFAULT_FROM = "18:00"
+DEFAULT_TO = "19:30"
+DEFAULT_DURATIONS = [90]
+
+
+def _read_search_params(values):
+    """
+    Lit les paramètres de recherche depuis request.form ou request.args.
+    `durations` et `weekdays` peuvent être répétés ou séparés par des virgules.
+    Renvoie (valeurs, erreurs) : erreurs = dates / heures invalides, à
+    refuser avant toute recherche.
+    """
+    date_str = values.get("date") or date.today().isoformat()
+    from_time = values.get("from_time") or DEFAULT_FROM
+    to_time = values.get("to_time") or DEFAULT_TO
+
+    date_end = values.get("date_end") or ""
+
+    durations_str_list = _split_list(values.getlist("durations"))
+    if durations_str_list:
+        try:
+            durations = [int(d) for d in durations_str_list]
+        except ValueError:
+            durations = DEFAULT_DURATIONS
+    else:
+        durations = DEFAULT_DURATIONS
+
+    try:
+        weekdays = [int(w) for w in _split_list(values.getlist("weekdays"))]
+    except ValueError:
+        weekdays = []
+
+    mode = MATCH_WINDOW if values.get("mode") == MATCH_WINDOW else MATCH_EXACT
+
+    form_values = {
+        "date": date_str,
+        "date_end": date_end,
+        "from_time": from_time,
+        "to_time": to_time,
+        "durations": durations,
+        "weekdays": weekdays,
+        "mode": mode,
+    }
+    return form_values, search_param_errors(date_str, from_time, to_time, date_end)
+
+
+def _split_list(raw_values):
+    return [v.strip() for raw in raw_values for v in raw.split(",") if v.strip()]
+
+
+def _run_search(form_values):
+    """search_range si date de fin ou jours de semaine, sinon search_all."""
+    if form_values["date_end"] or form_values["weekdays"]:
+        return search_range(
+            form_values["date"],
+            form_values["date_end"],
+            form_values["from_time"],
+            form_values["to_time"],
+            form_values["durations"],
+            form_values["weekdays"],
+            form_values["mode"],
+        )
+    return search_all(
+        form_values["date"],
+        form_values["from_time"],
+        form_values["to_time"],
+        form_values["durations"],
+        form_values["mode"],
+    )
+
+
+@app.before_request
+def _ensure_prefetcher():
+    # démarré à la première requête de chaque worker (les threads ne
+    # survivent pas au fork de gunicorn) ; no-op si déjà lancé
+    if PREFETCH_ENABLED:
+        start_prefetcher()
+
+
+def _trace_requested():
+    """Trace demandée par ?trace=1 ou l'en-tête X-Padel-Trace: 1."""
+    return request.args.get(TRACE_QUERY_PARAM) == "1" or request.headers.get(TRACE_HEADER) == "1"
+
+
+def _profile_mode():
+    """
+    Mode de profilage demandé (?profile=cprofile|sample) ou None.
+    Réservé aux admins : 403 sans jeton valide dans X-Padel-Admin-Token.
+    """
+    mode = request.args.get(PROFILE_QUERY_PARAM)
+    if not mode:
+        return None
+    if not profile_allowed(request.headers.get(PROFILE_TOKEN_HEADER)):
+        abort(403)
+    return mode if mode in PROFILE_MODES else PROFILE_MODES[0]
+
+
 @app.route("/", methods=["GET", "POST"])
 def index():
-    # Valeurs par défaut
-    default_date = date.today().isoformat()
-    default_from = "18:00"
-    default_to = "19:30"
-    default_durations = [90]
-
     if request.method == "POST":
-        date_str = request.form.get("date") or default_date
-        from_time = request.form.get("from_time") or default_from
-        to_time = request.form.get("to_time") or default_to
-
-        durations_str_list = request.form.getlist("durations")
-        if durations_str_list:
-            try:
-                durations = [int(d) for d in durations_str_list]
-            except ValueError:
-                durations = default_durations
-        else:
-            durations = default_durations
-
-        results = search_all(date_str, from_time, to_time, durations)
-
-        form_values = {
-            "date": date_str,
-            "from_time": from_time,
-            "to_time": to_time,
-            "durations": durations,
-        }
-
-        return render_template_string(
-            HTML_TEMPLATE,
+        form_values, form_errors = _read_search_params(request.form)
+        if form_errors:
+            page = _render_page(
+                form_values=form_values,
+                weekday_choices=WEEKDAY_CHOICES,
+                results=None,
+                form_errors=form_errors,
+            )
+            return Response(page, status=400, mimetype="text/html")
+
+        profile_mode = _profile_mode()
+        if profile_mode:
+            # recherche + rendu (non streamé) profilés, profil écrit sur disque
+            with profile_request(profile_mode, dict(form_values, endpoint="index")) as session:
+                results = _run_search(form_values)
+                page = _render_page(
+                    form_values=form_values,
+                    weekday_choices=WEEKDAY_CHOICES,
+                    results=results,
+                )
+            resp = Response(page, mimetype="text/html")
+            resp.headers["X-Padel-Profile"] = session.save()
+            return resp
+
+        if _trace_requested():
+            # recherche tracée : page non streamée, waterfall sous les résultats
+            with start_trace("POST /", **form_values) as trace:
+                results = _run_search(form_values)
+                with span("render"):
+                    return _render_page(
+                        form_values=form_values,
+                        weekday_choices=WEEKDAY_CHOICES,
+                        results=results,
+                        trace=trace.to_dict(),
+                    )
+
+        is_range = form_values["date_end"] or form_values["weekdays"]
+        if not is_range and STREAM_RESULTS and request.args.get("stream") != "0":
+            return _stream_search(form_values)
+
+        results = _run_search(form_values)
+
+        return _render_page(
             form_values=form_values,
+            weekday_choices=WEEKDAY_CHOICES,
             results=results,
         )
 
-    # GET : juste le formulaire
-    form_values = {
-        "date": default_date,
-        "from_time": default_from,
-        "to_time": default_to,
-        "durations": default_durations,
-    }
+    # GET : juste le formulaire (valeurs par défaut)
+    form_values, _ = _read_search_params(MultiDict())
 
-    return render_template_string(
-        HTML_TEMPLATE,
+    return _render_page(
         form_values=form_values,
+        weekday_choices=WEEKDAY_CHOICES,
         results=None,
     )
 
 
+@app.route("/api/search", methods=["GET"])
+def api_search():
+    """
+    Même recherche que le formulaire, en JSON (dict search_all / search_range).
+
+    Paramètres : date, date_end, from_time, to_time, durations, weekdays, mode.
+    Répond 400 ({"errors": [...]}) si une date ou une heure est invalide.
+    Répond 304 si If-None-Match correspond à l'ETag des créneaux trouvés.
+    Avec trace=1 (ou X-Padel-Trace: 1), l'arbre de spans est ajouté sous "trace".
+    Avec profile=cprofile|sample (admin), le profil est écrit sur disque et
+    résumé sous "profile".
+    """
+    form_values, form_errors = _read_search_params(request.args)
+    if form_errors:
+        return jsonify({"errors": form_errors}), 400
+
+    profile_mode = _profile_mode()
+    if profile_mode:
+        with profile_request(profile_mode, dict(form_values, endpoint="api_search")) as session:
+            results = _run_search(form_values)
+        path = session.save()
+        results["profile"] = {"mode": profile_mode, "path": path, "top": session.top()}
+        resp = jsonify(results)
+        resp.headers["X-Padel-Profile"] = path
+        resp.headers["Cache-Control"] = "no-store"
+        return resp
+
+    if _trace_requested():
+        with start_trace("GET /api/search", **form_values) as trace:
+            results = _run_search(form_values)
+        results["trace"] = trace.to_dict()
+    else:
+        results = _run_search(form_values)
+
+    etag = results_etag(results)
+    matched = _matching_etag(etag)
+    if matched:
+        resp = Response(status=304)
+        resp.set_etag(matched)
+    else:
+        resp = jsonify(results)
+        resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+@app.route("/api/courts", methods=["GET"])
+def api_courts():
+    """
+    Plages où plusieurs terrains d'un même club sont libres ensemble, en JSON
+    (dict search_free_courts).
+
+    Paramètres : date, from_time, to_time, durations, courts (nb de terrains,
+    2 par défaut). Répond 400 si un paramètre est invalide.
+    """
+    form_values, form_errors = _read_search_params(request.args)
+    try:
+        courts = int(request.args.get("courts") or FREE_COURTS_DEFAULT)
+    except ValueError:
+        courts = 0
+    if courts < 1:
+        form_errors.append(f"Nombre de terrains invalide : {request.args.get('courts')!r}")
+    if form_errors:
+        return jsonify({"errors": form_errors}), 400
+
+    results = search_free_courts(
+        form_values["date"],
+        form_values["from_time"],
+        form_values["to_time"],
+        form_values["durations"],
+        courts,
+    )
+    resp = jsonify(results)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+@app.route("/api/status", methods=["GET"])
+def api_status():
+    """État des disjoncteurs, des files d'attente sortantes et du hedging."""
+    resp = jsonify({
+        "circuits": breaker_states(),
+        "limits": limiter_stats(),
+        "hedging": hedge_stats(),
+    })
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Métriques du worker au format texte Prometheus."""
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+def results_etag(results):
+    """
+    ETag fort calculé sur l'ensemble normalisé des créneaux (et des erreurs) :
+    indépendant de l'ordre des clubs / créneaux et des champs annexes.
+    """
+    days = results["days"] if "days" in results else [results]
+    header = [results.get("window_from"), results.get("window_to"), results.get("durations"), results.get("mode")]
+    norm = []
+
+    for day in days:
+        clubs = list(day["doinsport"]) + [day["rpadel"], day["padelshot"]]
+        for club in clubs:
+            if not club:
+                continue
+            slots = sorted(json.dumps(slot, sort_keys=True) for slot in club["slots"])
+            norm.append([day["date_iso"], club["club_name"], slots])
+        norm.append([day["date_iso"], sorted(day["errors"])])
+
+    norm.sort(key=lambda x: json.dumps(x, sort_keys=True))
+    payload = json.dumps([header, norm], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Encodages dont la variante porte son propre ETag fort ("<etag>-gzip")
+ETAG_ENCODINGS = ("gzip", "br")
+
+
+def _matching_etag(etag):
+    """
+    Variante de `etag` (identité ou "<etag>-<encodage>") citée dans
+    If-None-Match, ou None : le 304 renvoie l'ETag que le client a en cache.
+    """
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+    for candidate in [etag] + [f"{etag}-{enc}" for enc in ETAG_ENCODINGS]:
+        if if_none_match.contains_weak(candidate):
+            return candidate
+    return None
+
+
+def _stream_search(form_values):
+    """
+    Réponse HTML chunkée : la page (formulaire + en-tête des résultats) part
+    tout de suite, puis chaque club est ajouté dès que son fournisseur répond.
+    Les blocs sont replacés dans l'ordre habituel via `order` (flexbox),
+    les erreurs après les résultats.
+    """
+    durations = form_values["durations"]
+    meta = {
+        "date_iso": form_values["date"],
+        "window_from": form_values["from_time"],
+        "window_to": form_values["to_time"],
+        "durations": sorted(set(d for d in durations if d > 0)),
+        "mode": form_values["mode"],
+    }
+
+    page = _render_page(
+        form_values=form_values,
+        weekday_choices=WEEKDAY_CHOICES,
+        results=meta,
+        streaming=True,
+    )
+    head, tail = page.split(STREAM_MARKER, 1)
+
+    def generate():
+        yield head
+        for event in iter_search(
+            form_values["date"],
+            form_values["from_time"],
+            form_values["to_time"],
+            durations,
+            form_values["mode"],
+        ):
+            order = event["order"] + (1000 if event["error"] else 0)
+            with RENDER_SECONDS.time("stream_item"):
+                item = _stream_item_template.render(
+                    order=order,
+                    key=event["key"],
+                    result=event["result"],
+                    error=event["error"],
+                )
+            yield item
+        circuits = open_circuits()
+        if circuits:
+            yield _stream_item_template.render(order=2000, circuits=circuits)
+        yield "<style>#stream-pending { display: none; }</style>"
+        yield tail
+
+    resp = Response(stream_with_context(generate()), mimetype="text/html")
+    # pas de bufferisation côté proxy, sinon le streaming ne sert à rien
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+# =====================================================
+# 📦 COMPRESSION / CACHE HTTP
+# =====================================================
+
+def _preferred_encoding(accept_encodings, codings=("br", "gzip")):
+    """
+    Meilleur codage de `codings` accepté par le client (Accept-Encoding
+    analysé par werkzeug : q=0 = refusé), brotli d'abord à qualité égale.
+    """
+    if brotli is None:
+        codings = tuple(c for c in codings if c != "br")
+    return accept_encodings.best_match(codings)
+
+
+def _gzip_stream(chunks):
+    """Gzip au fil de l'eau : chaque morceau est flushé pour garder le streaming."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@app.after_request
+def _compress_response(response):
+    """
+    Compresse HTML / JSON selon Accept-Encoding (brotli si dispo, sinon gzip).
+    Les réponses streamées sont gzippées morceau par morceau.
+    """
+    if request.path.startswith(app.static_url_path) and request.args.get("v"):
+        response.headers["Cache-Control"] = f"public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable"
+
+    response.vary.add("Accept-Encoding")
+
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESS_MIMETYPES
+    ):
+        return response
+
+    if response.is_streamed:
+        if _preferred_encoding(request.accept_encodings, ("gzip",)) is None:
+            return response
+        response.response = _gzip_stream(response.response)
+        response.headers["Content-Encoding"] = "gzip"
+        response.headers.pop("Content-Length", None)
+        return response
+
+    encoding = _preferred_encoding(request.accept_encodings)
+    body = response.get_data()
+    if encoding is None or len(body) < COMPRESS_MIN_SIZE:
+        return response
+
+    if encoding == "br":
+        body = brotli.compress(body, quality=5)
+    else:
+        body = gzip.compress(body, compresslevel=6)
+
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+
+    # une variante encodée n'a pas les mêmes octets : ETag fort suffixé
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,82 @@
+# bench/bench_cache.py
+"""
+Latence d'un hit de cache : cache en mémoire du process (TTLCache) contre
+cache SQLite partagé entre workers (SQLiteCache), pour un payload
+Doinsport réaliste. Le hit partagé inclut le décodage JSON et, en option,
+la reconstruction de l'index de la journée (ce que fait un worker qui
+trouve la donnée écrite par un autre).
+
+Usage : python bench/bench_cache.py [nb_iterations]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from padel_cache import TTLCache  # noqa: E402
+from padel_logic import index_doinsport_day  # noqa: E402
+from padel_shared_cache import SQLiteCache  # noqa: E402
+
+
+def doinsport_payload(nb_courts=8):
+    """Planning d'une journée : 8 terrains, un slot par demi-heure, 3 durées."""
+    members = []
+    for court in range(1, nb_courts + 1):
+        slots = []
+        for minutes in range(9 * 60, 23 * 60, 30):
+            slots.append({
+                "startAt": f"{minutes // 60:02d}:{minutes % 60:02d}:00",
+                "prices": [
+                    {
+                        "bookable": (minutes + court * 30) % 120 != 0,
+                        "duration": duration * 60,
+                        "pricePerParticipant": 1200,
+                        "participantCount": 4,
+                    }
+                    for duration in (60, 90, 120)
+                ],
+            })
+        members.append({"name": f"Terrain {court}", "activities": [{"slots": slots}]})
+    return {"hydra:member": members}
+
+
+def bench(label, fn, iterations):
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_call = (time.perf_counter() - start) / iterations
+    print(f"  {label:<42} {per_call * 1e6:10.1f} µs/hit")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    payload = doinsport_payload()
+    key = ("doinsport", "club", "2025-12-12")
+
+    local = TTLCache(ttl=120, max_entries=256)
+    local.set(key, payload)
+    local_index = TTLCache(ttl=120, max_entries=256)
+    local_index.set(key, index_doinsport_day("Club", payload))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shared = SQLiteCache(os.path.join(tmp, "bench.sqlite3"))
+        skey = "|".join(key)
+        shared.set(skey, payload)
+
+        print(f"{iterations} hits, payload de {len(str(payload))} caractères")
+        bench("en mémoire : index (chemin de recherche)", lambda: local_index.get_entry(key), iterations)
+        bench("en mémoire : payload brut", lambda: local.get_entry(key), iterations)
+        bench("SQLite partagé : payload brut + JSON", lambda: shared.get_entry(skey), iterations)
+        bench(
+            "SQLite partagé : payload + index",
+            lambda: index_doinsport_day("Club", shared.get_entry(skey)[0]),
+            max(1, iterations // 10),
+        )
+
+
+if __name__ == "__main__":
+    main()
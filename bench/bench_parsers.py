@@ -0,0 +1,194 @@
+# bench/bench_parsers.py
+"""
+Débit parsing + filtrage sur le corpus hors ligne bench/fixtures/ (voir
+make_fixtures.py), réseau coupé : les fetch_* sont remplacés par la
+lecture du payload du corpus.
+
+Pour chaque fixture :
+  - parse  : payload -> DayIndex (index_*_day)
+  - filter : DayIndex.result() sur un jeu de fenêtres / modes
+  - check  : check_* complet (cache vidé à chaque tour : fetch simulé,
+             disjoncteur, parse, filtre, métriques)
+
+Mesure les ops/s et le pic mémoire alloué par op (tracemalloc). Les
+résultats sont écrits dans bench/results/ ; avec --baseline, chaque
+ligne est comparée à un run précédent et les régressions sont signalées
+(code de sortie 1).
+
+Usage :
+    python bench/bench_parsers.py [-t SECONDES] [-k FILTRE] [--baseline bench/results/parsers-baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+# pas de cache SQLite partagé : chaque tour doit vraiment parser
+os.environ.setdefault("PADEL_SHARED_CACHE", "off")
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import padel_logic  # noqa: E402
+from fixtures import load_corpus  # noqa: E402
+from padel_cache import provider_cache  # noqa: E402
+from padel_index import MATCH_EXACT, MATCH_WINDOW  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# (début, fin, mode) : créneau précis, soirée, journée entière
+WINDOWS = [
+    ("18:00", "19:30", MATCH_EXACT),
+    ("17:00", "22:00", MATCH_WINDOW),
+    ("08:00", "23:59", MATCH_WINDOW),
+]
+DURATIONS = {60, 90, 120}
+
+BENCH_DATE = "2025-12-12"
+
+
+def build_fn(provider):
+    return {
+        "doinsport": lambda data: padel_logic.index_doinsport_day("Bench", data),
+        "rpadel": padel_logic.index_rpadel_day,
+        "padelshot": padel_logic.index_padelshot_day,
+    }[provider]
+
+
+def check_fn(provider, payload):
+    """check_* du fournisseur, avec son fetch remplacé par le payload."""
+    club = padel_logic.DOINSPORT_CLUBS[0]
+    windows = [(padel_logic.hhmm_to_minutes(a), padel_logic.hhmm_to_minutes(b), m) for a, b, m in WINDOWS]
+    fetch_name = {"doinsport": "fetch_doinsport_day", "rpadel": "fetch_rpadel_day",
+                  "padelshot": "fetch_padelshot_day"}[provider]
+    setattr(padel_logic, fetch_name, lambda *args: payload)
+
+    def run():
+        provider_cache.clear()
+        for lo, hi, mode in windows:
+            if provider == "doinsport":
+                padel_logic.check_doinsport_club(club, BENCH_DATE, lo, hi, DURATIONS, mode)
+            elif provider == "rpadel":
+                padel_logic.check_rpadel(BENCH_DATE, lo, hi, DURATIONS, mode)
+            else:
+                padel_logic.check_padelshot(BENCH_DATE, lo, hi, DURATIONS, mode)
+    return run
+
+
+def measure(fn, min_time):
+    """(ops/s, pic alloué par op en Kio) ; au moins 3 tours et `min_time` secondes."""
+    fn()
+    iterations = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while iterations < 3 or elapsed < min_time:
+        fn()
+        iterations += 1
+        elapsed = time.perf_counter() - start
+    ops = iterations / elapsed
+
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return ops, (peak - base) / 1024
+
+
+def run_suite(min_time, pattern=None):
+    originals = {name: getattr(padel_logic, name)
+                 for name in ("fetch_doinsport_day", "fetch_rpadel_day", "fetch_padelshot_day")}
+    rows = []
+    try:
+        for provider, name, payload in load_corpus():
+            build = build_fn(provider)
+            index = build(payload)
+            windows = [(padel_logic.hhmm_to_minutes(a), padel_logic.hhmm_to_minutes(b), m) for a, b, m in WINDOWS]
+
+            def filter_all(index=index, windows=windows):
+                for lo, hi, mode in windows:
+                    index.result(lo, hi, DURATIONS, mode)
+
+            cases = [
+                ("parse", lambda build=build, payload=payload: build(payload)),
+                ("filter", filter_all),
+                ("check", check_fn(provider, payload)),
+            ]
+            for stage, fn in cases:
+                bench_id = f"{provider}/{name}/{stage}"
+                if pattern and pattern not in bench_id:
+                    continue
+                ops, alloc_kb = measure(fn, min_time)
+                rows.append({
+                    "id": bench_id,
+                    "ops_per_s": round(ops, 2),
+                    "alloc_peak_kb": round(alloc_kb, 1),
+                    "offers": len(index.offers()),
+                })
+    finally:
+        for name, fn in originals.items():
+            setattr(padel_logic, name, fn)
+        provider_cache.clear()
+    return rows
+
+
+def compare(rows, baseline_path, tolerance):
+    """Affiche l'écart avec un run précédent ; renvoie les ids en régression."""
+    with open(baseline_path, encoding="utf-8") as f:
+        previous = {r["id"]: r for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\nComparaison avec {baseline_path} (tolérance {tolerance:.0%}) :")
+    for row in rows:
+        old = previous.get(row["id"])
+        if old is None:
+            continue
+        speed = row["ops_per_s"] / old["ops_per_s"] if old["ops_per_s"] else 1.0
+        alloc = (row["alloc_peak_kb"] / old["alloc_peak_kb"]) if old["alloc_peak_kb"] else 1.0
+        flag = ""
+        if speed < 1 - tolerance or alloc > 1 + tolerance:
+            regressions.append(row["id"])
+            flag = "  RÉGRESSION"
+        print(f"  {row['id']:<32} vitesse x{speed:5.2f}   mémoire x{alloc:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-t", "--min-time", type=float, default=0.3, help="durée minimale par mesure (s)")
+    ap.add_argument("-k", "--filter", help="ne garde que les ids contenant ce texte (ex. rpadel/large)")
+    ap.add_argument("--baseline", help="résultats précédents (JSON) à comparer")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="écart toléré avant de signaler (0.15 = 15 %%)")
+    ap.add_argument("--no-save", action="store_true", help="n'écrit pas le fichier de résultats")
+    args = ap.parse_args()
+
+    rows = run_suite(args.min_time, args.filter)
+    print(f"{'bench':<32} {'ops/s':>10} {'pic Kio/op':>11} {'offres':>7}")
+    for row in rows:
+        print(f"{row['id']:<32} {row['ops_per_s']:>10.1f} {row['alloc_peak_kb']:>11.1f} {row['offers']:>7}")
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"parsers-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "lxml": padel_logic.lxml_html is not None,
+                "min_time_s": args.min_time,
+                "results": rows,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\nRésultats : {path}")
+
+    if args.baseline and compare(rows, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
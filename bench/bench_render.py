@@ -0,0 +1,109 @@
+# bench/bench_render.py
+"""
+Benchmark du rendu de la page de résultats : temps par requête et octets
+envoyés, avant (template recompilé à chaque requête, CSS inline, sans
+compression) et après (template précompilé, CSS statique, gzip / brotli).
+
+Usage : python bench/bench_render.py [nb_iterations]
+Aucun appel réseau : les résultats affichés sont synthétiques.
+"""
+
+import gzip
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import render_template_string  # noqa: E402
+
+import app as app_module  # noqa: E402
+
+
+def fake_results(nb_slots=6):
+    def slots(extra):
+        return [
+            dict({"startAt": "18:00", "start_min": 1080, "duration_min": 90}, **extra)
+            for _ in range(nb_slots)
+        ]
+
+    return {
+        "date_iso": "2025-12-12",
+        "window_from": "18:00",
+        "window_to": "19:30",
+        "durations": [90],
+        "mode": "exact",
+        "doinsport": [
+            {
+                "club_name": club,
+                "slots": slots({"terrain": "Terrain 1", "price_per_participant": 1200, "participant_count": 4}),
+            }
+            for club in ("Stadium Padel Caen", "La Pommeraie", "Area Padel Caen")
+        ],
+        "rpadel": {"club_name": "R Padel Arena", "slots": slots({"raw_text": "Piste 1"})},
+        "padelshot": {"club_name": "Padelshot Caen Mondeville", "slots": slots({"terrain": "Pista 1"})},
+        "errors": [],
+    }
+
+
+def legacy_template():
+    """Le template d'origine : CSS inline dans <style>."""
+    with open(os.path.join(app_module.app.static_folder, "app.css"), encoding="utf-8") as f:
+        css = f.read()
+    return app_module.HTML_TEMPLATE.replace(
+        '<link rel="stylesheet" href="{{ css_url }}">',
+        "<style>\n" + css + "</style>",
+    )
+
+
+def bench(label, render, encode, iterations):
+    body = b""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        body = encode(render().encode("utf-8"))
+    elapsed = (time.perf_counter() - start) / iterations
+    print(f"{label:<38} {elapsed * 1000:8.3f} ms/req {len(body):9d} octets")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    context = {
+        "form_values": app_module._read_search_params(app_module.MultiDict())[0],
+        "weekday_choices": app_module.WEEKDAY_CHOICES,
+        "results": fake_results(),
+    }
+    legacy = legacy_template()
+
+    with app_module.app.test_request_context("/"):
+        print(f"{iterations} itérations")
+        bench(
+            "avant : compile + CSS inline, brut",
+            lambda: render_template_string(legacy, **context),
+            lambda b: b,
+            iterations,
+        )
+        bench(
+            "après : précompilé, brut",
+            lambda: app_module._render_page(**context),
+            lambda b: b,
+            iterations,
+        )
+        bench(
+            "après : précompilé + gzip",
+            lambda: app_module._render_page(**context),
+            lambda b: gzip.compress(b, compresslevel=6),
+            iterations,
+        )
+        if app_module.brotli is not None:
+            bench(
+                "après : précompilé + brotli",
+                lambda: app_module._render_page(**context),
+                lambda b: app_module.brotli.compress(b, quality=5),
+                iterations,
+            )
+        else:
+            print("brotli non installé : variante br ignorée")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# bench/bench_rpadel_parser.py
+"""
+Micro-benchmark du parsing du calendrier R Padel : parseur d'origine
+(arbre BeautifulSoup complet + select, gardé comme repli) et lxml.
+
+Usage :
+    python bench/bench_rpadel_parser.py [page.html ...] [-n ITERATIONS]
+
+Sans fichier, une page synthétique proche du vrai calendrier est générée.
+Vérifie aussi que les moteurs extraient les mêmes créneaux.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+import padel_logic  # noqa: E402
+
+
+def synthetic_calendar(nb_courts=6, first_hour=8, last_hour=23):
+    """Page HTML avec un bloc par terrain et un bouton par demi-heure."""
+    parts = ["<html><head><title>Calendrier</title></head><body><div class='container'>"]
+    for court in range(1, nb_courts + 1):
+        parts.append(f"<div class='row terrain'><h2>Piste {court}</h2><div class='col'>")
+        for hour in range(first_hour, last_hour):
+            for minute in (0, 30):
+                duree = 90 if (hour + minute) % 2 else 60
+                parts.append(
+                    f"<button class='btn btn-horaires' data-heure='{hour:02d}{minute:02d}' "
+                    f"onclick=\"document.getElementById('duree').value='{duree}';choosePop({court});\">"
+                    f"<h1>{hour:02d}:{minute:02d} <small>Piste {court}</small></h1>"
+                    f"<span>{duree} mn</span><span class='prix'>32 €</span></button>"
+                )
+        parts.append("</div></div>")
+    parts.append("<script>var x = 1;</script></div></body></html>")
+    return "".join(parts)
+
+
+def legacy_buttons(html):
+    """L'extraction d'origine : arbre complet html.parser puis select()."""
+    soup = BeautifulSoup(html, "html.parser")
+    out = []
+    for btn in soup.select("button.btn-horaires"):
+        h1 = btn.find("h1")
+        out.append((
+            btn.get("data-heure"),
+            btn.get("onclick", ""),
+            btn.get_text(" ", strip=True),
+            h1.get_text(" ", strip=True) if h1 else "",
+        ))
+    return out
+
+
+def engine(parser):
+    def run(html):
+        return [
+            (heure, onclick, text(), h1)
+            for heure, onclick, text, h1 in padel_logic.extract_rpadel_buttons(html, parser=parser)
+        ]
+    return run
+
+
+def bench(label, fn, html, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(html)
+    per_call = (time.perf_counter() - start) / iterations
+    return per_call
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("pages", nargs="*", help="pages de calendrier sauvegardées (.html)")
+    ap.add_argument("-n", "--iterations", type=int, default=50)
+    args = ap.parse_args()
+
+    pages = []
+    for path in args.pages:
+        with open(path, encoding="utf-8") as f:
+            pages.append((os.path.basename(path), f.read()))
+    if not pages:
+        pages.append(("synthétique", synthetic_calendar()))
+
+    engines = [
+        ("bs4 html.parser (avant)", legacy_buttons),
+        ("bs4 html.parser (repli)", engine("soup")),
+    ]
+    if padel_logic.lxml_html is not None:
+        engines.append(("lxml (par défaut)", engine("lxml")))
+
+    for name, html in pages:
+        reference = legacy_buttons(html)
+        print(f"{name} : {len(html)} octets, {len(reference)} boutons, {args.iterations} itérations")
+        baseline = None
+        for label, fn in engines:
+            got = fn(html)
+            # l'espacement du texte peut différer : on compare sans espaces
+            same = [(a, b, re.sub(r"\s+", "", c), d) for a, b, c, d in got] == \
+                   [(a, b, re.sub(r"\s+", "", c), d) for a, b, c, d in reference]
+            per_call = bench(label, fn, html, args.iterations)
+            baseline = baseline or per_call
+            print(
+                f"  {label:<30} {per_call * 1000:8.2f} ms/page  x{baseline / per_call:5.1f}"
+                f"  {'OK' if same else 'DIFFÉRENT'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+# bench/fixtures.py
+"""
+Générateurs de payloads fournisseurs au format réel (mêmes clés, mêmes
+particularités que les réponses enregistrées) et lecture du corpus
+bench/fixtures/ :
+
+  - Doinsport : JSON hydra du planning d'un club ("hydra:member")
+  - R Padel : HTML de loadcalendrier_capsule_regroupe.asp
+  - Padelshot : JSON d'ObtenerCuadro ({"d": {"Columnas": [...]}})
+
+Les générateurs sont déterministes (graine) et paramétrables en taille ;
+ils servent au corpus, aux benchmarks et au serveur de simulation.
+"""
+
+import json
+import os
+import random
+from typing import Any, Dict, List, Tuple
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# fournisseur -> extension des fichiers du corpus
+FIXTURE_EXT = {"doinsport": ".json", "rpadel": ".html", "padelshot": ".json"}
+
+
+def _hhmm(minutes: int, seconds: bool = False) -> str:
+    out = f"{minutes // 60:02d}:{minutes % 60:02d}"
+    return out + ":00" if seconds else out
+
+
+# =====================================================
+# 🔍 DOINSPORT
+# =====================================================
+
+def doinsport_day(
+    nb_courts: int = 4,
+    first: int = 8 * 60,
+    last: int = 23 * 60,
+    step: int = 30,
+    durations: Tuple[int, ...] = (60, 90, 120),
+    booked_ratio: float = 0.4,
+    seed: int = 1,
+) -> Dict[str, Any]:
+    """Planning hydra d'un club : un slot par `step` minutes et par terrain."""
+    rng = random.Random(seed)
+    members = []
+    for court in range(1, nb_courts + 1):
+        slots = []
+        for minutes in range(first, last, step):
+            slots.append({
+                "startAt": _hhmm(minutes, seconds=True),
+                "prices": [
+                    {
+                        "bookable": rng.random() >= booked_ratio,
+                        "duration": duration * 60,
+                        "pricePerParticipant": 900 + 150 * (duration // 30),
+                        "participantCount": 4,
+                    }
+                    for duration in durations
+                    if minutes + duration <= 24 * 60
+                ],
+            })
+        members.append({
+            "@type": "Playground",
+            "id": f"00000000-0000-4000-8000-{court:012d}",
+            "name": f"Padel {court}",
+            "indoor": court % 2 == 0,
+            "activities": [{"id": "ce8c306e-224a-4f24-aa9d-6500580924dc", "name": "Padel", "slots": slots}],
+        })
+    return {"@context": "/contexts/Playground", "@type": "hydra:Collection", "hydra:member": members,
+            "hydra:totalItems": len(members)}
+
+
+def doinsport_edge_day() -> Dict[str, Any]:
+    """Cas limites rencontrés : activities en dict, startAt sans secondes,
+    prix non réservables ou sans durée, slot vide, créneau qui finit à minuit."""
+    return {"hydra:member": [
+        {
+            "name": "Padel Dict",
+            "activities": {"padel": {"slots": [
+                {"startAt": "18:00", "prices": [{"bookable": True, "duration": 5400,
+                                                  "pricePerParticipant": 1100, "participantCount": 4}]},
+                {"startAt": "18:30:00", "prices": [{"bookable": True}]},
+                {"startAt": None, "prices": [{"bookable": True, "duration": 3600}]},
+            ]}},
+        },
+        {
+            "name": "Padel Fin de soirée",
+            "activities": [{"slots": [
+                {"startAt": "22:30:00", "prices": [{"bookable": True, "duration": 5400,
+                                                     "pricePerParticipant": 1300, "participantCount": 4}]},
+                {"startAt": "23:00:00", "prices": [{"bookable": True, "duration": 3600,
+                                                     "pricePerParticipant": 1000, "participantCount": 2}]},
+                {"startAt": "19:00:00", "prices": []},
+                {"prices": [{"bookable": True, "duration": 3600}]},
+            ]}],
+        },
+        {"activities": []},
+    ]}
+
+
+# =====================================================
+# 🎾 R PADEL
+# =====================================================
+
+def rpadel_day(
+    nb_courts: int = 6,
+    first: int = 8 * 60,
+    last: int = 23 * 60,
+    step: int = 30,
+    booked_ratio: float = 0.5,
+    seed: int = 1,
+) -> str:
+    """Calendrier HTML : un bloc par piste, un bouton par créneau libre."""
+    rng = random.Random(seed)
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Calendrier</title>",
+        "<link rel='stylesheet' href='/css/bootstrap.min.css'></head><body>",
+        "<input type='hidden' id='duree' value=''><div class='container'>",
+    ]
+    for court in range(1, nb_courts + 1):
+        parts.append(f"<div class='row terrain'><h2>Piste {court}</h2><div class='col-12'>")
+        for minutes in range(first, last, step):
+            if rng.random() < booked_ratio:
+                continue
+            duree = (60, 90)[(minutes // step + court) % 2]
+            hhmm = _hhmm(minutes)
+            parts.append(
+                f"<button type='button' class='btn btn-horaires' data-heure='{hhmm.replace(':', '')}' "
+                f"onclick=\"document.getElementById('duree').value='{duree}';choosePop({court},'{hhmm}');\">"
+                f"<h1>{hhmm} <small>Piste {court}</small></h1>"
+                f"<span class='duree'>{duree} mn</span><span class='prix'>{8 * duree // 15} €</span></button>"
+            )
+        parts.append("</div></div>")
+    parts.append("</div><script>function choosePop(p, h) { return false; }</script></body></html>")
+    return "".join(parts)
+
+
+def rpadel_edge_day() -> str:
+    """Durée seulement dans le texte, onclick absent, data-heure manquant ou
+    invalide, bouton d'une autre classe."""
+    return (
+        "<html><body><div class='container'>"
+        "<button class='btn btn-horaires' data-heure='1800' onclick=\"choosePop(1);\">"
+        "<h1>18:00</h1><span>90 mn</span></button>"
+        "<button class='btn btn-horaires' data-heure='1830'><h1>18:30</h1><span>60 mn</span></button>"
+        "<button class='btn btn-horaires' onclick=\"document.getElementById('duree').value='90';\">"
+        "<h1>??</h1></button>"
+        "<button class='btn btn-horaires' data-heure='25h0' "
+        "onclick=\"document.getElementById('duree').value='90';\"><h1>25h</h1></button>"
+        "<button class='btn btn-horaires' data-heure='1900' onclick=\"x();\"><h1>19:00</h1></button>"
+        "<button class='btn btn-autre' data-heure='2000' "
+        "onclick=\"document.getElementById('duree').value='60';\"><h1>20:00</h1></button>"
+        "</div></body></html>"
+    )
+
+
+# =====================================================
+# 🎾 PADELSHOT (ObtenerCuadro)
+# =====================================================
+
+def padelshot_day(
+    nb_courts: int = 5,
+    first: int = 9 * 60,
+    last: int = 23 * 60,
+    step: int = 30,
+    durations: Tuple[int, ...] = (60, 90),
+    booked_ratio: float = 0.35,
+    seed: int = 1,
+) -> Dict[str, Any]:
+    """Grille ObtenerCuadro : HorariosFijos par terrain + Ocupaciones."""
+    rng = random.Random(seed)
+    columnas = []
+    for court in range(1, nb_courts + 1):
+        fijos = [
+            {"StrHoraInicio": _hhmm(m), "StrHoraFin": _hhmm(m + d)}
+            for m in range(first, last, step)
+            for d in durations
+            if m + d <= last
+        ]
+        ocupaciones = []
+        cursor = first
+        while cursor < last:
+            d = rng.choice(durations)
+            if rng.random() < booked_ratio and cursor + d <= last:
+                ocupaciones.append({
+                    "StrHoraInicio": _hhmm(cursor), "StrHoraFin": _hhmm(cursor + d),
+                    "StrHoraInicioMostrar": _hhmm(cursor), "StrHoraFinMostrar": _hhmm(cursor + d),
+                    "Texto": "Réservé",
+                })
+                cursor += d
+            else:
+                cursor += step
+        columnas.append({
+            "Id": court,
+            "TextoPrincipal": f"PISTA {court}",
+            "TextoSecundario": "Padel",
+            "HorariosFijos": fijos,
+            "Ocupaciones": ocupaciones,
+        })
+    return {"d": {"__type": "Cuadro", "Id": 4, "Columnas": columnas}}
+
+
+def padelshot_edge_day() -> Dict[str, Any]:
+    """Horaires hors grille 5 min, Mostrar prioritaire, occupations qui se
+    chevauchent, horaires invalides ou vides."""
+    return {"d": {"Columnas": [
+        {
+            "TextoPrincipal": "PISTA HORS GRILLE",
+            "Ocupaciones": [
+                {"StrHoraInicio": "18:07", "StrHoraFin": "19:02"},
+                {"StrHoraInicio": "18:45", "StrHoraFin": "19:30"},
+                {"StrHoraInicio": "21:00", "StrHoraFin": "20:00"},
+            ],
+            "HorariosFijos": [
+                {"StrHoraInicio": "17:30", "StrHoraFin": "18:07"},
+                {"StrHoraInicio": "18:00", "StrHoraFin": "19:30"},
+                {"StrHoraInicio": "19:30", "StrHoraFin": "21:00"},
+                {"StrHoraInicio": "", "StrHoraFin": "21:00"},
+            ],
+        },
+        {
+            "TextoPrincipal": "PISTA MOSTRAR",
+            "Ocupaciones": [{"StrHoraInicio": "08:00", "StrHoraFin": "09:00",
+                             "StrHoraInicioMostrar": "19:00", "StrHoraFinMostrar": "20:00"}],
+            "HorariosFijos": [
+                {"StrHoraInicio": "07:00", "StrHoraFin": "08:30",
+                 "StrHoraInicioMostrar": "18:00", "StrHoraFinMostrar": "19:30"},
+                {"StrHoraInicio": "20:00", "StrHoraFin": "21:30"},
+            ],
+        },
+        {"TextoPrincipal": "PISTA VIDE"},
+    ]}}
+
+
+# =====================================================
+# 📚 CORPUS
+# =====================================================
+
+def corpus_cases() -> Dict[str, Dict[str, Any]]:
+    """fournisseur -> {cas: payload} : journée type, grosse journée, vide, cas limites."""
+    return {
+        "doinsport": {
+            "typical": doinsport_day(),
+            "large": doinsport_day(nb_courts=14, first=7 * 60, last=24 * 60, step=15,
+                                   durations=(60, 90, 120, 150), seed=2),
+            "empty": {"hydra:member": [], "hydra:totalItems": 0},
+            "edge": doinsport_edge_day(),
+        },
+        "rpadel": {
+            "typical": rpadel_day(),
+            "large": rpadel_day(nb_courts=16, first=7 * 60, last=24 * 60, step=15, booked_ratio=0.2, seed=2),
+            "empty": rpadel_day(nb_courts=6, booked_ratio=1.0),
+            "edge": rpadel_edge_day(),
+        },
+        "padelshot": {
+            "typical": padelshot_day(),
+            "large": padelshot_day(nb_courts=14, first=7 * 60, last=24 * 60, step=15,
+                                   durations=(60, 90, 120), seed=2),
+            "empty": {"d": {"Columnas": []}},
+            "edge": padelshot_edge_day(),
+        },
+    }
+
+
+def load_corpus(fixtures_dir: str = FIXTURES_DIR) -> List[Tuple[str, str, Any]]:
+    """[(fournisseur, nom du cas, payload)] lus dans bench/fixtures/<fournisseur>/."""
+    out = []
+    for provider, ext in FIXTURE_EXT.items():
+        folder = os.path.join(fixtures_dir, provider)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if not name.endswith(ext):
+                continue
+            with open(os.path.join(folder, name), encoding="utf-8") as f:
+                payload = f.read() if ext == ".html" else json.load(f)
+            out.append((provider, name[: -len(ext)], payload))
+    return out
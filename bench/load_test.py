@@ -0,0 +1,375 @@
+# bench/load_test.py
+"""
+Générateur de charge de bout en bout : POST / (formulaire, streamé ou non)
+et GET /api/search, avec un mélange réaliste de dates / fenêtres / durées,
+contre les fournisseurs simulés (bench/mock_upstream.py).
+
+Par défaut tout tourne dans ce process : serveur de simulation + app:app
+servie par werkzeug (threads). Avec --url, on vise une appli déjà lancée
+(ex. gunicorn avec les PADEL_*_URL du serveur de simulation) ; --upstream
+donne alors l'URL du serveur de simulation pour compter les appels.
+
+Deux modèles de charge :
+  - boucle fermée (défaut) : --concurrency clients qui enchaînent
+  - boucle ouverte : --rate arrivées/s (Poisson) servies par --concurrency
+    clients ; la latence compte depuis l'arrivée prévue (file d'attente
+    incluse)
+
+Rapport : débit, p50/p95/p99, taux d'erreur, appels fournisseurs par
+recherche (compteurs du serveur de simulation), par endpoint.
+
+Usage :
+    python bench/load_test.py [-c 8] [-d 30 | -n 500] [--rate 20] [--mix index=1,api=1]
+                              [--latency lognormal:0.15,0.6 ...] [--output rapport.json]
+    python bench/load_test.py --url http://127.0.0.1:8000 --upstream http://127.0.0.1:8091 -c 32
+"""
+
+import argparse
+import importlib
+import json
+import os
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import requests  # noqa: E402
+
+from mock_upstream import MockState, MockUpstream, add_mock_arguments, behaviours_from_args  # noqa: E402
+
+
+# =====================================================
+# 🎲 MÉLANGE DE RECHERCHES
+# =====================================================
+
+# (début, fin, mode, poids) : créneaux du soir surtout, quelques recherches larges
+WINDOWS = [
+    ("18:00", "19:30", "exact", 5),
+    ("19:00", "20:30", "exact", 4),
+    ("20:30", "22:00", "exact", 2),
+    ("12:00", "13:30", "exact", 2),
+    ("17:00", "22:00", "window", 3),
+    ("09:00", "23:00", "window", 1),
+]
+DURATIONS = [("90", 6), ("60,90", 3), ("90,120", 1)]
+
+# Jours visés : surtout les 3 prochains jours, jusqu'à J+13
+DAY_WEIGHTS = [6, 5, 4, 2, 2, 2, 2, 1, 1, 1, 1, 1, 1, 1]
+
+# Part de recherches multi-jours (date de fin à J+3 / J+6)
+RANGE_SHARE = 0.1
+
+
+def _pick(rng: random.Random, items):
+    return rng.choices(items, weights=[i[-1] for i in items])[0]
+
+
+def search_params(rng: random.Random, today: date) -> Dict[str, str]:
+    """Paramètres d'une recherche tirée au sort (mêmes noms que le formulaire)."""
+    day = today + timedelta(days=rng.choices(range(len(DAY_WEIGHTS)), weights=DAY_WEIGHTS)[0])
+    from_time, to_time, mode, _ = _pick(rng, WINDOWS)
+    params = {
+        "date": day.isoformat(),
+        "from_time": from_time,
+        "to_time": to_time,
+        "durations": _pick(rng, DURATIONS)[0],
+        "mode": mode,
+    }
+    if rng.random() < RANGE_SHARE:
+        params["date_end"] = (day + timedelta(days=rng.choice((3, 6)))).isoformat()
+    return params
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """'index=1,api=2' -> poids par endpoint."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("index", "api"):
+            raise SystemExit(f"Endpoint inconnu dans --mix : {name} (index, api)")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# =====================================================
+# 🚚 CLIENTS
+# =====================================================
+
+class Recorder:
+    """Latences et erreurs par endpoint (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[str, int] = {}
+
+    def add(self, endpoint: str, latency: float, status: str, ok: bool) -> None:
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(latency)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+
+def do_request(http: requests.Session, base_url: str, endpoint: str, params: Dict[str, str], stream: bool,
+               timeout: float):
+    """Envoie une recherche et lit la réponse en entier ; renvoie (statut, ok)."""
+    try:
+        if endpoint == "index":
+            url = base_url + "/" + ("" if stream else "?stream=0")
+            resp = http.post(url, data=params, timeout=timeout, stream=True)
+        else:
+            resp = http.get(base_url + "/api/search", params=params, timeout=timeout, stream=True)
+        for _ in resp.iter_content(chunk_size=65536):
+            pass
+        return str(resp.status_code), resp.status_code < 400
+    except requests.RequestException as e:
+        return e.__class__.__name__, False
+
+
+def run_load(args, base_url: str) -> Recorder:
+    recorder = Recorder()
+    mix = parse_mix(args.mix)
+    endpoints, weights = list(mix), list(mix.values())
+    rng = random.Random(args.seed)
+    rng_lock = threading.Lock()
+    today = date.today()
+
+    def next_job():
+        with rng_lock:
+            return rng.choices(endpoints, weights=weights)[0], search_params(rng, today)
+
+    stop_at = time.perf_counter() + args.duration if args.duration else None
+    remaining = [args.requests] if args.requests else None
+    count_lock = threading.Lock()
+
+    def take_slot() -> bool:
+        if stop_at is not None and time.perf_counter() >= stop_at:
+            return False
+        if remaining is not None:
+            with count_lock:
+                if remaining[0] <= 0:
+                    return False
+                remaining[0] -= 1
+        return True
+
+    def execute(http, scheduled: float, endpoint: str, params: Dict[str, str]) -> None:
+        status, ok = do_request(http, base_url, endpoint, params, not args.no_stream, args.timeout)
+        recorder.add(endpoint, time.perf_counter() - scheduled, status, ok)
+
+    if not args.rate:
+        # boucle fermée : chaque client enchaîne ses requêtes
+        def client():
+            http = requests.Session()
+            while take_slot():
+                endpoint, params = next_job()
+                execute(http, time.perf_counter(), endpoint, params)
+
+        threads = [threading.Thread(target=client, daemon=True) for _ in range(args.concurrency)]
+    else:
+        # boucle ouverte : arrivées de Poisson, mises en file pour les clients
+        arrivals: "queue.Queue[Optional[tuple]]" = queue.Queue()
+
+        def dispatcher():
+            arrival_rng = random.Random(args.seed + 1)
+            next_at = time.perf_counter()
+            while take_slot():
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                arrivals.put((next_at,) + next_job())
+                next_at += arrival_rng.expovariate(args.rate)
+            for _ in range(args.concurrency):
+                arrivals.put(None)
+
+        def client():
+            http = requests.Session()
+            while True:
+                job = arrivals.get()
+                if job is None:
+                    return
+                execute(http, *job)
+
+        threads = [threading.Thread(target=dispatcher, daemon=True)]
+        threads += [threading.Thread(target=client, daemon=True) for _ in range(args.concurrency)]
+
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder
+
+
+# =====================================================
+# 📊 RAPPORT
+# =====================================================
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 1),
+        "p95_ms": round(percentile(values, 95) * 1000, 1),
+        "p99_ms": round(percentile(values, 99) * 1000, 1),
+        "max_ms": round(values[-1] * 1000, 1) if values else 0.0,
+    }
+
+
+def upstream_counts(stats: Dict[str, Any]) -> Dict[str, int]:
+    """Requêtes reçues par endpoint fournisseur (hors compteurs :error / :hang / :key_rejected)."""
+    return {k: v for k, v in stats["requests"].items() if k.count(":") == 1}
+
+
+def fetch_upstream_stats(upstream_url: Optional[str], mock: Optional[MockUpstream]) -> Optional[Dict[str, int]]:
+    if mock is not None:
+        return upstream_counts(mock.state.stats())
+    if upstream_url:
+        return upstream_counts(requests.get(upstream_url.rstrip("/") + "/_stats", timeout=5).json())
+    return None
+
+
+def build_report(args, recorder: Recorder, elapsed: float, upstream_before, upstream_after) -> Dict[str, Any]:
+    every = [v for values in recorder.latencies.values() for v in values]
+    total = len(every)
+    errors = sum(recorder.errors.values())
+    report: Dict[str, Any] = {
+        "config": {
+            "target": args.url or "in-process",
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "mix": args.mix,
+            "stream": not args.no_stream,
+        },
+        "requests": total,
+        "duration_s": round(elapsed, 2),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "statuses": recorder.statuses,
+        "latency": latency_summary(every),
+        "endpoints": {
+            name: dict(latency_summary(values), requests=len(values), errors=recorder.errors.get(name, 0))
+            for name, values in recorder.latencies.items()
+        },
+    }
+    if upstream_before is not None and upstream_after is not None:
+        delta = {k: v - upstream_before.get(k, 0) for k, v in upstream_after.items()}
+        delta = {k: v for k, v in delta.items() if v}
+        calls = sum(delta.values())
+        report["upstream"] = {
+            "calls": calls,
+            "calls_per_search": round(calls / total, 3) if total else 0.0,
+            "by_endpoint": delta,
+        }
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    lat = report["latency"]
+    print(f"\n{report['requests']} requêtes en {report['duration_s']} s"
+          f"  ->  {report['throughput_rps']} req/s, erreurs {report['error_rate']:.2%}")
+    print(f"latence  p50 {lat['p50_ms']} ms   p95 {lat['p95_ms']} ms   p99 {lat['p99_ms']} ms"
+          f"   max {lat['max_ms']} ms")
+    for name, ep in report["endpoints"].items():
+        print(f"  {name:<6} {ep['requests']:>6} req   p50 {ep['p50_ms']:>8} ms   p95 {ep['p95_ms']:>8} ms"
+              f"   p99 {ep['p99_ms']:>8} ms   erreurs {ep['errors']}")
+    print(f"statuts : {report['statuses']}")
+    upstream = report.get("upstream")
+    if upstream:
+        print(f"appels fournisseurs : {upstream['calls']} ({upstream['calls_per_search']} par recherche)")
+        for name, n in sorted(upstream["by_endpoint"].items()):
+            print(f"  {name:<28} {n}")
+
+
+# =====================================================
+# 🚀 DÉMARRAGE
+# =====================================================
+
+def serve_app(app_spec: str):
+    """Importe "module:attribut" et le sert (werkzeug, threads) sur un port libre."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):  # une ligne par requête noierait le rapport
+            pass
+
+    module_name, _, attr = app_spec.partition(":")
+    wsgi_app = getattr(importlib.import_module(module_name), attr or "app")
+    server = make_server("127.0.0.1", 0, wsgi_app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, name="load-test-app", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-c", "--concurrency", type=int, default=8, help="clients simultanés")
+    ap.add_argument("-d", "--duration", type=float, default=None, help="durée du test (s, défaut 20)")
+    ap.add_argument("-n", "--requests", type=int, default=None, help="nombre total de requêtes")
+    ap.add_argument("--rate", type=float, default=None, help="arrivées / s (boucle ouverte)")
+    ap.add_argument("--mix", default="index=1,api=1", help="poids des endpoints : index (POST /), api")
+    ap.add_argument("--no-stream", action="store_true", help="POST / avec ?stream=0 (page d'un bloc)")
+    ap.add_argument("--timeout", type=float, default=30.0, help="timeout client (s)")
+    ap.add_argument("--app", default="app:app", help="appli WSGI servie en process")
+    ap.add_argument("--url", help="appli déjà lancée (sinon servie dans ce process)")
+    ap.add_argument("--upstream", help="serveur de simulation externe (compteurs /_stats)")
+    ap.add_argument("--mock-port", type=int, default=0, help="premier port du serveur de simulation (0 = libre)")
+    ap.add_argument("--output", help="écrit le rapport JSON dans ce fichier")
+    add_mock_arguments(ap)
+    args = ap.parse_args()
+    if args.duration is None and args.requests is None:
+        args.duration = 20.0
+
+    mock = server = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        mock = MockUpstream(MockState(behaviours_from_args(args), seed=args.seed, key_ttl=args.key_ttl),
+                            port=args.mock_port).start()
+        # les URL fournisseurs sont lues à l'import de padel_logic
+        os.environ.update(mock.env())
+        # cache partagé neuf : les appels comptés sont ceux de ce test
+        os.environ.setdefault("PADEL_SHARED_CACHE",
+                              os.path.join(tempfile.mkdtemp(prefix="padel-load-"), "cache.sqlite3"))
+        server, base_url = serve_app(args.app)
+
+    print(f"cible {base_url} : {args.concurrency} clients"
+          + (f", {args.rate} arrivées/s" if args.rate else ", boucle fermée")
+          + (f", {args.duration} s" if args.duration else "")
+          + (f", {args.requests} requêtes" if args.requests else ""))
+
+    try:
+        before = fetch_upstream_stats(args.upstream, mock)
+        start = time.perf_counter()
+        recorder = run_load(args, base_url)
+        elapsed = time.perf_counter() - start
+        after = fetch_upstream_stats(args.upstream, mock)
+    finally:
+        if server is not None:
+            server.shutdown()
+        if mock is not None:
+            mock.stop()
+
+    report = build_report(args, recorder, elapsed, before, after)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nRapport : {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# bench/make_fixtures.py
+"""
+(Re)génère le corpus bench/fixtures/ et, avec --record, y ajoute les
+payloads réels d'une journée (réseau requis) :
+
+    python bench/make_fixtures.py                 # corpus généré
+    python bench/make_fixtures.py --record 2025-12-12
+
+Les fichiers enregistrés s'appellent live-<date>[-<club>].<ext> ; ils sont
+repris tels quels par bench_parsers.py.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import FIXTURE_EXT, FIXTURES_DIR, corpus_cases  # noqa: E402
+
+
+def write_fixture(provider, name, payload):
+    folder = os.path.join(FIXTURES_DIR, provider)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, name + FIXTURE_EXT[provider])
+    with open(path, "w", encoding="utf-8") as f:
+        if isinstance(payload, str):
+            f.write(payload)
+        else:
+            json.dump(payload, f, ensure_ascii=False, indent=1)
+            f.write("\n")
+    return path
+
+
+def record(date_iso):
+    """Enregistre les réponses réelles des trois fournisseurs pour `date_iso`."""
+    import padel_logic
+
+    paths = []
+    for club in padel_logic.DOINSPORT_CLUBS:
+        slug = re.sub(r"[^a-z0-9]+", "-", club["name"].lower()).strip("-")
+        data = padel_logic.fetch_doinsport_day(club, date_iso)
+        paths.append(write_fixture("doinsport", f"live-{date_iso}-{slug}", data))
+    paths.append(write_fixture("rpadel", f"live-{date_iso}", padel_logic.fetch_rpadel_day(date_iso)))
+    paths.append(write_fixture("padelshot", f"live-{date_iso}", padel_logic.fetch_padelshot_day(date_iso)))
+    return paths
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--record", metavar="DATE", help="enregistre aussi les vrais payloads de DATE (AAAA-MM-JJ)")
+    args = ap.parse_args()
+
+    for provider, cases in corpus_cases().items():
+        for name, payload in cases.items():
+            path = write_fixture(provider, name, payload)
+            print(f"{path} ({os.path.getsize(path)} octets)")
+
+    if args.record:
+        for path in record(args.record):
+            print(f"{path} ({os.path.getsize(path)} octets, enregistré)")
+
+
+if __name__ == "__main__":
+    main()
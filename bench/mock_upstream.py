@@ -0,0 +1,417 @@
+# bench/mock_upstream.py
+"""
+Serveur de simulation des trois fournisseurs, pour les tests de charge
+(concurrence, caches, budgets, hedging) sans toucher aux vrais sites.
+Un port par fournisseur, pour garder un hôte (donc un limiteur, un pool
+keep-alive) par fournisseur comme en production :
+
+  - Doinsport : GET /clubs/playgrounds/plannings/<date>?club.id=...&from=...&to=...
+  - R Padel : POST /loadcalendrier_capsule_regroupe.asp (myDate=JJ/MM/AAAA)
+  - Matchpoint : GET /Booking/grid.aspx (page avec la clé) et
+    POST /booking/srvc.aspx/ObtenerCuadro ({"idCuadro", "fecha", "key"})
+
+Payloads générés par bench/fixtures.py (déterministes par club / date).
+Latence, taux d'erreur et taille se règlent globalement ou par
+fournisseur ("doinsport=...") :
+
+    --latency lognormal:0.15,0.6 --latency padelshot=uniform:0.3,1.2
+    --error-rate 0.02 --hang-rate rpadel=0.01 --size large
+
+Lois de latence : 0.2 (fixe), uniform:min,max, lognormal:médiane,sigma,
+exp:moyenne. GET /_stats (chaque port) donne les compteurs, POST /_reset
+les remet à zéro.
+
+Usage :
+    python bench/mock_upstream.py [--port 8091] [options]
+puis lancer l'appli avec les variables affichées au démarrage
+(PADEL_DOINSPORT_URL, PADEL_RPADEL_URL, PADEL_PADELSHOT_URL).
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import doinsport_day, padelshot_day, rpadel_day  # noqa: E402
+
+PROVIDERS = ("doinsport", "rpadel", "padelshot")
+
+# Variables d'environnement lues par padel_logic pour chaque fournisseur
+ENV_VARS = {
+    "doinsport": "PADEL_DOINSPORT_URL",
+    "rpadel": "PADEL_RPADEL_URL",
+    "padelshot": "PADEL_PADELSHOT_URL",
+}
+
+# Taille des journées servies : paramètres des générateurs de fixtures.py
+SIZES = {
+    "small": {"nb_courts": 2, "step": 60},
+    "typical": {},
+    "large": {"nb_courts": 14, "step": 15},
+}
+
+
+# =====================================================
+# ⚙️ CONFIG SIMULATION
+# =====================================================
+
+def latency_sampler(spec: str) -> Callable[[random.Random], float]:
+    """'0.2' | 'uniform:a,b' | 'lognormal:médiane,sigma' | 'exp:moyenne' -> tirage (s)."""
+    kind, _, args = spec.partition(":")
+    if not args:
+        value = float(kind)
+        return lambda rng: value
+    params = [float(x) for x in args.split(",")]
+    if kind == "uniform":
+        low, high = params
+        return lambda rng: rng.uniform(low, high)
+    if kind == "lognormal":
+        median, sigma = params
+        return lambda rng: rng.lognormvariate(math.log(median), sigma)
+    if kind == "exp":
+        (mean,) = params
+        return lambda rng: rng.expovariate(1 / mean)
+    raise ValueError(f"Loi de latence inconnue : {spec}")
+
+
+class ProviderBehaviour:
+    """Comportement simulé d'un fournisseur : latence, pannes, taille des journées."""
+
+    def __init__(
+        self,
+        latency: str = "0.05",
+        error_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        hang_s: float = 30.0,
+        size: str = "typical",
+        key_reject_rate: float = 0.0,
+    ):
+        self.latency_spec = latency
+        self.latency = latency_sampler(latency)
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang_s = hang_s
+        self.size = size
+        self.key_reject_rate = key_reject_rate
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "latency": self.latency_spec,
+            "error_rate": self.error_rate,
+            "hang_rate": self.hang_rate,
+            "size": self.size,
+            "key_reject_rate": self.key_reject_rate,
+        }
+
+
+# =====================================================
+# 🎭 ÉTAT PARTAGÉ (compteurs, payloads, clé Matchpoint)
+# =====================================================
+
+class MockState:
+    def __init__(self, behaviours: Dict[str, ProviderBehaviour], seed: int = 0, key_ttl: float = 600.0):
+        self.behaviours = behaviours
+        self.rng = random.Random(seed)
+        self.key_ttl = key_ttl
+        self._lock = threading.Lock()
+        self._payloads: Dict[tuple, Any] = {}
+        self._counts: Dict[str, int] = {}
+        self._key = secrets.token_urlsafe(24)
+        self._key_at = time.monotonic()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        return {"requests": counts, "behaviours": {p: b.describe() for p, b in self.behaviours.items()}}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def draw(self) -> float:
+        with self._lock:
+            return self.rng.random()
+
+    def sleep_latency(self, provider: str) -> None:
+        with self._lock:
+            delay = self.behaviours[provider].latency(self.rng)
+        time.sleep(max(0.0, delay))
+
+    def current_key(self) -> str:
+        with self._lock:
+            if time.monotonic() - self._key_at > self.key_ttl:
+                self._key = secrets.token_urlsafe(24)
+                self._key_at = time.monotonic()
+            return self._key
+
+    def payload(self, provider: str, club: str, date_iso: str, **window: int) -> Any:
+        """Journée générée une fois par (fournisseur, club, date, taille, fenêtre)."""
+        size = self.behaviours[provider].size
+        key = (provider, club, date_iso, size, tuple(sorted(window.items())))
+        with self._lock:
+            cached = self._payloads.get(key)
+        if cached is not None:
+            return cached
+        kwargs = dict(SIZES[size], seed=zlib.crc32(f"{provider}|{club}|{date_iso}".encode()), **window)
+        build = {"doinsport": doinsport_day, "rpadel": rpadel_day, "padelshot": padelshot_day}[provider]
+        data = build(**kwargs)
+        if provider != "rpadel":
+            data = json.dumps(data, ensure_ascii=False)
+        data = data.encode("utf-8")
+        with self._lock:
+            self._payloads[key] = data
+        return data
+
+
+# =====================================================
+# 🌐 HANDLERS
+# =====================================================
+
+def _minutes(hhmm: Optional[str], default: int) -> int:
+    m = re.match(r"^(\d{1,2}):(\d{2})", hhmm or "")
+    return int(m.group(1)) * 60 + int(m.group(2)) if m else default
+
+
+def _fr_to_iso(date_fr: str) -> Optional[str]:
+    m = re.match(r"^(\d{2})/(\d{2})/(\d{4})$", date_fr or "")
+    return f"{m.group(3)}-{m.group(2)}-{m.group(1)}" if m else None
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    provider = ""
+    state: MockState
+
+    def log_message(self, format, *args):  # silencieux : les compteurs suffisent
+        pass
+
+    # --- réponses ---
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, data: Any) -> None:
+        self._send(status, json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _simulate(self, endpoint: str) -> bool:
+        """Compte, applique latence et pannes ; False si la réponse est déjà partie."""
+        behaviour = self.state.behaviours[self.provider]
+        self.state.count(endpoint)
+        self.state.sleep_latency(self.provider)
+        if behaviour.hang_rate and self.state.draw() < behaviour.hang_rate:
+            self.state.count(endpoint + ":hang")
+            time.sleep(behaviour.hang_s)
+        if behaviour.error_rate and self.state.draw() < behaviour.error_rate:
+            self.state.count(endpoint + ":error")
+            self._send(503, b"Service Unavailable", "text/plain")
+            return False
+        return True
+
+    # --- routes ---
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/_stats":
+            return self._json(200, self.state.stats())
+
+        if self.provider == "doinsport":
+            m = re.match(r"^/clubs/playgrounds/plannings/(\d{4}-\d{2}-\d{2})$", url.path)
+            if m:
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if not query.get("club.id"):
+                    return self._json(400, {"hydra:description": "club.id manquant"})
+                if not self._simulate("doinsport:plannings"):
+                    return
+                body = self.state.payload(
+                    "doinsport", query["club.id"], m.group(1),
+                    first=_minutes(query.get("from"), 8 * 60), last=_minutes(query.get("to"), 23 * 60),
+                )
+                return self._send(200, body, "application/ld+json; charset=utf-8")
+
+        if self.provider == "padelshot" and url.path.lower() == "/booking/grid.aspx":
+            if not self._simulate("padelshot:grid"):
+                return
+            html = (
+                "<html><head><title>Reservas</title></head><body><div id='grid'></div>"
+                f"<script>var opciones = {{\"idCuadro\":\"4\",\"key\":\"{self.state.current_key()}\"}};</script>"
+                "</body></html>"
+            )
+            self.send_response(200)
+            body = html.encode("utf-8")
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Set-Cookie", "ASP.NET_SessionId=mock; path=/; HttpOnly")
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self._send(404, b"Not Found", "text/plain")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        body = self._body()
+        if url.path == "/_reset":
+            self.state.reset()
+            return self._json(200, {"ok": True})
+
+        if self.provider == "rpadel" and url.path == "/loadcalendrier_capsule_regroupe.asp":
+            form = {k: v[0] for k, v in parse_qs(body.decode("utf-8")).items()}
+            date_iso = _fr_to_iso(form.get("myDate", ""))
+            if date_iso is None:
+                return self._send(200, b"<html><body>Date invalide</body></html>", "text/html; charset=utf-8")
+            if not self._simulate("rpadel:calendrier"):
+                return
+            payload = self.state.payload("rpadel", form.get("id_sport", ""), date_iso)
+            return self._send(200, payload, "text/html; charset=utf-8")
+
+        if self.provider == "padelshot" and url.path.lower() == "/booking/srvc.aspx/obtenercuadro":
+            try:
+                data = json.loads(body or b"{}")
+            except ValueError:
+                return self._json(500, {"Message": "JSON invalide"})
+            if not self._simulate("padelshot:ObtenerCuadro"):
+                return
+            behaviour = self.state.behaviours["padelshot"]
+            date_iso = _fr_to_iso(data.get("fecha", ""))
+            rejected = data.get("key") != self.state.current_key() or (
+                behaviour.key_reject_rate and self.state.draw() < behaviour.key_reject_rate
+            )
+            if rejected or date_iso is None:
+                self.state.count("padelshot:ObtenerCuadro:key_rejected")
+                return self._json(200, {"d": None})
+            payload = self.state.payload("padelshot", str(data.get("idCuadro", "")), date_iso)
+            return self._send(200, payload, "application/json; charset=utf-8")
+
+        self._send(404, b"Not Found", "text/plain")
+
+
+# =====================================================
+# 🚀 DÉMARRAGE
+# =====================================================
+
+class MockUpstream:
+    """Les trois serveurs (un par fournisseur) sur des ports consécutifs, en threads."""
+
+    def __init__(self, state: MockState, host: str = "127.0.0.1", port: int = 8091):
+        self.state = state
+        self.servers = {}
+        for i, provider in enumerate(PROVIDERS):
+            handler = type(f"{provider.title()}Handler", (MockHandler,), {"provider": provider, "state": state})
+            server = ThreadingHTTPServer((host, port + i if port else 0), handler)
+            server.daemon_threads = True
+            self.servers[provider] = server
+        self._threads = []
+
+    @property
+    def urls(self) -> Dict[str, str]:
+        return {p: f"http://{s.server_address[0]}:{s.server_address[1]}" for p, s in self.servers.items()}
+
+    def env(self) -> Dict[str, str]:
+        """Variables à donner à padel_logic (avant import) pour viser la simulation."""
+        return {ENV_VARS[p]: url for p, url in self.urls.items()}
+
+    def start(self) -> "MockUpstream":
+        for provider, server in self.servers.items():
+            t = threading.Thread(target=server.serve_forever, name=f"mock-{provider}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self) -> None:
+        for server in self.servers.values():
+            server.shutdown()
+            server.server_close()
+
+
+def _per_provider(values, cast, default):
+    """['0.1', 'rpadel=0.3'] -> {fournisseur: valeur} (le global d'abord, puis les surcharges)."""
+    out = {p: default for p in PROVIDERS}
+    for value in values or []:
+        provider, sep, rest = value.partition("=")
+        if sep and provider in PROVIDERS:
+            out[provider] = cast(rest)
+        else:
+            out.update({p: cast(value) for p in PROVIDERS})
+    return out
+
+
+def add_mock_arguments(ap: argparse.ArgumentParser) -> None:
+    """Options de simulation (partagées avec le générateur de charge)."""
+    ap.add_argument("--latency", action="append", help="loi de latence, globale ou fournisseur=loi (défaut 0.05)")
+    ap.add_argument("--error-rate", action="append", help="part de réponses 503 (0.02 ou rpadel=0.1)")
+    ap.add_argument("--hang-rate", action="append", help="part de requêtes bloquées --hang-s secondes")
+    ap.add_argument("--hang-s", type=float, default=30.0)
+    ap.add_argument("--size", action="append", help=f"taille des journées : {', '.join(SIZES)}")
+    ap.add_argument("--key-reject-rate", type=float, default=0.0, help="part de clés Matchpoint refusées")
+    ap.add_argument("--key-ttl", type=float, default=600.0, help="durée de vie de la clé Matchpoint (s)")
+    ap.add_argument("--seed", type=int, default=0)
+
+
+def behaviours_from_args(args) -> Dict[str, ProviderBehaviour]:
+    latency = _per_provider(args.latency, str, "0.05")
+    errors = _per_provider(args.error_rate, float, 0.0)
+    hangs = _per_provider(args.hang_rate, float, 0.0)
+    sizes = _per_provider(args.size, str, "typical")
+    for size in sizes.values():
+        if size not in SIZES:
+            raise SystemExit(f"Taille inconnue : {size} ({', '.join(SIZES)})")
+    return {
+        p: ProviderBehaviour(
+            latency=latency[p],
+            error_rate=errors[p],
+            hang_rate=hangs[p],
+            hang_s=args.hang_s,
+            size=sizes[p],
+            key_reject_rate=args.key_reject_rate if p == "padelshot" else 0.0,
+        )
+        for p in PROVIDERS
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8091, help="port Doinsport ; R Padel et Matchpoint suivent")
+    add_mock_arguments(ap)
+    args = ap.parse_args()
+
+    state = MockState(behaviours_from_args(args), seed=args.seed, key_ttl=args.key_ttl)
+    mock = MockUpstream(state, args.host, args.port).start()
+    for provider, behaviour in state.behaviours.items():
+        print(f"{provider:<10} {mock.urls[provider]}  {behaviour.describe()}")
+    print("\nPour viser la simulation :")
+    for name, url in mock.env().items():
+        print(f"  export {name}={url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# padel_breaker.py
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import requests
+
+from padel_http import ProviderQueueTimeout, SearchDeadlineExceeded
+
+
+# =====================================================
+# ⚙️ CONFIG DISJONCTEURS
+# =====================================================
+
+# Échecs consécutifs (timeout, erreur de connexion, HTTP 5xx) avant ouverture
+BREAKER_FAILURE_THRESHOLD = 3
+
+# Durée d'ouverture avant d'autoriser un appel de test (secondes)
+BREAKER_RESET_TIMEOUT = 30
+
+# Erreurs locales qui ne disent rien de la santé du fournisseur
+BREAKER_IGNORED_ERRORS: Tuple[type, ...] = (ProviderQueueTimeout, SearchDeadlineExceeded)
+
+# Erreurs qui comptent comme un échec du fournisseur (HTTPError : 5xx seulement) ;
+# tout le reste (4xx, réponse illisible, bug local) est ignoré comme ci-dessus
+BREAKER_FAILURE_ERRORS: Tuple[type, ...] = (requests.Timeout, requests.ConnectionError, requests.HTTPError)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """True si `error` dit que le fournisseur est en panne (voir BREAKER_FAILURE_ERRORS)."""
+    if isinstance(error, BREAKER_IGNORED_ERRORS) or not isinstance(error, BREAKER_FAILURE_ERRORS):
+        return False
+    if isinstance(error, requests.HTTPError):
+        response = error.response
+        return response is None or response.status_code >= 500
+    return True
+
+
+# =====================================================
+# 🔌 DISJONCTEUR
+# =====================================================
+
+class CircuitOpenError(RuntimeError):
+    """Appel refusé sans contacter le fournisseur : le circuit est ouvert."""
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur d'un fournisseur (ou d'un club Doinsport) :
+      - closed : les appels passent, les échecs consécutifs sont comptés
+        (is_provider_failure ; les autres erreurs ne changent rien)
+      - open : après BREAKER_FAILURE_THRESHOLD échecs, les appels échouent
+        tout de suite (CircuitOpenError) pendant BREAKER_RESET_TIMEOUT
+      - half_open : un seul appel de test passe ; succès -> closed,
+        échec -> open pour une nouvelle période
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error = ""
+        self.rejected = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _retry_in(self, now: float) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - now)
+
+    def _before_call(self) -> bool:
+        """Lève CircuitOpenError si l'appel doit être refusé ; True si c'est un test."""
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return False
+
+            now = time.monotonic()
+            if self.state == STATE_OPEN and self._retry_in(now) <= 0:
+                self.state = STATE_HALF_OPEN
+                self._probing = False
+
+            if self.state == STATE_HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+
+            self.rejected += 1
+            # message stable (pas de compte à rebours) : il entre dans l'ETag
+            raise CircuitOpenError(
+                f"service indisponible (circuit ouvert après {self.failures} échecs)"
+                f" — dernière erreur : {self.last_error}"
+            )
+
+    def _on_success(self) -> None:
+        with self._lock:
+            self.state = STATE_CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def _on_failure(self, error: BaseException) -> None:
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error) or error.__class__.__name__
+            if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = STATE_OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def _on_ignored(self) -> None:
+        with self._lock:
+            self._probing = False
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        self._before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            if is_provider_failure(e):
+                self._on_failure(e)
+            else:
+                self._on_ignored()
+            raise
+        self._on_success()
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self.state,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "retry_in_s": int(self._retry_in(time.monotonic())) if self.state == STATE_OPEN else 0,
+                "last_error": self.last_error,
+            }
+
+    def _reset_lock(self) -> None:
+        self._lock = threading.Lock()
+        self._probing = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Disjoncteur (unique par process) nommé `name`, créé au premier appel."""
+    breaker = _breakers.get(name)
+    if breaker is not None:
+        return breaker
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name)
+            _breakers[name] = breaker
+        return breaker
+
+
+def breaker_states() -> List[Dict[str, Any]]:
+    """État de tous les disjoncteurs connus (page de statut)."""
+    return [b.status() for b in list(_breakers.values())]
+
+
+def open_circuits() -> List[Dict[str, Any]]:
+    """Seulement les disjoncteurs ouverts ou en test (bloc d'erreurs de l'UI)."""
+    return [s for s in breaker_states() if s["state"] != STATE_CLOSED]
+
+
+def _after_fork_in_child() -> None:
+    global _breakers_lock
+    _breakers_lock = threading.Lock()
+    for breaker in _breakers.values():
+        breaker._reset_lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
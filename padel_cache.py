@@ -0,0 +1,291 @@
+# padel_cache.py
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from padel_http import ProviderQueueTimeout, SearchDeadlineExceeded
+
+
+# =====================================================
+# ⚙️ CONFIG CACHE
+# =====================================================
+
+# Durée de vie d'une journée fournisseur en cache (index, secondes)
+PROVIDER_CACHE_TTL = 120
+
+# Stale-while-revalidate : entre TTL et cette limite, on sert la donnée
+# périmée tout de suite et on la rafraîchit en arrière-plan ; au-delà,
+# la requête attend le fournisseur.
+PROVIDER_CACHE_STALE_MAX = 15 * 60
+
+# Dernière donnée valide gardée pour les pannes fournisseur : si le fetch
+# bloquant échoue, on la sert (marquée périmée) plutôt qu'une erreur.
+PROVIDER_CACHE_LAST_GOOD_MAX = 6 * 3600
+
+# Threads de rafraîchissement en arrière-plan
+PROVIDER_REFRESH_WORKERS = 2
+
+# Nombre max de journées (provider, club, date) gardées en mémoire
+PROVIDER_CACHE_MAX_ENTRIES = 256
+
+
+# =====================================================
+# 🗃️ CACHE TTL + LRU
+# =====================================================
+
+class TTLCache:
+    """
+    Petit cache thread-safe : expiration par TTL + éviction LRU.
+
+    Les entrées expirées restent lisibles via get_entry() jusqu'à
+    `max_age` (stale-while-revalidate, dernière donnée valide).
+
+    Les valeurs sont partagées telles quelles entre les appelants :
+    elles doivent être traitées en lecture seule.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_age: Optional[float] = None):
+        self.ttl = ttl
+        self.max_age = max(ttl, max_age or ttl)
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Valeur fraîche (âge <= ttl) ou `default`."""
+        entry = self.get_entry(key)
+        if entry is None or entry[1] > self.ttl:
+            self.record("misses")
+            return default
+        self.record("hits")
+        return entry[0]
+
+    def record(self, outcome: str) -> None:
+        """Compte un accès : "hits", "misses" ou "stale_hits"."""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def get_entry(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """(valeur, âge en secondes) même périmée, ou None au-delà de max_age."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            age = now - stored_at
+            if age > self.max_age:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value, age
+
+    def set(self, key: Hashable, value: Any, age: float = 0.0) -> None:
+        """`age` : âge déjà atteint par la valeur (ex. lue dans le cache partagé)."""
+        with self._lock:
+            self._data[key] = (time.monotonic() - age, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.stale_hits = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+            }
+
+    def _reset_lock(self) -> None:
+        self._lock = threading.Lock()
+
+
+log = logging.getLogger(__name__)
+
+provider_cache = TTLCache(PROVIDER_CACHE_TTL, PROVIDER_CACHE_MAX_ENTRIES, PROVIDER_CACHE_LAST_GOOD_MAX)
+
+
+def store_cached(provider: str, club: str, date_iso: str, value: Any, age: float = 0.0) -> None:
+    """Remplace l'entrée (provider, club, date) — utilisé par le rafraîchissement."""
+    provider_cache.set((provider, club, date_iso), value, age)
+
+
+# =====================================================
+# 🤝 COALESCENCE DES FETCHS EN VOL (single-flight)
+# =====================================================
+
+class SingleFlight:
+    """
+    Un seul appel en vol par clé : le premier appelant exécute `fn`, les
+    appelants concurrents attendent le même Future et partagent son
+    résultat (ou son exception).
+
+    Les exceptions `unshared` ne disent rien de l'appel lui-même mais de
+    son meneur (échéance de recherche, attente limiteur bornée par elle) :
+    les suivants ne les reçoivent pas et relancent l'appel, avec leur
+    propre échéance.
+    """
+
+    def __init__(self, unshared: Tuple[type, ...] = ()):
+        self.unshared = unshared
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self.calls = 0   # appels réellement exécutés
+        self.saved = 0   # appels évités (appelants qui ont attendu un autre)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        while True:
+            with self._lock:
+                fut = self._inflight.get(key)
+                if fut is not None:
+                    self.saved += 1
+                    leader = False
+                else:
+                    fut = Future()
+                    self._inflight[key] = fut
+                    self.calls += 1
+                    leader = True
+
+            if leader:
+                break
+            try:
+                return fut.result()
+            except self.unshared:
+                with self._lock:
+                    self.saved -= 1
+
+        try:
+            result = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "saved": self.saved, "inflight": len(self._inflight)}
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+
+upstream_flights = SingleFlight(unshared=(SearchDeadlineExceeded, ProviderQueueTimeout))
+
+
+def coalesced(provider: str, club: str, date_iso: str, fn: Callable[[], Any]) -> Any:
+    """Exécute `fn` en single-flight sur la clé (provider, club, date)."""
+    return upstream_flights.do((provider, club, date_iso), fn)
+
+
+# =====================================================
+# ♻️ STALE-WHILE-REVALIDATE
+# =====================================================
+
+_refresh_pool: Optional[ThreadPoolExecutor] = None
+_refreshing: set = set()
+_refresh_lock = threading.Lock()
+
+
+def _refresh_in_background(key: Tuple[str, str, str], load_fn: Callable[[], Tuple[Any, float]]) -> None:
+    """Lance au plus un rafraîchissement à la fois par clé."""
+    global _refresh_pool
+
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+        if _refresh_pool is None:
+            _refresh_pool = ThreadPoolExecutor(
+                max_workers=PROVIDER_REFRESH_WORKERS,
+                thread_name_prefix="padel-refresh",
+            )
+        pool = _refresh_pool
+
+    def run():
+        try:
+            value, age = load_fn()
+            provider_cache.set(key, value, age)
+        except Exception as e:
+            log.warning("Rafraîchissement %s %s %s : %s", *key, e)
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+
+    pool.submit(run)
+
+
+def cached_swr(
+    provider: str,
+    club: str,
+    date_iso: str,
+    load_fn: Callable[[], Tuple[Any, float]],
+) -> Tuple[Any, float]:
+    """
+    Lecture stale-while-revalidate. `load_fn()` renvoie (valeur, âge) ;
+    cached_swr renvoie aussi (valeur, âge en secondes) :
+      - âge <= PROVIDER_CACHE_TTL : valeur fraîche
+      - âge <= PROVIDER_CACHE_STALE_MAX : valeur périmée servie tout de
+        suite, `load_fn` relancé en arrière-plan
+      - sinon : `load_fn()` bloquant ; s'il échoue, la dernière valeur
+        valide (<= PROVIDER_CACHE_LAST_GOOD_MAX) est servie à la place
+    """
+    key = (provider, club, date_iso)
+    entry = provider_cache.get_entry(key)
+
+    if entry is not None:
+        value, age = entry
+        if age <= PROVIDER_CACHE_TTL:
+            provider_cache.record("hits")
+            return value, age
+        if age <= PROVIDER_CACHE_STALE_MAX:
+            provider_cache.record("stale_hits")
+            _refresh_in_background(key, load_fn)
+            return value, age
+
+    provider_cache.record("misses")
+    try:
+        value, age = load_fn()
+    except Exception:
+        if entry is not None:
+            # panne fournisseur : dernière donnée valide plutôt qu'une erreur
+            provider_cache.record("stale_hits")
+            return entry
+        raise
+
+    provider_cache.set(key, value, age)
+    return value, age
+
+
+def _after_fork_in_child() -> None:
+    global _refresh_pool, _refresh_lock
+    provider_cache._reset_lock()
+    upstream_flights._reset()
+    _refresh_pool = None
+    _refresh_lock = threading.Lock()
+    _refreshing.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
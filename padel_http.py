@@ -0,0 +1,512 @@
+# padel_http.py
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from padel_profile import profile_thread
+from padel_trace import propagate, record_span, span, tracing
+
+
+# =====================================================
+# ⚙️ CONFIG HTTP
+# =====================================================
+
+# Taille des pools keep-alive (par hôte). Doit couvrir le nombre de
+# recherches concurrentes d'un worker (threads gunicorn x jobs par hôte).
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 16
+
+# Limites sortantes par hôte fournisseur :
+#   rate : requêtes / seconde en régime établi (token bucket)
+#   burst : taille du seau (rafale autorisée)
+#   max_in_flight : requêtes simultanées max vers l'hôte
+PROVIDER_LIMITS: Dict[str, Dict[str, float]] = {
+    "api-v3.doinsport.club": {"rate": 5.0, "burst": 10, "max_in_flight": 6},
+    "rpadel-arena.mymobileapp.fr": {"rate": 2.0, "burst": 4, "max_in_flight": 2},
+    "padelshot-fr.matchpoint.com.es": {"rate": 2.0, "burst": 4, "max_in_flight": 2},
+}
+DEFAULT_PROVIDER_LIMIT = {"rate": 5.0, "burst": 10, "max_in_flight": 4}
+
+# Attente max dans la file d'un hôte avant d'abandonner (secondes)
+PROVIDER_QUEUE_TIMEOUT = 10.0
+
+# Hedging : si la requête n'a pas répondu après le percentile HEDGE_PERCENTILE
+# des latences récentes de l'hôte, on envoie un doublon et on garde la
+# première réponse. PADEL_HEDGE=0 pour désactiver.
+HEDGE_ENABLED = os.environ.get("PADEL_HEDGE", "1") == "1"
+HEDGE_PERCENTILE = 0.95
+HEDGE_SAMPLES = 200        # latences gardées par hôte
+HEDGE_MIN_SAMPLES = 20     # en dessous : HEDGE_INITIAL_DELAY
+HEDGE_INITIAL_DELAY = 1.0
+HEDGE_MIN_DELAY = 0.1
+HEDGE_MAX_DELAY = 3.0
+HEDGE_WORKERS = 16        # requêtes déjà parties seulement (créneau pris avant)
+
+
+# =====================================================
+# 🚦 LIMITEUR PAR HÔTE
+# =====================================================
+
+class ProviderQueueTimeout(RuntimeError):
+    """La file d'attente vers un fournisseur est restée saturée trop longtemps."""
+
+
+class SearchDeadlineExceeded(RuntimeError):
+    """Le budget de temps de la recherche en cours est épuisé."""
+
+
+class ProviderLimiter:
+    """
+    Token bucket + sémaphore "max en vol" pour un hôte fournisseur.
+    Mesure le temps passé en file d'attente (total, max, nb d'acquisitions).
+    """
+
+    def __init__(self, host: str, rate: float, burst: float, max_in_flight: int):
+        self.host = host
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_in_flight = int(max_in_flight)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self.acquired = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.in_flight = 0
+
+    def _take_token(self) -> float:
+        """Consomme un jeton si possible ; sinon renvoie l'attente nécessaire."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def acquire(self, timeout: float = PROVIDER_QUEUE_TIMEOUT) -> float:
+        """Bloque jusqu'à obtenir un créneau + un jeton. Renvoie l'attente (s)."""
+        start = time.monotonic()
+        deadline = start + timeout
+
+        if not self._slots.acquire(timeout=timeout):
+            raise ProviderQueueTimeout(f"{self.host} : trop de requêtes en cours")
+
+        try:
+            while True:
+                wait = self._take_token()
+                if wait <= 0:
+                    break
+                if time.monotonic() + wait > deadline:
+                    raise ProviderQueueTimeout(f"{self.host} : limite de débit atteinte")
+                time.sleep(wait)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self.acquired += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self.in_flight += 1
+        return waited
+
+    def try_acquire(self) -> bool:
+        """Créneau + jeton seulement s'ils sont disponibles tout de suite."""
+        if not self._slots.acquire(blocking=False):
+            return False
+        if self._take_token() > 0:
+            self._slots.release()
+            return False
+        with self._lock:
+            self.acquired += 1
+            self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "host": self.host,
+                "rate": self.rate,
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self.in_flight,
+                "acquired": self.acquired,
+                "wait_total_s": round(self.wait_total, 4),
+                "wait_avg_s": round(self.wait_total / self.acquired, 4) if self.acquired else 0.0,
+                "wait_max_s": round(self.wait_max, 4),
+            }
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(url: str) -> ProviderLimiter:
+    """Limiteur (unique par process) de l'hôte de `url`."""
+    host = host_of(url)
+    limiter = _limiters.get(host)
+    if limiter is not None:
+        return limiter
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            conf = PROVIDER_LIMITS.get(host, DEFAULT_PROVIDER_LIMIT)
+            limiter = ProviderLimiter(host, conf["rate"], conf["burst"], int(conf["max_in_flight"]))
+            _limiters[host] = limiter
+        return limiter
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats de file d'attente par hôte (pour régler débit vs politesse)."""
+    return {host: lim.stats() for host, lim in list(_limiters.items())}
+
+
+# =====================================================
+# ⏱️ ÉCHÉANCE DE LA RECHERCHE EN COURS
+# =====================================================
+
+_deadline = threading.local()
+
+
+@contextmanager
+def request_deadline(deadline: Optional[float]) -> Iterator[None]:
+    """
+    Échéance (time.monotonic()) des requêtes HTTP faites par ce thread :
+    chaque requête n'a plus que le temps restant (timeout et file d'attente).
+    None = pas d'échéance.
+    """
+    previous = getattr(_deadline, "at", None)
+    _deadline.at = deadline
+    try:
+        yield
+    finally:
+        _deadline.at = previous
+
+
+def remaining_time() -> Optional[float]:
+    """Secondes restantes avant l'échéance du thread, ou None."""
+    deadline = getattr(_deadline, "at", None)
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def _queue_timeout(remaining: Optional[float]) -> float:
+    """Attente max dans la file d'un hôte, bornée par le temps restant."""
+    if remaining is None:
+        return PROVIDER_QUEUE_TIMEOUT
+    if remaining <= 0:
+        raise SearchDeadlineExceeded("budget de recherche épuisé")
+    return min(PROVIDER_QUEUE_TIMEOUT, remaining)
+
+
+class LimitedSession(requests.Session):
+    """
+    Session dont chaque requête passe par le limiteur de son hôte, et dont
+    le timeout est raccourci au temps restant si une échéance est posée.
+    """
+
+    def request(self, method, url, *args, acquired=False, **kwargs):
+        """`acquired=True` : le créneau du limiteur est déjà pris (hedging)."""
+        limiter = get_limiter(url)
+        remaining = remaining_time()
+        clamped = False
+        try:
+            queue_timeout = _queue_timeout(remaining)
+        except SearchDeadlineExceeded:
+            if acquired:
+                limiter.release()
+            raise
+        if remaining is not None:
+            timeout = kwargs.get("timeout")
+            if timeout is None or (isinstance(timeout, (int, float)) and timeout > remaining):
+                kwargs["timeout"] = remaining
+                clamped = True
+
+        if tracing():
+            return self._traced_request(limiter, acquired, queue_timeout, clamped, method, url, *args, **kwargs)
+
+        if not acquired:
+            limiter.acquire(timeout=queue_timeout)
+        try:
+            return super().request(method, url, *args, **kwargs)
+        except requests.Timeout as e:
+            if clamped:
+                raise SearchDeadlineExceeded("budget de recherche épuisé") from e
+            raise
+        finally:
+            limiter.release()
+
+    def _traced_request(self, limiter, acquired, queue_timeout, clamped, method, url, *args, **kwargs):
+        """
+        Même chose avec spans : attente limiteur, puis "ttfb" (DNS + connexion
+        + attente serveur, jusqu'aux en-têtes : resp.elapsed) et "transfer"
+        (lecture du corps). requests ne sépare pas DNS et connexion.
+        """
+        with span(f"http {method} {limiter.host}", url=url.split("?", 1)[0]) as sp:
+            waited = 0.0 if acquired else limiter.acquire(timeout=queue_timeout)
+            sp.set(queue_wait_ms=round(waited * 1000, 2), hedge=acquired)
+            start = time.perf_counter()
+            try:
+                resp = super().request(method, url, *args, **kwargs)
+            except requests.Timeout as e:
+                if clamped:
+                    raise SearchDeadlineExceeded("budget de recherche épuisé") from e
+                raise
+            finally:
+                limiter.release()
+            end = time.perf_counter()
+            ttfb = min(resp.elapsed.total_seconds(), end - start)
+            record_span("ttfb", start, start + ttfb)
+            record_span("transfer", start + ttfb, end, bytes=len(resp.content))
+            sp.set(status=resp.status_code)
+            return resp
+
+
+# =====================================================
+# 🪂 REQUÊTES DOUBLÉES (hedging)
+# =====================================================
+
+class HostHedging:
+    """
+    Latences récentes d'un hôte (seuil de hedging adaptatif) et compteurs :
+    requêtes, doublons envoyés, doublons gagnants, doublons refusés par le
+    limiteur.
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self._latencies: Deque[float] = deque(maxlen=HEDGE_SAMPLES)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.wins = 0
+        self.skipped = 0
+
+    def observe(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def threshold(self) -> float:
+        """Délai avant doublon : percentile HEDGE_PERCENTILE des latences récentes."""
+        with self._lock:
+            if len(self._latencies) < HEDGE_MIN_SAMPLES:
+                return HEDGE_INITIAL_DELAY
+            ordered = sorted(self._latencies)
+        value = ordered[min(len(ordered) - 1, int(len(ordered) * HEDGE_PERCENTILE))]
+        return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, value))
+
+    def stats(self) -> Dict[str, Any]:
+        threshold = self.threshold()
+        with self._lock:
+            return {
+                "host": self.host,
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "wins": self.wins,
+                "skipped": self.skipped,
+                "hedge_rate": round(self.hedged / self.requests, 4) if self.requests else 0.0,
+                "threshold_s": round(threshold, 3),
+            }
+
+
+_hedging: Dict[str, HostHedging] = {}
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_lock = threading.Lock()
+
+
+def _host_hedging(host: str) -> HostHedging:
+    with _hedge_lock:
+        hedging = _hedging.get(host)
+        if hedging is None:
+            hedging = HostHedging(host)
+            _hedging[host] = hedging
+        return hedging
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _hedge_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="padel-hedge")
+        return _hedge_pool
+
+
+def _discard(fut) -> None:
+    """Ferme la réponse perdante quand elle finit par arriver."""
+    if not fut.cancelled() and fut.exception() is None:
+        fut.result().close()
+
+
+def hedged_request(session: requests.Session, method: str, url: str, **kwargs) -> requests.Response:
+    """
+    session.request(method, url, **kwargs) avec hedging : si la réponse
+    tarde au-delà du seuil adaptatif de l'hôte, un doublon part (seulement
+    si le limiteur a un créneau et un jeton libres tout de suite) et la
+    première réponse arrivée est renvoyée.
+
+    Le créneau du limiteur de la requête principale est pris dans le thread
+    appelant, avant de passer au pool : le pool ne contient que des requêtes
+    déjà parties (au plus max_in_flight par hôte), un hôte saturé ne peut
+    donc pas y bloquer les autres. Le seuil et les latences mesurées partent
+    de ce créneau : l'attente en file n'est pas une lenteur de l'hôte.
+    """
+    if not HEDGE_ENABLED or not isinstance(session, LimitedSession):
+        return session.request(method, url, **kwargs)
+
+    hedging = _host_hedging(host_of(url))
+    limiter = get_limiter(url)
+    deadline = getattr(_deadline, "at", None)
+
+    with span(f"queue {limiter.host}") as sp:
+        waited = limiter.acquire(timeout=_queue_timeout(remaining_time()))
+        if sp is not None:
+            sp.set(queue_wait_ms=round(waited * 1000, 2))
+
+    def attempt(backup: bool) -> requests.Response:
+        start = time.monotonic()
+        with request_deadline(deadline), profile_thread(), span("hedge backup" if backup else "hedge primary"):
+            resp = session.request(method, url, acquired=True, **kwargs)
+        hedging.observe(time.monotonic() - start)
+        return resp
+
+    hedging.count("requests")
+    pool = _get_hedge_pool()
+    try:
+        primary = pool.submit(propagate(attempt), False)
+    except BaseException:
+        limiter.release()
+        raise
+
+    delay = hedging.threshold()
+    remaining = remaining_time()
+    if remaining is not None:
+        delay = min(delay, max(0.0, remaining))
+    done, _ = wait([primary], timeout=delay)
+    if done or (remaining is not None and remaining <= delay):
+        return primary.result()
+
+    if not limiter.try_acquire():
+        hedging.count("skipped")
+        return primary.result()
+
+    hedging.count("hedged")
+    backup = pool.submit(propagate(attempt), True)
+
+    error: Optional[BaseException] = None
+    for fut in as_completed([primary, backup]):
+        try:
+            resp = fut.result()
+        except Exception as e:
+            error = e
+            continue
+        if fut is backup:
+            hedging.count("wins")
+        other = primary if fut is backup else backup
+        other.add_done_callback(_discard)
+        return resp
+    raise error
+
+
+def hedge_stats() -> Dict[str, Dict[str, Any]]:
+    """Taux de hedging et seuil courant par hôte."""
+    with _hedge_lock:
+        hosts = list(_hedging.values())
+    return {h.host: h.stats() for h in hosts}
+
+
+# =====================================================
+# 🌐 SESSIONS PAR HÔTE
+# =====================================================
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def host_of(url: str) -> str:
+    """'https://api-v3.doinsport.club/clubs/...' -> 'api-v3.doinsport.club'."""
+    return urlsplit(url).netloc or url
+
+
+def _new_session() -> requests.Session:
+    session = LimitedSession()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Renvoie la session longue durée associée à l'hôte de `url`.
+
+    Une seule session (et donc un seul pool de connexions keep-alive)
+    par hôte fournisseur et par process, partagée entre les requêtes Flask.
+    Chaque requête passe par le limiteur de l'hôte (débit + max en vol).
+    """
+    host = host_of(url)
+    session = _sessions.get(host)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _new_session()
+            _sessions[host] = session
+        return session
+
+
+def reset_sessions() -> None:
+    """Ferme et oublie toutes les sessions (tests, rotation de cookies...)."""
+    with _sessions_lock:
+        old = list(_sessions.values())
+        _sessions.clear()
+    for session in old:
+        try:
+            session.close()
+        except Exception:
+            pass
+
+
+def _after_fork_in_child() -> None:
+    """
+    Après un fork (workers gunicorn avec --preload), les sockets du parent
+    ne doivent pas être partagées : on repart de sessions vierges.
+    """
+    global _sessions_lock, _limiters_lock, _hedge_lock, _hedge_pool
+    _sessions_lock = threading.Lock()
+    _sessions.clear()
+    _limiters_lock = threading.Lock()
+    _limiters.clear()
+    _hedge_lock = threading.Lock()
+    _hedge_pool = None
+    _hedging.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,263 @@
+# padel_index.py
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Modes de requête sur l'index
+MATCH_EXACT = "exact"    # le créneau doit commencer exactement à min_from
+MATCH_WINDOW = "window"  # le créneau peut commencer n'importe où dans [min_from, min_to]
+
+MATCH_MODES = (MATCH_EXACT, MATCH_WINDOW)
+
+# Bitmaps : une journée = 288 cases de 5 minutes, stockées dans un int
+# (bit i = minutes [5i, 5i+5)). Les opérations &, |, >> sont faites en C
+# sur tout le bitmap d'un coup, quelle que soit la taille de la journée.
+CELL_MIN = 5
+CELLS_PER_DAY = 24 * 60 // CELL_MIN
+FULL_DAY_MASK = (1 << CELLS_PER_DAY) - 1
+
+
+# =====================================================
+# 🧮 BITMAPS 5 MINUTES
+# =====================================================
+
+def _clamp_cell(cell: int) -> int:
+    return max(0, min(CELLS_PER_DAY, cell))
+
+
+def cells_mask(first_cell: int, last_cell: int) -> int:
+    """Bits [first_cell, last_cell) à 1."""
+    first_cell = _clamp_cell(first_cell)
+    last_cell = _clamp_cell(last_cell)
+    if last_cell <= first_cell:
+        return 0
+    return ((1 << (last_cell - first_cell)) - 1) << first_cell
+
+
+def mask_covering(start_min: int, end_min: int) -> int:
+    """Toutes les cases touchées par [start_min, end_min) (pour l'occupé)."""
+    return cells_mask(start_min // CELL_MIN, -(-end_min // CELL_MIN))
+
+
+def mask_within(start_min: int, end_min: int) -> int:
+    """Seulement les cases entièrement dans [start_min, end_min) (pour le libre)."""
+    return cells_mask(-(-start_min // CELL_MIN), end_min // CELL_MIN)
+
+
+def is_aligned(minutes: int) -> bool:
+    return minutes % CELL_MIN == 0
+
+
+def run_starts(mask: int, duration_min: int) -> int:
+    """
+    Cases i telles que les `duration_min` minutes à partir de i sont toutes
+    à 1 dans `mask` (ET de décalages, par doublement : O(log n) opérations).
+    """
+    cells = -(-duration_min // CELL_MIN)
+    if cells <= 0:
+        return mask
+    result = mask
+    span = 1
+    # invariant : bit i de result <=> cases [i, i + span) toutes à 1
+    while span * 2 <= cells:
+        result &= result >> span
+        span *= 2
+    if span < cells:
+        result &= result >> (cells - span)
+    return result
+
+
+def at_least_k(masks: List[int], k: int) -> int:
+    """Cases où au moins k des bitmaps sont à 1 (seuil par programmation dynamique)."""
+    if k <= 0:
+        return FULL_DAY_MASK
+    if k > len(masks):
+        return 0
+    # levels[j] = cases couvertes par au moins j bitmaps parmi ceux vus
+    levels = [FULL_DAY_MASK] + [0] * k
+    for m in masks:
+        for j in range(k, 0, -1):
+            levels[j] |= levels[j - 1] & m
+    return levels[k]
+
+
+def mask_to_minutes(mask: int) -> List[int]:
+    """Débuts (en minutes) des cases à 1."""
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append((low.bit_length() - 1) * CELL_MIN)
+        mask ^= low
+    return out
+
+
+# =====================================================
+# 🎾 TERRAIN : intervalles occupés
+# =====================================================
+
+def _merge_interval(intervals: List[Tuple[int, int]], start_min: int, end_min: int) -> None:
+    """Insère [start_min, end_min) dans une liste triée d'intervalles disjoints (fusion)."""
+    if end_min <= start_min:
+        return
+    i = bisect_left(intervals, (start_min, end_min))
+    # fusion avec le voisin de gauche s'il chevauche / touche
+    if i > 0 and intervals[i - 1][1] >= start_min:
+        i -= 1
+        start_min = intervals[i][0]
+        end_min = max(end_min, intervals[i][1])
+    j = i
+    while j < len(intervals) and intervals[j][0] <= end_min:
+        end_min = max(end_min, intervals[j][1])
+        j += 1
+    intervals[i:j] = [(start_min, end_min)]
+
+
+class CourtDay:
+    """
+    Occupation d'un terrain sur une journée (minutes depuis minuit) :
+      - busy : réservations connues (Padelshot)
+      - bookable : union des créneaux proposés
+    Chaque liste est triée, disjointe et fusionnée à l'insertion, et
+    doublée d'un bitmap 5 minutes (busy_mask / bookable_mask).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.busy: List[Tuple[int, int]] = []
+        self.bookable: List[Tuple[int, int]] = []
+        self.busy_mask = 0
+        self.bookable_mask = 0
+        # vrai tant que tous les horaires occupés tombent sur des cases entières
+        self._busy_aligned = True
+
+    def add_busy(self, start_min: int, end_min: int) -> None:
+        _merge_interval(self.busy, start_min, end_min)
+        self.busy_mask |= mask_covering(start_min, end_min)
+        if not (is_aligned(start_min) and is_aligned(end_min)):
+            self._busy_aligned = False
+
+    def add_bookable(self, start_min: int, end_min: int) -> None:
+        _merge_interval(self.bookable, start_min, end_min)
+        self.bookable_mask |= mask_within(start_min, end_min)
+
+    @property
+    def free_mask(self) -> int:
+        """Cases proposées et non occupées."""
+        return self.bookable_mask & ~self.busy_mask
+
+    def is_free(self, start_min: int, end_min: int) -> bool:
+        """Vrai si aucun intervalle occupé ne chevauche [start_min, end_min)."""
+        if self._busy_aligned and is_aligned(start_min) and is_aligned(end_min):
+            return not (self.busy_mask & mask_covering(start_min, end_min))
+        # horaires hors grille 5 min : test exact sur les intervalles
+        # seul candidat : le dernier intervalle qui commence avant end_min
+        i = bisect_left(self.busy, (end_min,))
+        return i == 0 or self.busy[i - 1][1] <= start_min
+
+    def free_starts(self, duration_min: int) -> List[int]:
+        """Débuts possibles d'un créneau libre de `duration_min` minutes."""
+        return mask_to_minutes(run_starts(self.free_mask, duration_min))
+
+
+# =====================================================
+# 📚 INDEX D'UNE JOURNÉE FOURNISSEUR
+# =====================================================
+
+class DayIndex:
+    """
+    Toutes les offres réservables d'une journée fournisseur, normalisées
+    une seule fois puis interrogées par fenêtre.
+
+    Chaque offre est un dict créneau au format de sortie du fournisseur
+    (au minimum "startAt", "start_min", "duration_min"), trié par
+    (start_min, duration_min). Une liste parallèle des débuts permet de
+    trouver les offres d'une plage horaire par bissection.
+    """
+
+    def __init__(self, club_name: str):
+        self.club_name = club_name
+        self.courts: Dict[str, CourtDay] = {}
+        self._offers: List[Dict[str, Any]] = []
+        self._starts: List[int] = []
+        self._sorted = True
+
+    def court(self, name: str) -> CourtDay:
+        court = self.courts.get(name)
+        if court is None:
+            court = CourtDay(name)
+            self.courts[name] = court
+        return court
+
+    def add_offer(self, slot: Dict[str, Any]) -> None:
+        self._offers.append(slot)
+        self._sorted = False
+
+    def _ensure_sorted(self) -> None:
+        if self._sorted:
+            return
+        # tri stable : à début/durée égaux, l'ordre du fournisseur est gardé
+        self._offers.sort(key=lambda x: (x["start_min"], x["duration_min"]))
+        self._starts = [o["start_min"] for o in self._offers]
+        self._sorted = True
+
+    def courts_free_together(self, k: int, duration_min: int) -> List[int]:
+        """
+        Débuts (minutes) où au moins `k` terrains sont libres simultanément
+        pendant `duration_min` minutes.
+        """
+        masks = [run_starts(c.free_mask, duration_min) for c in self.courts.values()]
+        return mask_to_minutes(at_least_k(masks, k))
+
+    def finalize(self) -> "DayIndex":
+        """À appeler une fois l'index rempli, avant de le partager entre threads."""
+        self._ensure_sorted()
+        return self
+
+    def offers(self) -> List[Dict[str, Any]]:
+        self._ensure_sorted()
+        return list(self._offers)
+
+    def query(
+        self,
+        min_from: int,
+        min_to: int,
+        allowed_durations_set: Optional[set] = None,
+        mode: str = MATCH_EXACT,
+    ) -> List[Dict[str, Any]]:
+        """
+        Créneaux qui tiennent dans [min_from, min_to] avec une durée autorisée.
+
+        - MATCH_EXACT : début == min_from (comportement historique)
+        - MATCH_WINDOW : début n'importe où dans [min_from, min_to]
+        """
+        self._ensure_sorted()
+
+        lo = bisect_left(self._starts, min_from)
+        if mode == MATCH_EXACT:
+            hi = bisect_right(self._starts, min_from)
+        else:
+            hi = bisect_right(self._starts, min_to)
+
+        out = []
+        for slot in self._offers[lo:hi]:
+            duration_min = slot["duration_min"]
+            if allowed_durations_set and duration_min not in allowed_durations_set:
+                continue
+            if slot["start_min"] + duration_min > min_to:
+                continue
+            out.append(dict(slot))
+        return out
+
+    def result(
+        self,
+        min_from: int,
+        min_to: int,
+        allowed_durations_set: Optional[set] = None,
+        mode: str = MATCH_EXACT,
+    ) -> Dict[str, Any]:
+        """Résultat au format historique { "club_name": ..., "slots": [...] }."""
+        return {
+            "club_name": self.club_name,
+            "slots": self.query(min_from, min_to, allowed_durations_set, mode),
+        }
@@ -2,8 +2,30 @@
 
 import requests
 from bs4 import BeautifulSoup
+import os
 import re
-from typing import List, Dict, Any, Tuple, Optional
+import threading
+import time
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed, wait
+from typing import List, Dict, Any, Tuple, Optional, Callable, Iterator
+
+from padel_breaker import CircuitOpenError, get_breaker, open_circuits
+from padel_cache import PROVIDER_CACHE_TTL, cached_swr, coalesced, store_cached
+from padel_http import (PROVIDER_LIMITS, ProviderQueueTimeout, SearchDeadlineExceeded, get_session, hedged_request,
+                        host_of, request_deadline)
+from padel_index import CELL_MIN, DayIndex, MATCH_EXACT, MATCH_MODES, MATCH_WINDOW
+from padel_metrics import ERRORS, FETCH_SECONDS, FILTER_SECONDS, PARSE_SECONDS, SLOTS
+from padel_shared_cache import shared_cache, shared_key
+from padel_profile import profile_thread
+from padel_trace import propagate, span, traced
+
+try:
+    from lxml import etree as lxml_etree
+    from lxml import html as lxml_html
+except ImportError:  # repli sur BeautifulSoup
+    lxml_etree = None
+    lxml_html = None
 
 
 # =====================================================
@@ -43,13 +65,18 @@ DOINSPORT_HEADERS = {
     "Content-Language": "fr",
 }
 
-DOINSPORT_BASE_URL = "https://api-v3.doinsport.club/clubs/playgrounds/plannings/{date}"
+# Racines des API fournisseurs, surchargeables pour viser un serveur de
+# simulation (bench/mock_upstream.py) : PADEL_DOINSPORT_URL, PADEL_RPADEL_URL,
+# PADEL_PADELSHOT_URL
+DOINSPORT_API_URL = os.environ.get("PADEL_DOINSPORT_URL", "https://api-v3.doinsport.club").rstrip("/")
+DOINSPORT_BASE_URL = DOINSPORT_API_URL + "/clubs/playgrounds/plannings/{date}"
 
 # =====================================================
 # 🎾 CONFIG R PADEL ARENA (mymobileapp.fr)
 # =====================================================
 
-RPADEL_URL = "https://rpadel-arena.mymobileapp.fr/loadcalendrier_capsule_regroupe.asp"
+RPADEL_SITE_URL = os.environ.get("PADEL_RPADEL_URL", "https://rpadel-arena.mymobileapp.fr").rstrip("/")
+RPADEL_URL = RPADEL_SITE_URL + "/loadcalendrier_capsule_regroupe.asp"
 
 RPADEL_ID_SPORT = "2"     # padel
 
@@ -64,19 +91,22 @@ RPADEL_HEADERS = {
     "Accept": "text/html, */*; q=0.01",
     "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
     "X-Requested-With": "XMLHttpRequest",
-    "Origin": "https://rpadel-arena.mymobileapp.fr",
-    "Referer": "https://rpadel-arena.mymobileapp.fr/",
+    "Origin": RPADEL_SITE_URL,
+    "Referer": RPADEL_SITE_URL + "/",
 }
 
 RPADEL_COOKIES = {
     # si besoin tu peux mettre des cookies ici, souvent pas nécessaire
 }
 
+# Moteur de parsing du calendrier : "lxml" (rapide) ou "soup" (BeautifulSoup)
+RPADEL_PARSER = "lxml"
+
 # =====================================================
 # 🎾 CONFIG PADELSHOT (Matchpoint)
 # =====================================================
 
-PADELSHOT_BASE_URL = "https://padelshot-fr.matchpoint.com.es"
+PADELSHOT_BASE_URL = os.environ.get("PADEL_PADELSHOT_URL", "https://padelshot-fr.matchpoint.com.es").rstrip("/")
 PADELSHOT_ID_CUADRO = "4"  # Padel Caen Mondeville
 
 PADELSHOT_HEADERS_HTML = {
@@ -93,6 +123,46 @@ PADELSHOT_HEADERS_JSON = {
     "Referer": f"{PADELSHOT_BASE_URL}/Booking/grid.aspx",
 }
 
+# Durée de réutilisation de la clé dynamique (et des cookies associés)
+PADELSHOT_KEY_TTL = 600
+
+# Statuts HTTP par lesquels ObtenerCuadro refuse la clé (les autres erreurs,
+# 5xx comprises, ne justifient pas d'aller rechercher une clé)
+PADELSHOT_KEY_REJECTED_STATUS = (401, 403)
+
+# Les limites sortantes (padel_http.PROVIDER_LIMITS, par hôte) suivent les
+# URL configurées : un hôte de simulation garde les limites du vrai fournisseur
+for _url, _host in (
+    (DOINSPORT_API_URL, "api-v3.doinsport.club"),
+    (RPADEL_SITE_URL, "rpadel-arena.mymobileapp.fr"),
+    (PADELSHOT_BASE_URL, "padelshot-fr.matchpoint.com.es"),
+):
+    PROVIDER_LIMITS.setdefault(host_of(_url), PROVIDER_LIMITS[_host])
+
+
+# =====================================================
+# 🚀 CONFIG RECHERCHE
+# =====================================================
+
+# Lance toutes les requêtes fournisseurs en parallèle (False = séquentiel)
+SEARCH_CONCURRENT = True
+
+# Nombre max de threads par recherche (3 clubs Doinsport + R Padel + Padelshot)
+SEARCH_MAX_WORKERS = 5
+
+# Recherche multi-jours : nb de jours par défaut / max, et threads max
+RANGE_DEFAULT_DAYS = 7
+RANGE_MAX_DAYS = 14
+RANGE_MAX_WORKERS = 8
+
+# Budget de bout en bout d'une recherche (secondes, 0 = illimité) : chaque
+# fournisseur n'a que le temps restant, ceux en retard sont signalés
+# "en attente" et la réponse part avec les résultats déjà obtenus.
+SEARCH_BUDGET_S = float(os.environ.get("PADEL_SEARCH_BUDGET", "3"))
+RANGE_BUDGET_S = float(os.environ.get("PADEL_RANGE_BUDGET", "10"))
+
+PENDING_MESSAGE = "délai dépassé, résultat en attente"
+
 
 # =====================================================
 # ⏱️ OUTILS TEMPS
@@ -115,6 +185,49 @@ def minutes_to_hhmm(minutes: int) -> str:
     return f"{h:02d}:{m:02d}"
 
 
+class InvalidSearch(ValueError):
+    """Paramètres de recherche invalides (date, heure) : refusés avant tout fetch."""
+
+
+_ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_HHMM_RE = re.compile(r"^([01]?\d|2[0-3]):([0-5]\d)(:[0-5]\d)?$")
+
+
+def search_param_errors(
+    date_iso: str,
+    window_from: str,
+    window_to: str,
+    end_iso: Optional[str] = None,
+) -> List[str]:
+    """Messages d'erreur (vide si tout est valide) : dates AAAA-MM-JJ, heures HH:MM."""
+    errors = []
+    for label, value in (("Date", date_iso), ("Date de fin", end_iso or None)):
+        if value is None:
+            continue
+        try:
+            if not _ISO_DATE_RE.match(value):
+                raise ValueError
+            date.fromisoformat(value)
+        except ValueError:
+            errors.append(f"{label} invalide : {value!r} (format attendu AAAA-MM-JJ)")
+    for label, value in (("Heure de début", window_from), ("Heure de fin", window_to)):
+        if not _HHMM_RE.match(value or ""):
+            errors.append(f"{label} invalide : {value!r} (format attendu HH:MM)")
+    return errors
+
+
+def check_search_params(
+    date_iso: str,
+    window_from: str,
+    window_to: str,
+    end_iso: Optional[str] = None,
+) -> None:
+    """Lève InvalidSearch si un paramètre est invalide."""
+    errors = search_param_errors(date_iso, window_from, window_to, end_iso)
+    if errors:
+        raise InvalidSearch("; ".join(errors))
+
+
 def iso_to_fr_date(date_iso: str) -> str:
     """Convertit '2025-12-12' -> '12/12/2025'."""
     y, m, d = date_iso.split("-")
@@ -125,12 +238,29 @@ def iso_to_fr_date(date_iso: str) -> str:
 # 🔍 D O I N S P O R T
 # =====================================================
 
+def fetch_doinsport_day(club_conf: Dict[str, Any], target_date_iso: str) -> Dict[str, Any]:
+    """Récupère le planning brut (JSON hydra) d'un club Doinsport pour une date."""
+    url = DOINSPORT_BASE_URL.format(date=target_date_iso)
+    params = {
+        "club.id": club_conf["club_id"],
+        "from": club_conf.get("from", "08:00"),
+        "to": club_conf.get("to", "23:30"),
+        "activities.id": DOINSPORT_ACTIVITY_ID,
+        "bookingType": DOINSPORT_BOOKING_TYPE,
+    }
+
+    resp = hedged_request(get_session(url), "GET", url, headers=DOINSPORT_HEADERS, params=params, timeout=10)
+    resp.raise_for_status()
+    return resp.json()
+
+
 def check_doinsport_club(
     club_conf: Dict[str, Any],
     target_date_iso: str,
     min_from: int,
     min_to: int,
     allowed_durations_set: set,
+    mode: str = MATCH_EXACT,
 ) -> Dict[str, Any]:
     """
     Retourne un dict :
@@ -139,33 +269,21 @@ def check_doinsport_club(
         "slots": [ { startAt, duration_min, terrain, price_pp, participant_count }, ... ]
     }
     en ne gardant que :
-      - startAt == fenêtre début
+      - startAt == fenêtre début (ou dans la fenêtre si mode == MATCH_WINDOW)
       - durée dans allowed_durations_set
       - créneau complètement dans [min_from, min_to]
     """
-    club_name = club_conf["name"]
-    club_id = club_conf["club_id"]
-    from_param = club_conf.get("from", "08:00")
-    to_param = club_conf.get("to", "23:30")
+    return query_source(doinsport_source(club_conf, target_date_iso), min_from, min_to, allowed_durations_set, mode)
 
-    url = DOINSPORT_BASE_URL.format(date=target_date_iso)
-    params = {
-        "club.id": club_id,
-        "from": from_param,
-        "to": to_param,
-        "activities.id": DOINSPORT_ACTIVITY_ID,
-        "bookingType": DOINSPORT_BOOKING_TYPE,
-    }
-
-    resp = requests.get(url, headers=DOINSPORT_HEADERS, params=params, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
 
+def index_doinsport_day(club_name: str, data: Dict[str, Any]) -> DayIndex:
+    """Normalise le planning brut d'un club Doinsport en index de la journée."""
+    index = DayIndex(club_name)
     terrains = data.get("hydra:member", [])
-    slots_out = []
 
     for terrain in terrains:
         terrain_name = terrain.get("name", "Terrain ?")
+        court = index.court(terrain_name)
         activities = terrain.get("activities", [])
 
         if isinstance(activities, dict):
@@ -184,10 +302,6 @@ def check_doinsport_club(
                 if start_min < 0:
                     continue
 
-                # On veut que ça commence EXACTEMENT à la fenêtre
-                if start_min != min_from:
-                    continue
-
                 prices = slot.get("prices", [])
                 for p in prices:
                     if not p.get("bookable"):
@@ -198,33 +312,18 @@ def check_doinsport_club(
                         continue
 
                     duration_min = int(duration_seconds) // 60
+                    court.add_bookable(start_min, start_min + duration_min)
 
-                    # Durée autorisée ?
-                    if allowed_durations_set and duration_min not in allowed_durations_set:
-                        continue
-
-                    end_min = start_min + duration_min
-
-                    # Doit tenir dans la fenêtre
-                    if end_min > min_to:
-                        continue
-
-                    price_per_participant = p.get("pricePerParticipant")
-                    participant_count = p.get("participantCount")
-
-                    display_time = f"{start_at[:2]}:{start_at[3:5]}"
-
-                    slots_out.append({
+                    index.add_offer({
                         "terrain": terrain_name,
-                        "startAt": display_time,
+                        "startAt": f"{start_at[:2]}:{start_at[3:5]}",
                         "start_min": start_min,
                         "duration_min": duration_min,
-                        "price_per_participant": price_per_participant,
-                        "participant_count": participant_count,
+                        "price_per_participant": p.get("pricePerParticipant"),
+                        "participant_count": p.get("participantCount"),
                     })
 
-    slots_out.sort(key=lambda x: (x["start_min"], x["duration_min"]))
-    return {"club_name": club_name, "slots": slots_out}
+    return index.finalize()
 
 
 # =====================================================
@@ -256,18 +355,8 @@ def data_heure_to_minutes(data_heure: str) -> int:
     return h * 60 + m
 
 
-def check_rpadel(
-    target_date_iso: str,
-    min_from: int,
-    min_to: int,
-    allowed_durations_set: set,
-) -> Dict[str, Any]:
-    """
-    R Padel Arena : ne renvoie que les créneaux :
-      - commençant à min_from
-      - durée autorisée
-      - tenant dans la fenêtre.
-    """
+def fetch_rpadel_day(target_date_iso: str) -> str:
+    """Récupère le HTML brut du calendrier R Padel Arena pour une date."""
     target_date_fr = iso_to_fr_date(target_date_iso)
 
     data = {
@@ -279,7 +368,7 @@ def check_rpadel(
         "dd": RPADEL_DD_VALUE,
     }
 
-    resp = requests.post(
+    resp = get_session(RPADEL_URL).post(
         RPADEL_URL,
         headers=RPADEL_HEADERS,
         cookies=RPADEL_COOKIES,
@@ -287,15 +376,90 @@ def check_rpadel(
         timeout=10,
     )
     resp.raise_for_status()
+    return resp.text
+
+
+def check_rpadel(
+    target_date_iso: str,
+    min_from: int,
+    min_to: int,
+    allowed_durations_set: set,
+    mode: str = MATCH_EXACT,
+) -> Dict[str, Any]:
+    """
+    R Padel Arena : ne renvoie que les créneaux :
+      - commençant à min_from (ou dans la fenêtre si mode == MATCH_WINDOW)
+      - durée autorisée
+      - tenant dans la fenêtre.
+    """
+    return query_source(rpadel_source(target_date_iso), min_from, min_to, allowed_durations_set, mode)
+
+
+# Un bouton : (data-heure, onclick, texte complet (calculé à la demande), texte du h1)
+RPadelButton = Tuple[str, str, Callable[[], str], str]
+
+_RPADEL_BUTTONS_XPATH = (
+    "//button[contains(concat(' ', normalize-space(@class), ' '), ' btn-horaires ')]"
+)
+
 
-    html = resp.text
+def extract_rpadel_buttons(html: str, parser: Optional[str] = None) -> List[RPadelButton]:
+    """
+    Extrait uniquement les boutons `button.btn-horaires` du calendrier.
+    lxml si disponible (RPADEL_PARSER), sinon / en cas d'échec BeautifulSoup.
+    """
+    parser = parser or RPADEL_PARSER
+    if parser == "lxml" and lxml_html is not None:
+        try:
+            return _rpadel_buttons_lxml(html)
+        except (ValueError, lxml_etree.LxmlError):
+            pass
+    return _rpadel_buttons_soup(html)
+
+
+def _join_text(parts) -> str:
+    """Équivalent de get_text(" ", strip=True) de BeautifulSoup."""
+    return " ".join(t.strip() for t in parts if t and t.strip())
+
+
+def _rpadel_buttons_lxml(html: str) -> List[RPadelButton]:
+    if not html.strip():
+        return []
+    root = lxml_html.fromstring(html)
+    out = []
+    for btn in root.xpath(_RPADEL_BUTTONS_XPATH):
+        h1 = btn.find(".//h1")
+        out.append((
+            btn.get("data-heure"),
+            btn.get("onclick", ""),
+            lambda btn=btn: _join_text(btn.itertext()),
+            _join_text(h1.itertext()) if h1 is not None else "",
+        ))
+    return out
+
+
+def _rpadel_buttons_soup(html: str) -> List[RPadelButton]:
     soup = BeautifulSoup(html, "html.parser")
+    out = []
+    for btn in soup.select("button.btn-horaires"):
+        h1 = btn.find("h1")
+        out.append((
+            btn.get("data-heure"),
+            btn.get("onclick", ""),
+            lambda btn=btn: btn.get_text(" ", strip=True),
+            h1.get_text(" ", strip=True) if h1 else "",
+        ))
+    return out
+
 
-    boutons = soup.select("button.btn-horaires")
-    slots_out = []
+def index_rpadel_day(html: str) -> DayIndex:
+    """
+    Normalise le HTML du calendrier R Padel en index de la journée.
+    Le calendrier ne précise pas le terrain : pas d'intervalles par terrain.
+    """
+    index = DayIndex("R Padel Arena")
 
-    for btn in boutons:
-        data_heure = btn.get("data-heure")  # ex: "1400"
+    for data_heure, onclick, button_text, texte_h1 in extract_rpadel_buttons(html):
         if not data_heure:
             continue
 
@@ -303,15 +467,10 @@ def check_rpadel(
         if start_min < 0:
             continue
 
-        # Doit commencer exactement à la fenêtre
-        if start_min != min_from:
-            continue
-
-        onclick = btn.get("onclick", "")
         duration_min = extract_duration_from_onclick(onclick)
 
         if duration_min <= 0:
-            texte_btn = btn.get_text(" ", strip=True)
+            texte_btn = button_text()
             m = re.search(r"(\d+)\s*mn", texte_btn)
             if m:
                 duration_min = int(m.group(1))
@@ -319,27 +478,16 @@ def check_rpadel(
         if duration_min <= 0:
             continue
 
-        # Durée autorisée ?
-        if allowed_durations_set and duration_min not in allowed_durations_set:
-            continue
-
-        end_min = start_min + duration_min
-        if end_min > min_to:
-            continue
-
         display_time = f"{data_heure[:2]}:{data_heure[2:]}"
-        h1 = btn.find("h1")
-        texte_h1 = h1.get_text(" ", strip=True) if h1 else ""
 
-        slots_out.append({
+        index.add_offer({
             "startAt": display_time,
             "start_min": start_min,
             "duration_min": duration_min,
             "raw_text": texte_h1,
         })
 
-    slots_out.sort(key=lambda x: (x["start_min"], x["duration_min"]))
-    return {"club_name": "R Padel Arena", "slots": slots_out}
+    return index.finalize()
 
 
 # =====================================================
@@ -363,6 +511,7 @@ def _debug_search_key(html: str) -> Optional[str]:
     return None
 
 
+@traced("padelshot.get_dynamic_key")
 def get_dynamic_key(session: requests.Session, id_cuadro: str) -> str:
     """
     Récupère la 'key' dynamique depuis grid.aspx.
@@ -390,11 +539,121 @@ def get_dynamic_key(session: requests.Session, id_cuadro: str) -> str:
     raise RuntimeError("Impossible de trouver la clé 'key' pour Padelshot.")
 
 
+_padelshot_key: Optional[str] = None
+_padelshot_key_at = 0.0
+_padelshot_key_lock = threading.Lock()
+
+
+def get_padelshot_key(session: requests.Session, rejected_key: Optional[str] = None) -> str:
+    """
+    Renvoie la clé dynamique Padelshot, partagée entre les recherches.
+
+    grid.aspx n'est téléchargé que si la clé a expiré (PADELSHOT_KEY_TTL)
+    ou si `rejected_key` est la clé courante. Le verrou garantit qu'un
+    seul thread rafraîchit la clé ; les autres réutilisent son résultat.
+    Les cookies associés restent dans la session partagée de l'hôte.
+
+    Clé et cookies sont aussi publiés dans le cache partagé : un worker
+    reprend la clé rafraîchie par un autre au lieu de refaire grid.aspx.
+    """
+    global _padelshot_key, _padelshot_key_at
+
+    with _padelshot_key_lock:
+        key = _padelshot_key
+        fresh = key is not None and time.monotonic() - _padelshot_key_at < PADELSHOT_KEY_TTL
+        if fresh and key != rejected_key:
+            return key
+
+        skey = shared_key("padelshot:key", PADELSHOT_ID_CUADRO)
+        hit = shared_cache.get_entry(skey) if shared_cache is not None else None
+        if hit is not None:
+            entry, age = hit
+            if age < PADELSHOT_KEY_TTL and entry.get("key") != rejected_key:
+                requests.utils.add_dict_to_cookiejar(session.cookies, entry.get("cookies") or {})
+                _padelshot_key = entry["key"]
+                _padelshot_key_at = time.monotonic() - age
+                return _padelshot_key
+
+        key = get_dynamic_key(session, PADELSHOT_ID_CUADRO)
+        _padelshot_key = key
+        _padelshot_key_at = time.monotonic()
+        if shared_cache is not None:
+            cookies = requests.utils.dict_from_cookiejar(session.cookies)
+            shared_cache.set(skey, {"key": key, "cookies": cookies})
+        return key
+
+
+def _forget_padelshot_key_in_child() -> None:
+    """
+    Après un fork (gunicorn --preload) : les sessions sont recréées sans
+    leurs cookies (padel_http), la clé héritée serait donc refusée ; le
+    verrou a pu être copié pris.
+    """
+    global _padelshot_key, _padelshot_key_at, _padelshot_key_lock
+    _padelshot_key = None
+    _padelshot_key_at = 0.0
+    _padelshot_key_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_padelshot_key_in_child)
+
+
+@traced("padelshot.ObtenerCuadro")
+def _obtener_cuadro(session: requests.Session, target_date_fr: str, key: str) -> requests.Response:
+    payload = {
+        "idCuadro": PADELSHOT_ID_CUADRO,
+        "fecha": target_date_fr,
+        "key": key,
+    }
+    return hedged_request(
+        session,
+        "POST",
+        f"{PADELSHOT_BASE_URL}/booking/srvc.aspx/ObtenerCuadro",
+        headers=PADELSHOT_HEADERS_JSON,
+        json=payload,
+        timeout=10,
+    )
+
+
+def _padelshot_key_rejected(resp: requests.Response) -> bool:
+    """ObtenerCuadro refuse une clé périmée par un 401/403 ou un 200 au 'd' vide."""
+    if resp.status_code in PADELSHOT_KEY_REJECTED_STATUS:
+        return True
+    if resp.status_code != 200:
+        return False
+    try:
+        data = resp.json()
+    except ValueError:
+        return False
+    return isinstance(data, dict) and not data.get("d")
+
+
+def fetch_padelshot_day(target_date_iso: str) -> Dict[str, Any]:
+    """
+    Appelle ObtenerCuadro avec la clé en cache ; si elle est refusée,
+    la clé est rafraîchie et l'appel est retenté une seule fois.
+    """
+    target_date_fr = iso_to_fr_date(target_date_iso)
+    session = get_session(PADELSHOT_BASE_URL)
+
+    key = get_padelshot_key(session)
+    resp = _obtener_cuadro(session, target_date_fr, key)
+
+    if _padelshot_key_rejected(resp):
+        key = get_padelshot_key(session, rejected_key=key)
+        resp = _obtener_cuadro(session, target_date_fr, key)
+
+    resp.raise_for_status()
+    return resp.json()
+
+
 def check_padelshot(
     target_date_iso: str,
     min_from: int,
     min_to: int,
     allowed_durations_set: set,
+    mode: str = MATCH_EXACT,
 ) -> Dict[str, Any]:
     """
     Padelshot Caen Mondeville :
@@ -402,41 +661,29 @@ def check_padelshot(
     - Appelle ObtenerCuadro
     - Analyse les HorariosFijos + Ocupaciones
     - Ne propose que les créneaux :
-        * commençant exactement à min_from
+        * commençant exactement à min_from (ou dans la fenêtre si mode == MATCH_WINDOW)
         * dont la durée est autorisée
         * et qui correspondent à un HorarioFijo exact
         * et non occupés (pas d'Ocupacion qui chevauche)
     """
-    target_date_fr = iso_to_fr_date(target_date_iso)
-
-    session = requests.Session()
-    key = get_dynamic_key(session, PADELSHOT_ID_CUADRO)
-
-    payload = {
-        "idCuadro": PADELSHOT_ID_CUADRO,
-        "fecha": target_date_fr,
-        "key": key,
-    }
+    return query_source(padelshot_source(target_date_iso), min_from, min_to, allowed_durations_set, mode)
 
-    resp = session.post(
-        f"{PADELSHOT_BASE_URL}/booking/srvc.aspx/ObtenerCuadro",
-        headers=PADELSHOT_HEADERS_JSON,
-        json=payload,
-        timeout=10,
-    )
-    resp.raise_for_status()
 
-    data = resp.json()
+def index_padelshot_day(data: Dict[str, Any]) -> DayIndex:
+    """
+    Normalise le résultat d'ObtenerCuadro en index de la journée :
+    Ocupaciones -> occupé, HorariosFijos -> proposé, et offres pour les
+    HorariosFijos sans chevauchement (test sur les bitmaps du terrain).
+    """
+    index = DayIndex("Padelshot Caen Mondeville")
     cuadro = data.get("d", {})
     columnas = cuadro.get("Columnas", [])
 
-    results_slots = []
-
     for col in columnas:
         terrain_name = col.get("TextoPrincipal", "Terrain ?")
+        court = index.court(terrain_name)
 
         # Ocupaciones = réservations existantes
-        busy_intervals: List[Tuple[int, int]] = []
         for occ in col.get("Ocupaciones", []):
             sh = occ.get("StrHoraInicioMostrar") or occ.get("StrHoraInicio")
             eh = occ.get("StrHoraFinMostrar") or occ.get("StrHoraFin")
@@ -446,7 +693,7 @@ def check_padelshot(
             e = hhmm_to_minutes(eh)
             if s < 0 or e <= s:
                 continue
-            busy_intervals.append((s, e))
+            court.add_busy(s, e)
 
         # HorariosFijos = créneaux possibles pour ce terrain
         horarios = col.get("HorariosFijos", [])
@@ -462,105 +709,654 @@ def check_padelshot(
             if start_min < 0 or end_min <= start_min:
                 continue
 
-            duration_min = end_min - start_min
-
-            # Doit commencer exactement à la fenêtre
-            if start_min != min_from:
-                continue
-
-            # Durée autorisée ?
-            if allowed_durations_set and duration_min not in allowed_durations_set:
-                continue
-
-            # Doit tenir dans la fenêtre [min_from, min_to]
-            if end_min > min_to:
-                continue
-
-            # Vérifier qu'aucune Ocupacion ne chevauche ce créneau
-            overlapped = False
-            for bs, be in busy_intervals:
-                if not (be <= start_min or bs >= end_min):
-                    overlapped = True
-                    break
+            court.add_bookable(start_min, end_min)
 
-            if overlapped:
+            # Vérifier qu'aucune Ocupacion ne chevauche ce créneau (bitmap)
+            if not court.is_free(start_min, end_min):
                 continue
 
-            results_slots.append({
+            index.add_offer({
                 "terrain": terrain_name,
                 "startAt": minutes_to_hhmm(start_min),
                 "start_min": start_min,
-                "duration_min": duration_min,
+                "duration_min": end_min - start_min,
             })
 
-    results_slots.sort(key=lambda x: (x["start_min"], x["duration_min"]))
-    return {"club_name": "Padelshot Caen Mondeville", "slots": results_slots}
+    return index.finalize()
+
+
+# =====================================================
+# 🗂️ SOURCES (fournisseur, club, date) + CACHE
+# =====================================================
+
+# Une source = une journée d'un club chez un fournisseur :
+# { "provider", "club", "date_iso", "label" (nom affiché, disjoncteur),
+#   "fetch": () -> payload brut, "build": payload -> DayIndex }
+DaySource = Dict[str, Any]
+
+
+def doinsport_source(club_conf: Dict[str, Any], date_iso: str) -> DaySource:
+    return {
+        "provider": "doinsport",
+        "club": club_conf["club_id"],
+        "date_iso": date_iso,
+        "label": f"Doinsport - {club_conf['name']}",
+        "fetch": lambda: fetch_doinsport_day(club_conf, date_iso),
+        "build": lambda data: index_doinsport_day(club_conf["name"], data),
+    }
+
+
+def rpadel_source(date_iso: str) -> DaySource:
+    return {
+        "provider": "rpadel",
+        "club": RPADEL_ID_SPORT,
+        "date_iso": date_iso,
+        "label": "R Padel Arena",
+        "fetch": lambda: fetch_rpadel_day(date_iso),
+        "build": index_rpadel_day,
+    }
+
+
+def padelshot_source(date_iso: str) -> DaySource:
+    return {
+        "provider": "padelshot",
+        "club": PADELSHOT_ID_CUADRO,
+        "date_iso": date_iso,
+        "label": "Padelshot",
+        "fetch": lambda: fetch_padelshot_day(date_iso),
+        "build": index_padelshot_day,
+    }
+
+
+def day_sources(date_iso: str) -> List[DaySource]:
+    """Toutes les sources d'une journée, dans l'ordre d'affichage."""
+    sources = [doinsport_source(club, date_iso) for club in DOINSPORT_CLUBS]
+    sources.append(rpadel_source(date_iso))
+    sources.append(padelshot_source(date_iso))
+    return sources
+
+
+def source_index(source: DaySource) -> Tuple[DayIndex, float]:
+    """
+    (index de la journée, âge en secondes). L'index est construit une seule
+    fois par payload puis partagé par toutes les requêtes de fenêtre ;
+    servi en stale-while-revalidate (voir padel_cache.cached_swr).
+    """
+    return cached_swr(
+        f"{source['provider']}:index",
+        source["club"],
+        source["date_iso"],
+        lambda: _load_source(source),
+    )
+
+
+def query_source(
+    source: DaySource,
+    min_from: int,
+    min_to: int,
+    allowed_durations_set: set,
+    mode: str = MATCH_EXACT,
+) -> Dict[str, Any]:
+    """Résultat filtré d'une source (index en cache), avec son âge."""
+    labels = (source["provider"], source["label"])
+    with span(f"check {source['label']}", date=source["date_iso"]) as sp:
+        index, age = source_index(source)
+        with FILTER_SECONDS.time(*labels), span("filter"):
+            result = index.result(min_from, min_to, allowed_durations_set, mode)
+        SLOTS.inc(*labels, amount=len(result["slots"]))
+        if sp is not None:
+            sp.set(age_s=int(age), slots=len(result["slots"]))
+    return _with_age(result, age)
+
+
+def _error_kind(error: BaseException) -> str:
+    """Type d'erreur pour padel_errors_total."""
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, SearchDeadlineExceeded):
+        return "deadline"
+    if isinstance(error, ProviderQueueTimeout):
+        return "queue"
+    if isinstance(error, requests.Timeout):
+        return "timeout"
+    if isinstance(error, requests.HTTPError):
+        return "http"
+    if isinstance(error, requests.RequestException):
+        return "network"
+    return "other"
+
+
+def _load_source(source: DaySource, shared_max_age: float = PROVIDER_CACHE_TTL) -> Tuple[DayIndex, float]:
+    """
+    (index, âge) : payload brut lu dans le cache partagé entre workers s'il
+    a au plus `shared_max_age` secondes, sinon fetch fournisseur, puis construction de l'index
+    (seul l'index est gardé en mémoire, par source_index).
+    Le fetch et le parse passent ensemble par le disjoncteur de la source
+    (échec immédiat si ouvert) : une réponse illisible n'est ni comptée
+    comme un succès ni écrite dans le cache partagé.
+    Les appels concurrents pour la même source partagent un seul fetch.
+    """
+    provider, club, date_iso = source["provider"], source["club"], source["date_iso"]
+    skey = shared_key(provider, club, date_iso)
+    labels = (provider, source["label"])
+
+    def build(data):
+        try:
+            with PARSE_SECONDS.time(*labels), span("parse"):
+                return source["build"](data)
+        except Exception:
+            ERRORS.inc(*labels, "parse")
+            raise
+
+    def fetch_and_build():
+        start = time.perf_counter()
+        try:
+            with span("fetch"):
+                data = source["fetch"]()
+        except Exception as e:
+            ERRORS.inc(*labels, _error_kind(e))
+            raise
+        FETCH_SECONDS.observe(*labels, value=time.perf_counter() - start)
+        return data, build(data)
+
+    def load():
+        if shared_max_age > 0 and shared_cache is not None:
+            hit = shared_cache.get_entry(skey)
+            if hit is not None and hit[1] <= shared_max_age:
+                data, age = hit
+                with span("shared cache hit", age_s=int(age)):
+                    return build(data), age
+
+        try:
+            data, index = get_breaker(source["label"]).call(fetch_and_build)
+        except CircuitOpenError as e:
+            ERRORS.inc(*labels, _error_kind(e))
+            raise
+        if shared_cache is not None:
+            shared_cache.set(skey, data)
+        return index, 0.0
+
+    return coalesced(provider, club, date_iso, load)
+
+
+def refresh_source(source: DaySource, shared_max_age: float = 0.0) -> DayIndex:
+    """
+    Remplace l'index en mémoire par une donnée récente : payload du cache
+    partagé s'il a au plus `shared_max_age` secondes (un autre worker vient
+    de le rafraîchir), sinon nouveau fetch fournisseur.
+    """
+    index, age = _load_source(source, shared_max_age)
+    store_cached(f"{source['provider']}:index", source["club"], source["date_iso"], index, age)
+    return index
+
+
+def _with_age(result: Dict[str, Any], age: float) -> Dict[str, Any]:
+    """Ajoute l'âge de la donnée au résultat d'un club ("stale" si > TTL)."""
+    result["age_s"] = int(age)
+    result["stale"] = age > PROVIDER_CACHE_TTL
+    return result
 
 
 # =====================================================
 # 🧠 FONCTION PRINCIPALE APPELÉE PAR FLASK
 # =====================================================
 
+@traced("search_all")
 def search_all(
     date_iso: str,
     window_from: str,
     window_to: str,
     allowed_durations_min: List[int],
+    mode: str = MATCH_EXACT,
+    concurrent: Optional[bool] = None,
+    budget_s: Optional[float] = None,
 ) -> Dict[str, Any]:
     """
     Recherche les créneaux sur tous les complexes.
 
+    Par défaut (SEARCH_CONCURRENT), tous les fournisseurs sont interrogés
+    en parallèle : le temps total ≈ le fournisseur le plus lent, borné par
+    `budget_s` (SEARCH_BUDGET_S par défaut).
+
+    `mode` : MATCH_EXACT (début == window_from) ou MATCH_WINDOW (début
+    n'importe où dans la plage), répondu depuis l'index de chaque journée.
+
     Retourne un dict du type :
     {
         "date_iso": ...,
         "window_from": ...,
         "window_to": ...,
         "durations": [...],
+        "mode": "exact" | "window",
         "doinsport": [
-            { "club_name": "...", "slots": [...] },
+            { "club_name": "...", "slots": [...], "age_s": 0, "stale": False },
             ...
         ],
         "rpadel": { "club_name": "...", "slots": [...] },
         "padelshot": { "club_name": "...", "slots": [...] },
-        "errors": [ "message éventuel", ... ]
+        "errors": [ "message éventuel", ... ],
+        "pending": [ "R Padel Arena", ... ],
+        "circuits": [ { "name", "state", "retry_in_s", ... }, ... ]
+    }
+
+    "pending" : fournisseurs sans réponse à l'échéance du budget (aussi
+    signalés dans "errors").
+
+    "circuits" : disjoncteurs ouverts ou en test (fournisseurs court-circuités).
+    "age_s" / "stale" : âge de la donnée fournisseur servie depuis le cache
+    (périmée mais servie immédiatement pendant son rafraîchissement, ou
+    dernière donnée valide si le fournisseur est en panne).
+    """
+    check_search_params(date_iso, window_from, window_to)
+    min_from = hhmm_to_minutes(window_from)
+    min_to = hhmm_to_minutes(window_to)
+    allowed_set = _allowed_durations(allowed_durations_min)
+
+    mode = _normalize_mode(mode)
+
+    out = _new_day_result(date_iso, window_from, window_to, allowed_set, mode)
+    jobs = _day_jobs(out, min_from, min_to, allowed_set, mode)
+
+    _run_jobs(
+        jobs,
+        concurrent=SEARCH_CONCURRENT if concurrent is None else concurrent,
+        max_workers=SEARCH_MAX_WORKERS,
+        budget_s=SEARCH_BUDGET_S if budget_s is None else budget_s,
+    )
+    out["circuits"] = open_circuits()
+    return out
+
+
+def iter_search(
+    date_iso: str,
+    window_from: str,
+    window_to: str,
+    allowed_durations_min: List[int],
+    mode: str = MATCH_EXACT,
+    budget_s: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Variante de search_all pour l'affichage progressif : produit un
+    événement par club dès que son fournisseur répond (ordre d'arrivée).
+    À l'échéance du budget, les clubs restants sortent en erreur "en attente".
+
+    Chaque événement :
+    {
+        "order": position du club dans l'ordre d'affichage de search_all,
+        "key": "doinsport" | "rpadel" | "padelshot",
+        "result": { "club_name": "...", "slots": [...] } ou None,
+        "error": "Préfixe: message" (même format que search_all) ou None,
+        "pending": True si le fournisseur n'a pas répondu dans le budget,
+    }
+    """
+    check_search_params(date_iso, window_from, window_to)
+    min_from = hhmm_to_minutes(window_from)
+    min_to = hhmm_to_minutes(window_to)
+    allowed_set = _allowed_durations(allowed_durations_min)
+    mode = _normalize_mode(mode)
+
+    out = _new_day_result(date_iso, window_from, window_to, allowed_set, mode)
+    jobs = _day_jobs(out, min_from, min_to, allowed_set, mode)
+
+    deadline = _deadline_for(SEARCH_BUDGET_S if budget_s is None else budget_s)
+    workers = max(1, min(SEARCH_MAX_WORKERS, len(jobs)))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="padel-stream")
+    try:
+        futures = {
+            pool.submit(propagate(_call_before), deadline, fn, args): (order, key, label)
+            for order, (_, key, label, fn, args) in enumerate(jobs)
+        }
+        done = set()
+
+        try:
+            for fut in as_completed(futures, timeout=_remaining(deadline)):
+                done.add(fut)
+                order, key, label = futures[fut]
+                try:
+                    yield {"order": order, "key": key, "result": fut.result(), "error": None, "pending": False}
+                except SearchDeadlineExceeded:
+                    yield _pending_event(order, key, label)
+                except Exception as e:
+                    yield {"order": order, "key": key, "result": None, "error": f"{label}: {e}", "pending": False}
+        except FuturesTimeout:
+            for fut, (order, key, label) in futures.items():
+                if fut not in done:
+                    yield _pending_event(order, key, label)
+    finally:
+        # ne bloque pas sur les fournisseurs en retard
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+@traced("search_range")
+def search_range(
+    start_iso: str,
+    end_iso: Optional[str],
+    window_from: str,
+    window_to: str,
+    allowed_durations_min: List[int],
+    weekdays: Optional[List[int]] = None,
+    mode: str = MATCH_EXACT,
+    budget_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Recherche sur plusieurs jours en une seule passe, bornée par `budget_s`
+    (RANGE_BUDGET_S par défaut).
+
+    Les jours vont de `start_iso` à `end_iso` inclus (ou RANGE_DEFAULT_DAYS
+    jours si `end_iso` est vide), filtrés par `weekdays` (0 = lundi) si fourni.
+    Tous les fetchs (fournisseur, club, date) sont planifiés d'emblée puis
+    exécutés sur un pool borné ; les payloads déjà en cache ne repartent pas.
+
+    Retourne :
+    {
+        "start_iso": ..., "end_iso": ..., "weekdays": [...],
+        "window_from": ..., "window_to": ..., "durations": [...], "mode": ...,
+        "days": [ <dict search_all d'un jour>, ... ],
+        "errors": [ "date - message", ... ],
+        "pending": [ "date - fournisseur", ... ],
+        "circuits": [ disjoncteurs ouverts ou en test ]
     }
     """
+    check_search_params(start_iso, window_from, window_to, end_iso)
     min_from = hhmm_to_minutes(window_from)
     min_to = hhmm_to_minutes(window_to)
-    allowed_set = set(int(d) for d in allowed_durations_min if int(d) > 0)
+    allowed_set = _allowed_durations(allowed_durations_min)
+    mode = _normalize_mode(mode)
+
+    dates = plan_range_dates(start_iso, end_iso, weekdays)
+
+    days = []
+    jobs = []
+    for d in dates:
+        day_out = _new_day_result(d, window_from, window_to, allowed_set, mode)
+        days.append(day_out)
+        jobs.extend(_day_jobs(day_out, min_from, min_to, allowed_set, mode))
+
+    _run_jobs(
+        jobs,
+        concurrent=SEARCH_CONCURRENT,
+        max_workers=RANGE_MAX_WORKERS,
+        budget_s=RANGE_BUDGET_S if budget_s is None else budget_s,
+    )
+
+    return {
+        "start_iso": dates[0] if dates else start_iso,
+        "end_iso": dates[-1] if dates else (end_iso or start_iso),
+        "weekdays": sorted(set(weekdays)) if weekdays else [],
+        "window_from": window_from,
+        "window_to": window_to,
+        "durations": sorted(list(allowed_set)),
+        "mode": mode,
+        "days": days,
+        "errors": [f"{day['date_iso']} - {err}" for day in days for err in day["errors"]],
+        "pending": [f"{day['date_iso']} - {label}" for day in days for label in day["pending"]],
+        "circuits": open_circuits(),
+    }
+
+
+# Nombre de terrains libres ensemble demandé par défaut (/api/courts)
+FREE_COURTS_DEFAULT = 2
+
+
+def free_courts_source(
+    source: DaySource,
+    min_from: int,
+    min_to: int,
+    allowed_durations_set: set,
+    k: int,
+) -> Dict[str, Any]:
+    """
+    Temps libre par terrain d'une source (bitmaps 5 min de l'index) :
+      - "together" : débuts où au moins `k` terrains sont libres ensemble
+      - "courts" : débuts libres de chaque terrain
+    par durée, en plages de débuts [premier, dernier] (pas de 5 min) qui
+    tiennent dans [min_from, min_to].
+    Libre = couvert par des créneaux proposés et non occupé ; une plage
+    peut enjamber deux créneaux du fournisseur.
+    """
+    index, age = source_index(source)
+    durations = sorted(allowed_durations_set)
+
+    def keep(starts: List[int], duration_min: int) -> List[List[str]]:
+        # débuts consécutifs (pas de CELL_MIN) regroupés en [premier, dernier]
+        ranges: List[List[int]] = []
+        for m in starts:
+            if m < min_from or m + duration_min > min_to:
+                continue
+            if ranges and m - ranges[-1][1] == CELL_MIN:
+                ranges[-1][1] = m
+            else:
+                ranges.append([m, m])
+        return [[minutes_to_hhmm(a), minutes_to_hhmm(b)] for a, b in ranges]
+
+    result = {
+        "club_name": index.club_name,
+        "together": {str(d): keep(index.courts_free_together(k, d), d) for d in durations},
+        "courts": {
+            name: {str(d): keep(court.free_starts(d), d) for d in durations}
+            for name, court in index.courts.items()
+        },
+    }
+    return _with_age(result, age)
+
+
+@traced("search_free_courts")
+def search_free_courts(
+    date_iso: str,
+    window_from: str,
+    window_to: str,
+    allowed_durations_min: List[int],
+    k: int = FREE_COURTS_DEFAULT,
+    budget_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Terrains libres en même temps (ex. 2 terrains pour 8 joueurs), pour les
+    fournisseurs qui détaillent leurs terrains (Doinsport, Padelshot).
+
+    Même forme que search_all, avec "courts_wanted" et, par club,
+    "together" / "courts" (voir free_courts_source) au lieu de "slots".
+    """
+    check_search_params(date_iso, window_from, window_to)
+    min_from = hhmm_to_minutes(window_from)
+    min_to = hhmm_to_minutes(window_to)
+    allowed_set = _allowed_durations(allowed_durations_min)
+
+    out = _new_day_result(date_iso, window_from, window_to, allowed_set, MATCH_WINDOW)
+    out["courts_wanted"] = k
+    jobs: List[Job] = [
+        (out, source["provider"], source["label"], free_courts_source, (source, min_from, min_to, allowed_set, k))
+        for source in day_sources(date_iso)
+        if source["provider"] != "rpadel"  # calendrier sans détail par terrain
+    ]
+
+    _run_jobs(
+        jobs,
+        concurrent=SEARCH_CONCURRENT,
+        max_workers=SEARCH_MAX_WORKERS,
+        budget_s=SEARCH_BUDGET_S if budget_s is None else budget_s,
+    )
+    out["circuits"] = open_circuits()
+    return out
+
+
+def plan_range_dates(
+    start_iso: str,
+    end_iso: Optional[str],
+    weekdays: Optional[List[int]] = None,
+) -> List[str]:
+    """
+    Liste des dates ISO à interroger, bornée à RANGE_MAX_DAYS jours.
+    Sans `end_iso`, on couvre RANGE_DEFAULT_DAYS jours à partir de `start_iso`.
+    """
+    start = date.fromisoformat(start_iso)
+    if end_iso:
+        end = date.fromisoformat(end_iso)
+    else:
+        end = start + timedelta(days=RANGE_DEFAULT_DAYS - 1)
+
+    if end < start:
+        start, end = end, start
+    end = min(end, start + timedelta(days=RANGE_MAX_DAYS - 1))
+
+    wanted = set(weekdays) if weekdays else None
+    out = []
+    d = start
+    while d <= end:
+        if wanted is None or d.weekday() in wanted:
+            out.append(d.isoformat())
+        d += timedelta(days=1)
+    return out
 
-    out: Dict[str, Any] = {
+
+# Un job : (dict résultat du jour, clé résultat, préfixe d'erreur, fonction, args)
+Job = Tuple[Dict[str, Any], str, str, Callable[..., Dict[str, Any]], tuple]
+
+
+def _allowed_durations(allowed_durations_min: List[int]) -> set:
+    return set(int(d) for d in allowed_durations_min if int(d) > 0)
+
+
+def _normalize_mode(mode: Optional[str]) -> str:
+    return mode if mode in MATCH_MODES else MATCH_EXACT
+
+
+def _new_day_result(
+    date_iso: str,
+    window_from: str,
+    window_to: str,
+    allowed_set: set,
+    mode: str = MATCH_EXACT,
+) -> Dict[str, Any]:
+    return {
         "date_iso": date_iso,
         "window_from": window_from,
         "window_to": window_to,
         "durations": sorted(list(allowed_set)),
+        "mode": mode,
         "doinsport": [],
         "rpadel": None,
         "padelshot": None,
         "errors": [],
+        "pending": [],
     }
 
+
+def _day_jobs(
+    out: Dict[str, Any],
+    min_from: int,
+    min_to: int,
+    allowed_set: set,
+    mode: str = MATCH_EXACT,
+) -> List[Job]:
+    """Tous les jobs fournisseurs pour la journée de `out`, dans l'ordre d'affichage."""
+    date_iso = out["date_iso"]
+    jobs: List[Job] = []
+
     # --- Doinsport ---
     for club in DOINSPORT_CLUBS:
-        try:
-            res = check_doinsport_club(club, date_iso, min_from, min_to, allowed_set)
-            out["doinsport"].append(res)
-        except Exception as e:
-            out["errors"].append(f"Doinsport - {club['name']}: {e}")
+        jobs.append((
+            out,
+            "doinsport",
+            f"Doinsport - {club['name']}",
+            check_doinsport_club,
+            (club, date_iso, min_from, min_to, allowed_set, mode),
+        ))
 
     # --- R Padel Arena ---
-    try:
-        out["rpadel"] = check_rpadel(date_iso, min_from, min_to, allowed_set)
-    except Exception as e:
-        out["errors"].append(f"R Padel Arena: {e}")
+    jobs.append((out, "rpadel", "R Padel Arena", check_rpadel, (date_iso, min_from, min_to, allowed_set, mode)))
 
     # --- Padelshot ---
-    try:
-        out["padelshot"] = check_padelshot(date_iso, min_from, min_to, allowed_set)
-    except Exception as e:
-        out["errors"].append(f"Padelshot: {e}")
+    jobs.append((out, "padelshot", "Padelshot", check_padelshot, (date_iso, min_from, min_to, allowed_set, mode)))
 
-    return out
+    return jobs
+
+
+def _store_result(out: Dict[str, Any], key: str, res: Dict[str, Any]) -> None:
+    """Range un résultat fournisseur dans le dict de sortie."""
+    if key == "doinsport":
+        out["doinsport"].append(res)
+    else:
+        out[key] = res
+
+
+def _deadline_for(budget_s: Optional[float]) -> Optional[float]:
+    """Échéance time.monotonic() d'un budget en secondes (None / 0 = aucune)."""
+    return time.monotonic() + budget_s if budget_s else None
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def _call_before(deadline: Optional[float], fn: Callable[..., Dict[str, Any]], args: tuple) -> Dict[str, Any]:
+    """Exécute un job en bornant ses requêtes HTTP au temps restant."""
+    if deadline is not None and time.monotonic() >= deadline:
+        raise SearchDeadlineExceeded("budget de recherche épuisé")
+    with request_deadline(deadline), profile_thread():
+        return fn(*args)
+
+
+def _pending_event(order: int, key: str, label: str) -> Dict[str, Any]:
+    ERRORS.inc(key, label, "pending")
+    return {"order": order, "key": key, "result": None, "error": f"{label}: {PENDING_MESSAGE}", "pending": True}
+
+
+def _mark_pending(out: Dict[str, Any], key: str, label: str) -> None:
+    ERRORS.inc(key, label, "pending")
+    out["errors"].append(f"{label}: {PENDING_MESSAGE}")
+    out["pending"].append(label)
+
+
+def _run_jobs(
+    jobs: List[Job],
+    concurrent: bool = True,
+    max_workers: int = SEARCH_MAX_WORKERS,
+    budget_s: Optional[float] = None,
+) -> None:
+    """
+    Exécute les jobs fournisseurs et remplit les dicts résultat.
+
+    En mode concurrent, tous les jobs partent en même temps sur un pool
+    borné ; les résultats et erreurs sont ensuite lus dans l'ordre de
+    soumission pour garder une sortie déterministe.
+
+    Avec un budget, on n'attend pas au-delà de l'échéance : les jobs non
+    terminés sont marqués "en attente" et le pool est abandonné sans
+    attendre ses threads.
+    """
+    deadline = _deadline_for(budget_s)
+
+    if not concurrent or len(jobs) <= 1:
+        for out, key, label, fn, args in jobs:
+            try:
+                _store_result(out, key, _call_before(deadline, fn, args))
+            except SearchDeadlineExceeded:
+                _mark_pending(out, key, label)
+            except Exception as e:
+                out["errors"].append(f"{label}: {e}")
+        return
+
+    workers = max(1, min(max_workers, len(jobs)))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="padel-search")
+    try:
+        futures = [
+            (out, key, label, pool.submit(propagate(_call_before), deadline, fn, args))
+            for out, key, label, fn, args in jobs
+        ]
+        wait([f for _, _, _, f in futures], timeout=_remaining(deadline))
+
+        for out, key, label, fut in futures:
+            if not fut.done():
+                _mark_pending(out, key, label)
+                continue
+            try:
+                _store_result(out, key, fut.result())
+            except SearchDeadlineExceeded:
+                _mark_pending(out, key, label)
+            except Exception as e:
+                out["errors"].append(f"{label}: {e}")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
 
 if __name__ == "__main__":
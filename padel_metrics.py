@@ -0,0 +1,234 @@
+# padel_metrics.py
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from padel_breaker import STATE_CLOSED, breaker_states
+from padel_cache import provider_cache, upstream_flights
+from padel_http import hedge_stats, limiter_stats
+
+
+# =====================================================
+# ⚙️ CONFIG MÉTRIQUES
+# =====================================================
+
+# PADEL_METRICS=0 pour couper toute l'instrumentation (observe / inc no-op)
+METRICS_ENABLED = os.environ.get("PADEL_METRICS", "1") == "1"
+
+# Bornes des histogrammes de durée (secondes)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Un échantillon exposé : (suffixe du nom, labels, valeur)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+# =====================================================
+# 📈 COMPTEURS / HISTOGRAMMES
+# =====================================================
+# Format texte Prometheus (exposition 0.0.4), sans dépendance externe.
+# Les valeurs sont propres au process : avec plusieurs workers gunicorn,
+# chaque scrape lit le worker qui répond.
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        return [("", dict(zip(self.labelnames, labels)), value) for labels, value in items]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [compte par bucket (non cumulé, +Inf en dernier), somme, total]
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *labels: str, value: float) -> None:
+        if not METRICS_ENABLED:
+            return
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[labels] = entry
+            entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(*labels, value=time.perf_counter() - start)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = [(labels, (list(e[0]), e[1], e[2])) for labels, e in self._values.items()]
+        out: List[Sample] = []
+        for labels, (counts, total, count) in items:
+            base = dict(zip(self.labelnames, labels))
+            cumulated = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulated += n
+                out.append(("_bucket", dict(base, le=_format_bound(bound)), cumulated))
+            out.append(("_sum", base, total))
+            out.append(("_count", base, count))
+        return out
+
+
+class Collected:
+    """Métrique calculée au moment du scrape (stats déjà tenues ailleurs)."""
+
+    def __init__(self, name: str, kind: str, help_text: str, collect: Callable[[], List[Sample]]):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self._collect = collect
+
+    def samples(self) -> List[Sample]:
+        return self._collect()
+
+
+REGISTRY: List = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_metrics() -> str:
+    """Toutes les métriques au format texte Prometheus."""
+    lines = []
+    for metric in REGISTRY:
+        try:
+            samples = metric.samples()
+        except Exception:
+            continue
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for suffix, labels, value in samples:
+            if labels:
+                label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{metric.name}{suffix}{{{label_str}}} {value}")
+            else:
+                lines.append(f"{metric.name}{suffix} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# =====================================================
+# 🎾 MÉTRIQUES DE L'APPLI
+# =====================================================
+
+FETCH_SECONDS = register(Histogram(
+    "padel_upstream_fetch_seconds", "Durée d'un fetch fournisseur (réseau).", ("provider", "club")))
+PARSE_SECONDS = register(Histogram(
+    "padel_parse_seconds", "Durée du parsing + indexation d'un payload fournisseur.", ("provider", "club")))
+FILTER_SECONDS = register(Histogram(
+    "padel_filter_seconds", "Durée du filtrage de l'index pour une recherche.", ("provider", "club")))
+RENDER_SECONDS = register(Histogram(
+    "padel_render_seconds", "Durée du rendu HTML.", ("template",)))
+
+ERRORS = register(Counter(
+    "padel_errors_total", "Erreurs par fournisseur / club et par type.", ("provider", "club", "kind")))
+SLOTS = register(Counter(
+    "padel_slots_returned_total", "Créneaux renvoyés aux recherches.", ("provider", "club")))
+
+
+# --- stats déjà tenues par les caches / le client HTTP, lues au scrape ---
+
+def _cache_requests() -> List[Sample]:
+    stats = provider_cache.stats()
+    return [
+        ("", {"result": "hit"}, stats["hits"]),
+        ("", {"result": "stale_hit"}, stats["stale_hits"]),
+        ("", {"result": "miss"}, stats["misses"]),
+    ]
+
+
+def _single_flight() -> List[Sample]:
+    stats = upstream_flights.stats()
+    return [("", {"outcome": "executed"}, stats["calls"]), ("", {"outcome": "saved"}, stats["saved"])]
+
+
+def _breaker_open() -> List[Sample]:
+    return [("", {"breaker": b["name"]}, 0 if b["state"] == STATE_CLOSED else 1) for b in breaker_states()]
+
+
+def _queue_wait() -> List[Sample]:
+    out: List[Sample] = []
+    for host, stats in limiter_stats().items():
+        out.append(("_sum", {"host": host}, stats["wait_total_s"]))
+        out.append(("_count", {"host": host}, stats["acquired"]))
+    return out
+
+
+def _hedges() -> List[Sample]:
+    out: List[Sample] = []
+    for host, stats in hedge_stats().items():
+        for field in ("requests", "hedged", "wins", "skipped"):
+            out.append(("", {"host": host, "outcome": field}, stats[field]))
+    return out
+
+
+register(Collected("padel_cache_requests_total", "counter",
+                   "Lectures du cache fournisseur (index) par résultat.", _cache_requests))
+register(Collected("padel_cache_entries", "gauge", "Entrées du cache fournisseur.",
+                   lambda: [("", {}, provider_cache.stats()["entries"])]))
+register(Collected("padel_single_flight_total", "counter",
+                   "Fetchs exécutés / évités par coalescence.", _single_flight))
+register(Collected("padel_breaker_open", "gauge", "1 si le disjoncteur est ouvert ou en test.", _breaker_open))
+register(Collected("padel_limiter_queue_wait_seconds", "summary",
+                   "Attente dans la file du limiteur sortant.", _queue_wait))
+register(Collected("padel_hedge_requests_total", "counter", "Requêtes avec hedging par issue.", _hedges))
+
+
+def _after_fork_in_child() -> None:
+    for metric in REGISTRY:
+        if hasattr(metric, "_lock"):
+            metric._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,172 @@
+# padel_prefetch.py
+
+import logging
+import random
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import padel_logic
+
+
+log = logging.getLogger(__name__)
+
+
+# =====================================================
+# ⚙️ CONFIG PRÉCHARGEMENT
+# =====================================================
+
+# Jours préchargés : aujourd'hui + les N-1 suivants
+PREFETCH_HORIZON_DAYS = 7
+
+# Période de rafraîchissement (secondes) des jours proches (aujourd'hui, demain).
+# Doit rester sous PROVIDER_CACHE_TTL pour que le cache ne refroidisse jamais.
+PREFETCH_INTERVAL = 90
+
+# Les jours plus lointains sont rafraîchis moins souvent (période x facteur)
+PREFETCH_FAR_DAY_OFFSET = 2
+PREFETCH_FAR_FACTOR = 2
+
+# Jitter relatif sur chaque période (évite de taper tous les fournisseurs ensemble)
+PREFETCH_JITTER = 0.2
+
+# Espacement minimum entre deux requêtes de préchargement vers un même fournisseur
+PREFETCH_MIN_SPACING = {
+    "doinsport": 1.0,
+    "rpadel": 2.0,
+    "padelshot": 2.0,
+}
+
+
+# =====================================================
+# ⏲️ ORDONNANCEUR
+# =====================================================
+
+class PrefetchScheduler:
+    """
+    Garde au chaud les payloads (fournisseur, club, date) de l'horizon.
+
+    Un seul thread : à chaque tour, il prend la source due la plus proche
+    dans le temps (les jours proches passent d'abord) dont le fournisseur
+    respecte son espacement minimum, et la rafraîchit via refresh_source
+    (le payload qu'un autre worker vient d'écrire dans le cache partagé est
+    repris sans nouveau fetch).
+    """
+
+    def __init__(self, horizon_days: int = PREFETCH_HORIZON_DAYS):
+        self.horizon_days = horizon_days
+        self._next_due: Dict[tuple, float] = {}
+        self._provider_next: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshed = 0
+        self.failures = 0
+
+    # --- planification ---
+
+    def horizon(self, today: Optional[date] = None) -> List[str]:
+        today = today or date.today()
+        return [(today + timedelta(days=i)).isoformat() for i in range(self.horizon_days)]
+
+    def _base_period(self, day_offset: int) -> float:
+        if day_offset >= PREFETCH_FAR_DAY_OFFSET:
+            return PREFETCH_INTERVAL * PREFETCH_FAR_FACTOR
+        return PREFETCH_INTERVAL
+
+    def _period(self, day_offset: int) -> float:
+        return self._base_period(day_offset) * random.uniform(1 - PREFETCH_JITTER, 1 + PREFETCH_JITTER)
+
+    def _fresh_enough(self, day_offset: int) -> float:
+        """
+        Âge (secondes) sous lequel le payload du cache partagé est repris tel
+        quel : chaque worker a son ordonnanceur, et sans cela tous
+        referaient les mêmes fetchs à chaque période.
+        """
+        return self._base_period(day_offset) * (1 - PREFETCH_JITTER)
+
+    def _candidates(self):
+        """(échéance, offset du jour, source) pour tout l'horizon, jours proches d'abord."""
+        out = []
+        dates = self.horizon()
+        for offset, date_iso in enumerate(dates):
+            for source in padel_logic.day_sources(date_iso):
+                key = (source["provider"], source["club"], date_iso)
+                out.append((self._next_due.get(key, 0.0), offset, source))
+
+        # oublie les jours sortis de l'horizon
+        wanted = set(dates)
+        for key in [k for k in self._next_due if k[2] not in wanted]:
+            del self._next_due[key]
+
+        out.sort(key=lambda x: (x[0], x[1]))
+        return out
+
+    def run_once(self) -> float:
+        """
+        Rafraîchit au plus une source due. Renvoie le temps (secondes) à
+        attendre avant le prochain appel.
+        """
+        now = time.monotonic()
+        wait = PREFETCH_INTERVAL
+
+        for due, offset, source in self._candidates():
+            if due > now:
+                wait = min(wait, due - now)
+                break
+
+            provider = source["provider"]
+            provider_ready = self._provider_next.get(provider, 0.0)
+            if provider_ready > now:
+                wait = min(wait, provider_ready - now)
+                continue
+
+            key = (provider, source["club"], source["date_iso"])
+            self._provider_next[provider] = now + PREFETCH_MIN_SPACING.get(provider, 1.0)
+            self._next_due[key] = now + self._period(offset)
+            try:
+                padel_logic.refresh_source(source, self._fresh_enough(offset))
+                self.refreshed += 1
+            except Exception as e:
+                self.failures += 1
+                log.warning("Préchargement %s %s %s : %s", *key, e)
+            return 0.0
+
+        return max(0.05, wait)
+
+    # --- thread ---
+
+    def run_forever(self) -> None:
+        while not self._stop.is_set():
+            self._stop.wait(self.run_once())
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="padel-prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+_scheduler: Optional[PrefetchScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def start_prefetcher() -> PrefetchScheduler:
+    """Démarre (une seule fois par process) le préchargement en arrière-plan."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PrefetchScheduler()
+        _scheduler.start()
+        return _scheduler
+
+
+if __name__ == "__main__":
+    # Worker autonome : python padel_prefetch.py
+    # (ne réchauffe que son propre cache sans PADEL_SHARED_CACHE)
+    logging.basicConfig(level=logging.INFO)
+    PrefetchScheduler().run_forever()
@@ -0,0 +1,233 @@
+# padel_profile.py
+
+import contextvars
+import cProfile
+import hmac
+import itertools
+import json
+import os
+import pstats
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from padel_trace import force_propagation
+
+
+# =====================================================
+# ⚙️ CONFIG PROFILAGE
+# =====================================================
+
+# Jeton admin : sans lui (PADEL_PROFILE_TOKEN vide), le profilage est coupé
+PROFILE_ADMIN_TOKEN = os.environ.get("PADEL_PROFILE_TOKEN", "")
+PROFILE_TOKEN_HEADER = "X-Padel-Admin-Token"
+
+# ?profile=cprofile (pstats) ou ?profile=sample (piles repliées pour flamegraph)
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_MODES = ("cprofile", "sample")
+
+# Dossier où les profils sont écrits
+PROFILE_DIR = os.environ.get(
+    "PADEL_PROFILE_DIR",
+    os.path.join(tempfile.gettempdir(), "padel_finder_profiles"),
+)
+
+# Période d'échantillonnage du mode "sample" (secondes)
+PROFILE_SAMPLE_INTERVAL = 0.005
+
+# Fonctions gardées dans le résumé renvoyé par l'API
+PROFILE_TOP_N = 15
+
+
+def profile_allowed(token: Optional[str]) -> bool:
+    """Vrai seulement si un jeton admin est configuré et qu'il correspond."""
+    if not PROFILE_ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), PROFILE_ADMIN_TOKEN.encode("utf-8"))
+
+
+# =====================================================
+# 🔬 SESSION DE PROFILAGE
+# =====================================================
+
+class ProfileSession:
+    """
+    Profil d'une requête, threads du pool de recherche compris :
+      - "cprofile" : un cProfile.Profile par thread, fusionnés en un pstats
+      - "sample" : un thread échantillonne les piles des threads inscrits
+        (sys._current_frames) et les compte au format "a;b;c N"
+    """
+
+    def __init__(self, mode: str, tags: Dict[str, Any]):
+        self.mode = mode
+        self.tags = tags
+        self._lock = threading.Lock()
+        self._profiles: List[cProfile.Profile] = []
+        self._threads: Dict[int, int] = {}  # ident -> nb d'inscriptions en cours
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self.started = time.perf_counter()
+        self.duration = 0.0
+
+    # --- threads profilés ---
+
+    @contextmanager
+    def thread(self) -> Iterator[None]:
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+
+        profiler = None
+        if self.mode == "cprofile":
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # un autre profileur tourne déjà sur ce thread
+                profiler = None
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                with self._lock:
+                    self._profiles.append(profiler)
+            with self._lock:
+                self._threads[ident] -= 1
+                if not self._threads[ident]:
+                    del self._threads[ident]
+
+    # --- échantillonnage ---
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(PROFILE_SAMPLE_INTERVAL):
+            with self._lock:
+                idents = list(self._threads)
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self._stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        if self.mode == "sample":
+            self._sampler = threading.Thread(target=self._sample_loop, name="padel-profiler", daemon=True)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        self.duration = time.perf_counter() - self.started
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    # --- sorties ---
+
+    def _stats(self) -> Optional[pstats.Stats]:
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self._stacks.most_common())
+
+    def top(self, n: int = PROFILE_TOP_N) -> List[Dict[str, Any]]:
+        """Fonctions les plus coûteuses (cumulé en cprofile, échantillons en sample)."""
+        if self.mode == "sample":
+            leaves: Counter = Counter()
+            for stack, count in self._stacks.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count
+            return [{"function": f, "samples": c} for f, c in leaves.most_common(n)]
+
+        stats = self._stats()
+        if stats is None:
+            return []
+        rows = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:n]
+        return [
+            {
+                "function": f"{name} ({os.path.basename(filename)}:{line})",
+                "calls": nc,
+                "tottime_s": round(tt, 4),
+                "cumtime_s": round(ct, 4),
+            }
+            for (filename, line, name), (cc, nc, tt, ct, callers) in rows
+        ]
+
+    def save(self) -> str:
+        """Écrit le profil (+ un .json avec les paramètres) ; renvoie son chemin."""
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        slug = "-".join(str(self.tags.get(k, "")) for k in ("endpoint", "date", "from_time", "to_time", "mode"))
+        slug = re.sub(r"[^0-9A-Za-z_-]+", "_", slug).strip("_")
+        now = time.time()
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}.{int(now * 1000) % 1000:03d}"
+        base = os.path.join(PROFILE_DIR, f"{stamp}-{os.getpid()}-{next(_saved)}-{slug}")
+
+        if self.mode == "sample":
+            path = base + ".collapsed"
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.collapsed())
+        else:
+            path = base + ".pstats"
+            stats = self._stats()
+            if stats is not None:
+                stats.dump_stats(path)
+            else:
+                open(path, "wb").close()
+
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(
+                {"mode": self.mode, "duration_s": round(self.duration, 4), "tags": self.tags, "profile": path},
+                f, ensure_ascii=False, indent=2, default=str,
+            )
+        return path
+
+
+_active: contextvars.ContextVar = contextvars.ContextVar("padel_profile", default=None)
+
+# Numéro de profil dans le process : deux profils de la même milliseconde
+# (threads gunicorn) n'écrasent pas le même fichier
+_saved = itertools.count(1)
+
+
+@contextmanager
+def profile_request(mode: str, tags: Dict[str, Any]) -> Iterator[ProfileSession]:
+    """
+    Profile le thread courant et les jobs de recherche lancés dedans.
+    `tags` (paramètres de recherche, endpoint) accompagnent le profil écrit.
+    """
+    session = ProfileSession(mode, tags)
+    token = _active.set(session)
+    session.start()
+    try:
+        with force_propagation(), session.thread():
+            yield session
+    finally:
+        session.stop()
+        _active.reset(token)
+
+
+@contextmanager
+def profile_thread() -> Iterator[None]:
+    """Inscrit le thread courant dans le profil actif (no-op sans profil)."""
+    session = _active.get()
+    if session is None:
+        yield
+        return
+    with session.thread():
+        yield
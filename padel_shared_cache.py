@@ -0,0 +1,175 @@
+# padel_shared_cache.py
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+
+log = logging.getLogger(__name__)
+
+
+# =====================================================
+# ⚙️ CONFIG CACHE PARTAGÉ
+# =====================================================
+
+# Fichier SQLite partagé par tous les workers gunicorn de la machine
+# (payloads fournisseurs, clé Padelshot). Désactivé par défaut :
+#   PADEL_SHARED_CACHE=1 : fichier dans cache/ à côté de l'application
+#   PADEL_SHARED_CACHE=/chemin/cache.sqlite3 : fichier choisi
+# Le dossier doit n'être inscriptible que par l'application : quiconque peut
+# écrire le fichier peut servir de faux créneaux ou une fausse clé.
+SHARED_CACHE_SETTING = os.environ.get("PADEL_SHARED_CACHE", "off")
+SHARED_CACHE_DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "cache", "padel_finder_cache.sqlite3"
+)
+
+# Rétention max d'une entrée (au-delà : supprimée à la prochaine éviction)
+SHARED_CACHE_MAX_AGE = 6 * 3600
+
+# Nombre max d'entrées gardées (éviction des moins récemment lues)
+SHARED_CACHE_MAX_ENTRIES = 1000
+
+# Une éviction toutes les N écritures
+SHARED_CACHE_EVICT_EVERY = 50
+
+# On ne réécrit la date de dernière lecture qu'au-delà de ce délai
+# (évite une écriture SQLite à chaque hit)
+_TOUCH_AFTER = 30
+
+
+# =====================================================
+# 🗄️ CACHE SQLITE (WAL)
+# =====================================================
+
+class SQLiteCache:
+    """
+    Cache clé -> valeur JSON partagé entre process, dans un fichier SQLite
+    en mode WAL : lectures concurrentes sans blocage, écritures atomiques
+    (une transaction par set), TTL côté lecteur et éviction bornée en taille.
+
+    Une connexion par thread et par process (re-créée après un fork).
+    Toute erreur SQLite est journalisée et traitée comme un miss.
+    """
+
+    def __init__(self, path: str, max_age: float = SHARED_CACHE_MAX_AGE,
+                 max_entries: int = SHARED_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._init_lock = threading.Lock()
+        self._initialized_pid = None
+
+    def _conn(self) -> sqlite3.Connection:
+        pid = os.getpid()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "pid", None) == pid:
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=2.0, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=2000")
+        with self._init_lock:
+            if self._initialized_pid != pid:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    " key TEXT PRIMARY KEY,"
+                    " value TEXT NOT NULL,"
+                    " stored_at REAL NOT NULL,"
+                    " accessed_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+                self._initialized_pid = pid
+        self._local.conn = conn
+        self._local.pid = pid
+        return conn
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(valeur, âge en secondes) ou None si absente / trop vieille."""
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT value, stored_at, accessed_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, stored_at, accessed_at = row
+            now = time.time()
+            age = max(0.0, now - stored_at)
+            if age > self.max_age:
+                return None
+            if now - accessed_at > _TOUCH_AFTER:
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(value), age
+        except (sqlite3.Error, ValueError) as e:
+            log.warning("Cache partagé (lecture %s) : %s", key, e)
+            return None
+
+    def set(self, key: str, value: Any, age: float = 0.0) -> None:
+        try:
+            payload = json.dumps(value, separators=(",", ":"))
+            now = time.time()
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now - age, now),
+            )
+            self._writes += 1
+            if self._writes % SHARED_CACHE_EVICT_EVERY == 0:
+                self.evict()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            log.warning("Cache partagé (écriture %s) : %s", key, e)
+
+    def delete(self, key: str) -> None:
+        try:
+            self._conn().execute("DELETE FROM entries WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            log.warning("Cache partagé (suppression %s) : %s", key, e)
+
+    def evict(self) -> None:
+        """Supprime les entrées trop vieilles puis les moins lues au-delà de max_entries."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM entries WHERE stored_at < ?", (time.time() - self.max_age,))
+            conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self) -> None:
+        try:
+            self._conn().execute("DELETE FROM entries")
+        except sqlite3.Error as e:
+            log.warning("Cache partagé (vidage) : %s", e)
+
+
+def _open_shared_cache() -> Optional[SQLiteCache]:
+    setting = SHARED_CACHE_SETTING.strip()
+    if setting.lower() in ("", "0", "off"):
+        return None
+    path = SHARED_CACHE_DEFAULT_PATH if setting.lower() in ("1", "on") else setting
+    try:
+        os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+    except OSError as e:
+        log.warning("Cache partagé désactivé (%s) : %s", path, e)
+        return None
+    return SQLiteCache(path)
+
+
+shared_cache = _open_shared_cache()
+
+
+def shared_key(*parts: str) -> str:
+    return "|".join(parts)
@@ -0,0 +1,207 @@
+# padel_trace.py
+
+import contextvars
+import functools
+import itertools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+log = logging.getLogger(__name__)
+
+
+# =====================================================
+# ⚙️ CONFIG TRACES
+# =====================================================
+
+# Fichier JSON lines où chaque recherche tracée ajoute une ligne
+TRACE_LOG_PATH = os.environ.get(
+    "PADEL_TRACE_LOG",
+    os.path.join(tempfile.gettempdir(), "padel_finder_traces.jsonl"),
+)
+
+# Activation par requête : ?trace=1 ou en-tête X-Padel-Trace: 1
+TRACE_QUERY_PARAM = "trace"
+TRACE_HEADER = "X-Padel-Trace"
+
+
+# =====================================================
+# 🧵 SPANS
+# =====================================================
+
+class Span:
+    __slots__ = ("trace", "id", "parent_id", "name", "attrs", "start", "end", "thread")
+
+    def __init__(self, trace: "Trace", parent_id: Optional[int], name: str, attrs: Dict[str, Any]):
+        self.trace = trace
+        self.id = next(trace._ids)
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.thread = threading.current_thread().name
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        origin = self.trace.start
+        end = self.end if self.end is not None else time.perf_counter()
+        return {
+            "id": self.id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 2),
+            "duration_ms": round((end - self.start) * 1000, 2),
+            "thread": self.thread,
+            "attrs": self.attrs,
+        }
+
+
+class Trace:
+    """Arbre de spans d'une recherche (liste plate, chaque span connaît son parent)."""
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.id = f"{int(time.time() * 1000):x}-{os.getpid()}-{threading.get_ident() % 10000}"
+        self.start = time.perf_counter()
+        self.started_at = time.time()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.spans: List[Span] = []
+        self.root = self._add(None, name, attrs)
+
+    def _add(self, parent_id: Optional[int], name: str, attrs: Dict[str, Any]) -> Span:
+        span = Span(self, parent_id, name, attrs)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            flat = [s.to_dict() for s in self.spans]
+
+        # ordre de l'arbre (parcours en profondeur, enfants par début) pour le waterfall
+        children: Dict[Optional[int], List[Dict[str, Any]]] = {}
+        for s in flat:
+            children.setdefault(s["parent"], []).append(s)
+        spans: List[Dict[str, Any]] = []
+        stack = [(s, 0) for s in sorted(children.get(None, []), key=lambda x: x["start_ms"], reverse=True)]
+        while stack:
+            s, depth = stack.pop()
+            s["depth"] = depth
+            spans.append(s)
+            kids = sorted(children.get(s["id"], []), key=lambda x: x["start_ms"], reverse=True)
+            stack.extend((k, depth + 1) for k in kids)
+
+        total = max((s["start_ms"] + s["duration_ms"] for s in spans), default=0.0)
+        return {
+            "trace_id": self.id,
+            "started_at": self.started_at,
+            "total_ms": round(total, 2),
+            "spans": spans,
+        }
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("padel_span", default=None)
+_write_lock = threading.Lock()
+
+
+def tracing() -> bool:
+    return _current.get() is not None
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Span enfant du span courant ; no-op (yield None) hors recherche tracée."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.trace._add(parent.id, name, attrs)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.attrs["error"] = str(e) or e.__class__.__name__
+        raise
+    finally:
+        child.end = time.perf_counter()
+        _current.reset(token)
+
+
+def record_span(name: str, start: float, end: float, **attrs: Any) -> None:
+    """Ajoute un span déjà mesuré (perf_counter) sous le span courant."""
+    parent = _current.get()
+    if parent is None:
+        return
+    child = parent.trace._add(parent.id, name, attrs)
+    child.start = start
+    child.end = end
+
+
+_force_propagation: contextvars.ContextVar = contextvars.ContextVar("padel_force_propagation", default=False)
+
+
+@contextmanager
+def force_propagation() -> Iterator[None]:
+    """propagate() copie le contexte même sans trace (ex. profilage, voir padel_profile)."""
+    token = _force_propagation.set(True)
+    try:
+        yield
+    finally:
+        _force_propagation.reset(token)
+
+
+def propagate(fn: Callable) -> Callable:
+    """
+    `fn` exécutée dans le contexte courant (pour un pool de threads) :
+    ses spans se rattachent au span courant. Sans trace, `fn` telle quelle.
+    """
+    if _current.get() is None and not _force_propagation.get():
+        return fn
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.run(fn, *args, **kwargs)
+
+
+@contextmanager
+def start_trace(name: str, **attrs: Any) -> Iterator[Trace]:
+    """Démarre une trace ; à la sortie, elle est ajoutée à TRACE_LOG_PATH."""
+    trace = Trace(name, attrs)
+    token = _current.set(trace.root)
+    try:
+        yield trace
+    finally:
+        trace.root.end = time.perf_counter()
+        _current.reset(token)
+        write_trace(trace)
+
+
+def write_trace(trace: Trace) -> None:
+    if not TRACE_LOG_PATH:
+        return
+    line = json.dumps(trace.to_dict(), ensure_ascii=False, separators=(",", ":"), default=str)
+    try:
+        with _write_lock, open(TRACE_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        log.warning("Trace %s non écrite : %s", trace.id, e)
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Décorateur : span `name` autour de la fonction (si une trace est active)."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
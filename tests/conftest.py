@@ -0,0 +1,39 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import pytest
+
+# pas de cache SQLite partagé entre les tests (ni avec un serveur local)
+os.environ.setdefault("PADEL_SHARED_CACHE", "off")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# générateurs de payloads du corpus (bench/fixtures.py)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+import app as app_module  # noqa: E402
+import padel_logic  # noqa: E402
+from fixtures import doinsport_day, padelshot_day, rpadel_day  # noqa: E402
+from padel_breaker import _breakers  # noqa: E402
+from padel_cache import provider_cache  # noqa: E402
+
+
+@pytest.fixture
+def stub_providers(monkeypatch):
+    """Les trois fetch_*_day renvoient une journée type du corpus ; caches et disjoncteurs vidés."""
+    monkeypatch.setattr(padel_logic, "fetch_doinsport_day", lambda club, d: doinsport_day())
+    monkeypatch.setattr(padel_logic, "fetch_rpadel_day", lambda d: rpadel_day())
+    monkeypatch.setattr(padel_logic, "fetch_padelshot_day", lambda d: padelshot_day())
+    provider_cache.clear()
+    _breakers.clear()
+    yield monkeypatch
+    provider_cache.clear()
+    _breakers.clear()
+
+
+@pytest.fixture
+def client(stub_providers):
+    """Client de test Flask, fournisseurs simulés (stub_providers)."""
+    return app_module.app.test_client()
@@ -0,0 +1,17 @@
+# tests/test_api_courts.py
+
+def test_free_courts_together(client):
+    resp = client.get("/api/courts?date=2026-10-20&from_time=17:00&to_time=21:00&durations=60&courts=2")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["courts_wanted"] == 2
+    assert data["rpadel"] is None
+    club = data["doinsport"][0]
+    for first, last in club["together"]["60"]:
+        assert "17:00" <= first <= last <= "20:00"
+    assert set(club["courts"]) == {"Padel 1", "Padel 2", "Padel 3", "Padel 4"}
+
+
+def test_invalid_court_count_is_rejected(client):
+    assert client.get("/api/courts?date=2026-10-20&courts=0").status_code == 400
+    assert client.get("/api/courts?date=2026-10-20&courts=x").status_code == 400
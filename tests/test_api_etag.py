@@ -0,0 +1,32 @@
+# tests/test_api_etag.py
+
+QUERY = "/api/search?date=2026-10-20&from_time=17:00&to_time=22:00&durations=60,90&mode=window"
+
+
+def test_identity_response_has_strong_etag(client):
+    resp = client.get(QUERY)
+    assert resp.status_code == 200
+    assert "Content-Encoding" not in resp.headers
+    etag, weak = resp.get_etag()
+    assert etag and not weak
+
+
+def test_gzip_response_has_its_own_strong_etag(client):
+    plain, _ = client.get(QUERY).get_etag()
+    resp = client.get(QUERY, headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    etag, weak = resp.get_etag()
+    assert not weak
+    assert etag == f"{plain}-gzip"
+
+
+def test_if_none_match_with_encoded_etag_gives_304(client):
+    etag = client.get(QUERY, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    resp = client.get(QUERY, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+
+
+def test_if_none_match_with_other_etag_gives_200(client):
+    resp = client.get(QUERY, headers={"If-None-Match": '"autre"'})
+    assert resp.status_code == 200
@@ -0,0 +1,99 @@
+# tests/test_breaker.py
+
+import time
+
+import pytest
+import requests
+
+from padel_breaker import (STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker, CircuitOpenError,
+                           is_provider_failure)
+from padel_http import ProviderQueueTimeout, SearchDeadlineExceeded
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status}", response=response)
+
+
+def failing(error):
+    def fn():
+        raise error
+    return fn
+
+
+def test_closed_open_half_open_closed_cycle():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            breaker.call(failing(requests.ConnectionError("refused")))
+    assert breaker.state == STATE_OPEN
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: calls.append(1))
+    assert calls == [] and breaker.rejected == 1
+
+    time.sleep(0.06)
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == STATE_CLOSED and breaker.failures == 0
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    with pytest.raises(requests.Timeout):
+        breaker.call(failing(requests.Timeout()))
+    time.sleep(0.06)
+    with pytest.raises(requests.HTTPError):
+        breaker.call(failing(http_error(503)))
+    assert breaker.state == STATE_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: None)
+
+
+def test_single_probe_while_half_open():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.0)
+    with pytest.raises(requests.Timeout):
+        breaker.call(failing(requests.Timeout()))
+
+    def probe():
+        assert breaker.state == STATE_HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: None)
+        return "probe"
+
+    assert breaker.call(probe) == "probe"
+    assert breaker.state == STATE_CLOSED
+
+
+@pytest.mark.parametrize("error", [
+    http_error(400), http_error(404), http_error(429),
+    ValueError("date invalide"), AttributeError("'NoneType' object has no attribute 'get'"),
+    ProviderQueueTimeout("file pleine"), SearchDeadlineExceeded("budget"),
+])
+def test_ignored_errors_never_open_the_circuit(error):
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    for _ in range(3):
+        with pytest.raises(type(error)):
+            breaker.call(failing(error))
+    assert breaker.state == STATE_CLOSED and breaker.failures == 0
+    assert not is_provider_failure(error)
+
+
+def test_ignored_error_releases_the_probe():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.0)
+    with pytest.raises(requests.Timeout):
+        breaker.call(failing(requests.Timeout()))
+    with pytest.raises(ValueError):
+        breaker.call(failing(ValueError("local")))
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.call(lambda: 1) == 1
+    assert breaker.state == STATE_CLOSED
+
+
+@pytest.mark.parametrize("error", [
+    requests.Timeout(), requests.ConnectionError(), http_error(500), http_error(503),
+    requests.HTTPError("sans réponse"),
+])
+def test_provider_failures(error):
+    assert is_provider_failure(error)
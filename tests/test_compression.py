@@ -0,0 +1,43 @@
+# tests/test_compression.py
+
+import pytest
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+import app as app_module
+
+API = "/api/search?date=2026-10-20&from_time=17:00&to_time=22:00&durations=60,90&mode=window"
+FORM = {"date": "2026-10-20", "from_time": "17:00", "to_time": "22:00", "durations": "60", "mode": "window"}
+
+
+@pytest.mark.parametrize("header, with_brotli, expected", [
+    ("gzip", False, "gzip"),
+    ("gzip;q=0, identity", False, None),
+    ("*;q=0", False, None),
+    ("identity", False, None),
+    ("", False, None),
+    ("*", False, "gzip"),
+    ("gzip, br", False, "gzip"),
+    ("gzip, br", True, "br"),
+    ("br;q=0.5, gzip", True, "gzip"),
+    ("br;q=0, gzip", True, "gzip"),
+])
+def test_preferred_encoding(monkeypatch, header, with_brotli, expected):
+    monkeypatch.setattr(app_module, "brotli", object() if with_brotli else None)
+    assert app_module._preferred_encoding(parse_accept_header(header, Accept)) == expected
+
+
+def test_refused_gzip_is_not_used(client):
+    resp = client.get(API, headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert resp.status_code == 200
+    assert "Content-Encoding" not in resp.headers
+    assert resp.get_json()["date_iso"] == "2026-10-20"
+
+
+def test_streamed_page_respects_q0(client):
+    resp = client.post("/", data=FORM, headers={"Accept-Encoding": "gzip;q=0"})
+    assert "Content-Encoding" not in resp.headers
+    assert b"</html>" in resp.get_data()
+
+    resp = client.post("/", data=FORM, headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
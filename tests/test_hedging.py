@@ -0,0 +1,128 @@
+# tests/test_hedging.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+import padel_http
+from padel_http import (LimitedSession, ProviderLimiter, ProviderQueueTimeout, SearchDeadlineExceeded,
+                        hedged_request, request_deadline)
+
+HOST = "hedge.test"
+URL = f"http://{HOST}/day"
+OTHER_HOST = "healthy.test"
+OTHER_URL = f"http://{OTHER_HOST}/day"
+
+
+class SlowAdapter(BaseAdapter):
+    """Répond 200 après `delay` secondes, sans réseau."""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        self.sent += 1
+        time.sleep(self.delay)
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = b"{}"
+        resp.request = request
+        resp.url = request.url
+        return resp
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = ProviderLimiter(HOST, rate=1000.0, burst=10, max_in_flight=1)
+    monkeypatch.setitem(padel_http._limiters, HOST, limiter)
+    monkeypatch.setattr(padel_http, "HEDGE_INITIAL_DELAY", 0.2)
+    monkeypatch.delitem(padel_http._hedging, HOST, raising=False)
+    yield limiter
+    padel_http._hedging.pop(HOST, None)
+
+
+def session_with(adapter, host=HOST):
+    session = LimitedSession()
+    session.mount(f"http://{host}", adapter)
+    return session
+
+
+def test_queue_wait_does_not_trigger_a_hedge(limiter):
+    adapter = SlowAdapter(0.05)
+    limiter.acquire()
+    threading.Timer(0.4, limiter.release).start()
+
+    resp = hedged_request(session_with(adapter), "GET", URL)
+    assert resp.status_code == 200
+    assert adapter.sent == 1
+
+    hedging = padel_http._hedging[HOST]
+    assert hedging.stats()["hedged"] == 0 and hedging.stats()["skipped"] == 0
+    # latence mesurée sans les 0,4 s passées en file
+    assert max(hedging._latencies) < 0.3
+
+
+def test_slow_host_is_hedged_after_the_threshold(limiter, monkeypatch):
+    monkeypatch.setattr(limiter, "max_in_flight", 2)
+    monkeypatch.setattr(limiter, "_slots", threading.BoundedSemaphore(2))
+    adapter = SlowAdapter(0.5)
+
+    start = time.monotonic()
+    resp = hedged_request(session_with(adapter), "GET", URL)
+    assert resp.status_code == 200
+    assert adapter.sent == 2
+    assert padel_http._hedging[HOST].stats()["hedged"] == 1
+    assert time.monotonic() - start < 1.0
+
+
+def test_saturated_host_does_not_delay_other_hosts(limiter, monkeypatch):
+    monkeypatch.setattr(padel_http, "_hedge_pool", ThreadPoolExecutor(max_workers=4))
+    monkeypatch.setattr(padel_http, "PROVIDER_QUEUE_TIMEOUT", 1.0)
+    monkeypatch.setitem(padel_http._limiters, OTHER_HOST, ProviderLimiter(OTHER_HOST, 1000.0, 10, 4))
+    monkeypatch.delitem(padel_http._hedging, OTHER_HOST, raising=False)
+
+    # l'hôte saturé : son seul créneau est pris, 20 requêtes attendent en file
+    limiter.acquire()
+    slow_session = session_with(SlowAdapter(0.05))
+
+    def queued_request():
+        with pytest.raises(ProviderQueueTimeout):
+            hedged_request(slow_session, "GET", URL)
+
+    queued = [threading.Thread(target=queued_request) for _ in range(20)]
+    for t in queued:
+        t.start()
+    time.sleep(0.1)
+
+    start = time.monotonic()
+    resp = hedged_request(session_with(SlowAdapter(0.01), OTHER_HOST), "GET", OTHER_URL)
+    elapsed = time.monotonic() - start
+    assert resp.status_code == 200
+    assert elapsed < 0.5
+
+    for t in queued:
+        t.join(3)
+    limiter.release()
+    padel_http._hedging.pop(OTHER_HOST, None)
+
+
+def test_queue_wait_is_bounded_by_the_search_deadline(limiter):
+    limiter.acquire()
+    start = time.monotonic()
+    with request_deadline(time.monotonic() + 0.2):
+        with pytest.raises(ProviderQueueTimeout):
+            hedged_request(session_with(SlowAdapter(0.01)), "GET", URL)
+        assert time.monotonic() - start < 0.5
+        time.sleep(0.25)
+        with pytest.raises(SearchDeadlineExceeded):
+            hedged_request(session_with(SlowAdapter(0.01)), "GET", URL)
+    limiter.release()
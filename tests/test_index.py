@@ -0,0 +1,176 @@
+# tests/test_index.py
+
+import random
+
+import pytest
+
+from padel_index import (
+    CELL_MIN,
+    CELLS_PER_DAY,
+    MATCH_EXACT,
+    MATCH_WINDOW,
+    CourtDay,
+    DayIndex,
+    at_least_k,
+    cells_mask,
+    mask_to_minutes,
+    run_starts,
+)
+
+
+def bits(mask):
+    return [i for i in range(CELLS_PER_DAY) if mask >> i & 1]
+
+
+def brute_run_starts(mask, duration_min):
+    cells = -(-duration_min // CELL_MIN)
+    return [
+        i for i in range(CELLS_PER_DAY)
+        if all(mask >> j & 1 for j in range(i, i + cells)) and i + cells <= CELLS_PER_DAY
+    ]
+
+
+@pytest.mark.parametrize("duration_min", [5, 10, 15, 25, 60, 90, 95, 120, 235])
+def test_run_starts_matches_brute_force(duration_min):
+    rng = random.Random(duration_min)
+    for _ in range(30):
+        mask = 0
+        for _ in range(rng.randint(0, 6)):
+            first = rng.randrange(CELLS_PER_DAY)
+            mask |= cells_mask(first, first + rng.randint(1, 40))
+        assert bits(run_starts(mask, duration_min)) == brute_run_starts(mask, duration_min)
+
+
+def test_run_starts_rounds_up_partial_cells():
+    mask = cells_mask(0, 12)  # 00:00 -> 01:00
+    assert bits(run_starts(mask, 60)) == [0]
+    assert bits(run_starts(mask, 61)) == []
+
+
+@pytest.mark.parametrize("k", [0, 1, 2, 3, 4, 5])
+def test_at_least_k_matches_brute_force(k):
+    rng = random.Random(k)
+    masks = [rng.getrandbits(CELLS_PER_DAY) for _ in range(4)]
+    expected = [i for i in range(CELLS_PER_DAY) if sum(m >> i & 1 for m in masks) >= k]
+    assert bits(at_least_k(masks, k)) == expected
+
+
+def test_is_free_off_grid_uses_exact_intervals():
+    court = CourtDay("Piste")
+    court.add_busy(18 * 60 + 7, 19 * 60 + 2)  # 18:07 -> 19:02
+    # juste avant / juste après : libres, même dans la case 5 min entamée
+    assert court.is_free(17 * 60, 18 * 60 + 7)
+    assert court.is_free(19 * 60 + 2, 20 * 60)
+    # chevauchements d'une minute
+    assert not court.is_free(17 * 60, 18 * 60 + 8)
+    assert not court.is_free(19 * 60 + 1, 20 * 60)
+    assert not court.is_free(18 * 60 + 30, 18 * 60 + 40)
+
+
+def test_is_free_on_grid_with_off_grid_query():
+    court = CourtDay("Piste")
+    court.add_busy(18 * 60, 19 * 60)
+    assert court.is_free(19 * 60, 19 * 60 + 33)
+    assert court.is_free(17 * 60 + 3, 18 * 60)
+    assert not court.is_free(18 * 60 + 58, 19 * 60 + 3)
+
+
+def test_is_free_matches_brute_force_off_grid():
+    rng = random.Random(7)
+    for _ in range(200):
+        court = CourtDay("Piste")
+        busy = []
+        for _ in range(rng.randint(0, 4)):
+            s = rng.randrange(0, 23 * 60)
+            e = s + rng.randint(1, 120)
+            court.add_busy(s, e)
+            busy.append((s, e))
+        s = rng.randrange(0, 23 * 60)
+        e = s + rng.randint(1, 120)
+        expected = all(be <= s or bs >= e for bs, be in busy)
+        assert court.is_free(s, e) == expected
+
+
+def test_free_starts_and_courts_free_together():
+    index = DayIndex("Club")
+    a = index.court("A")
+    b = index.court("B")
+    a.add_bookable(18 * 60, 20 * 60)
+    b.add_bookable(18 * 60, 20 * 60)
+    b.add_busy(18 * 60, 18 * 60 + 30)
+
+    assert a.free_starts(90) == [18 * 60 + m for m in range(0, 31, CELL_MIN)]
+    assert b.free_starts(90) == [18 * 60 + 30]
+    assert index.courts_free_together(2, 90) == [18 * 60 + 30]
+    assert index.courts_free_together(3, 60) == []
+
+
+def test_mask_to_minutes():
+    assert mask_to_minutes(cells_mask(2, 4)) == [10, 15]
+
+
+# --- DayIndex.query ---
+
+def offer(start_min, duration_min, court="P1"):
+    return {"start_min": start_min, "duration_min": duration_min, "court": court}
+
+
+def day_with(offers):
+    index = DayIndex("Club")
+    for o in offers:
+        index.add_offer(o)
+    return index.finalize()
+
+
+def pairs(slots):
+    return [(s["start_min"], s["duration_min"]) for s in slots]
+
+
+def test_exact_mode_only_keeps_slots_starting_at_min_from():
+    index = day_with([offer(17 * 60 + 30, 60), offer(18 * 60, 60), offer(18 * 60, 90), offer(18 * 60 + 5, 60)])
+    assert pairs(index.query(18 * 60, 20 * 60, {60, 90}, MATCH_EXACT)) == [(1080, 60), (1080, 90)]
+    assert index.query(18 * 60 + 1, 20 * 60, None, MATCH_EXACT) == []
+
+
+def test_window_mode_bisect_bounds_are_inclusive():
+    index = day_with([offer(17 * 60 + 55, 60), offer(18 * 60, 60), offer(19 * 60, 60), offer(20 * 60, 0)])
+    # 17:55 est avant la fenêtre, 20:00 + 0 min tient pile dans [18:00, 20:00]
+    assert pairs(index.query(18 * 60, 20 * 60, None, MATCH_WINDOW)) == [(1080, 60), (1140, 60), (1200, 0)]
+
+
+def test_slots_must_end_by_min_to():
+    index = day_with([offer(18 * 60, 60), offer(18 * 60, 90), offer(19 * 60, 60), offer(19 * 60, 90)])
+    # 19:00 + 90 = 20:30 > 20:00 : refusé ; 19:00 + 60 = 20:00 : accepté (borne incluse)
+    assert pairs(index.query(18 * 60, 20 * 60, None, MATCH_WINDOW)) == [(1080, 60), (1080, 90), (1140, 60)]
+    assert pairs(index.query(18 * 60, 19 * 60 + 30, None, MATCH_EXACT)) == [(1080, 60), (1080, 90)]
+    assert pairs(index.query(18 * 60, 19 * 60 + 29, None, MATCH_EXACT)) == [(1080, 60)]
+
+
+def test_allowed_durations_filter_and_copies():
+    index = day_with([offer(18 * 60, 60), offer(18 * 60, 90), offer(18 * 60, 120)])
+    slots = index.query(18 * 60, 22 * 60, {90}, MATCH_WINDOW)
+    assert pairs(slots) == [(1080, 90)]
+    slots[0]["start_min"] = 0
+    assert pairs(index.query(18 * 60, 22 * 60, {90}, MATCH_WINDOW)) == [(1080, 90)]
+
+
+def test_same_start_and_duration_keep_provider_order():
+    index = day_with([offer(18 * 60, 60, "P2"), offer(17 * 60, 60), offer(18 * 60, 60, "P1")])
+    assert [s["court"] for s in index.query(18 * 60, 19 * 60, None, MATCH_EXACT)] == ["P2", "P1"]
+
+
+@pytest.mark.parametrize("mode", [MATCH_EXACT, MATCH_WINDOW])
+def test_query_matches_brute_force(mode):
+    rng = random.Random(7)
+    offers = [offer(rng.randrange(7 * 60, 24 * 60, 5), rng.choice((30, 60, 90, 120)), f"P{i}") for i in range(300)]
+    index = day_with(offers)
+    for _ in range(200):
+        lo = rng.randrange(7 * 60, 24 * 60, 5)
+        hi = lo + rng.randrange(0, 6 * 60, 5)
+        allowed = set(rng.sample((30, 60, 90, 120), rng.randint(1, 4)))
+        expected = sorted(
+            (o["start_min"], o["duration_min"]) for o in offers
+            if (o["start_min"] == lo if mode == MATCH_EXACT else lo <= o["start_min"] <= hi)
+            and o["start_min"] + o["duration_min"] <= hi and o["duration_min"] in allowed
+        )
+        assert pairs(index.query(lo, hi, allowed, mode)) == expected
@@ -0,0 +1,76 @@
+# tests/test_limiter.py
+
+import threading
+import time
+
+import pytest
+
+from padel_http import ProviderLimiter, ProviderQueueTimeout
+
+
+def test_burst_then_refill_at_rate():
+    limiter = ProviderLimiter("h", rate=20.0, burst=3, max_in_flight=10)
+    for _ in range(3):
+        assert limiter.acquire(timeout=1.0) < 0.01
+    # seau vide : le jeton suivant arrive au bout de 1/rate = 50 ms
+    waited = limiter.acquire(timeout=1.0)
+    assert 0.03 < waited < 0.2
+    assert limiter.stats()["acquired"] == 4
+    assert limiter.stats()["in_flight"] == 4
+
+
+def test_tokens_never_exceed_burst():
+    limiter = ProviderLimiter("h", rate=1000.0, burst=2, max_in_flight=10)
+    time.sleep(0.05)
+    assert limiter.try_acquire() and limiter.try_acquire()
+    # 0,05 s à 1000/s auraient donné 50 jetons sans plafond ; il en reste < 1
+    limiter.rate = 1.0
+    assert not limiter.try_acquire()
+
+
+def test_max_in_flight_blocks_until_release():
+    limiter = ProviderLimiter("h", rate=1000.0, burst=10, max_in_flight=2)
+    limiter.acquire()
+    limiter.acquire()
+    assert not limiter.try_acquire()
+
+    threading.Timer(0.1, limiter.release).start()
+    waited = limiter.acquire(timeout=1.0)
+    assert 0.05 < waited < 0.5
+    assert limiter.stats()["in_flight"] == 2
+
+
+def test_queue_timeout_when_all_slots_are_taken():
+    limiter = ProviderLimiter("h", rate=1000.0, burst=10, max_in_flight=1)
+    limiter.acquire()
+    start = time.monotonic()
+    with pytest.raises(ProviderQueueTimeout, match="trop de requêtes en cours"):
+        limiter.acquire(timeout=0.1)
+    assert 0.08 < time.monotonic() - start < 0.5
+    assert limiter.stats()["in_flight"] == 1
+
+
+def test_queue_timeout_on_rate_gives_the_slot_back():
+    limiter = ProviderLimiter("h", rate=1.0, burst=1, max_in_flight=2)
+    limiter.acquire()
+    start = time.monotonic()
+    with pytest.raises(ProviderQueueTimeout, match="limite de débit atteinte"):
+        limiter.acquire(timeout=0.2)
+    # l'attente d'un jeton (1 s) dépasse le délai : échec sans dormir pour rien
+    assert time.monotonic() - start < 0.1
+    limiter.release()
+    # les deux créneaux sont de nouveau libres
+    assert limiter._slots.acquire(blocking=False) and limiter._slots.acquire(blocking=False)
+
+
+def test_wait_statistics():
+    limiter = ProviderLimiter("h", rate=10.0, burst=1, max_in_flight=5)
+    limiter.acquire()
+    limiter.acquire(timeout=1.0)
+    limiter.release()
+    limiter.release()
+    stats = limiter.stats()
+    assert stats["acquired"] == 2 and stats["in_flight"] == 0
+    assert 0.05 < stats["wait_max_s"] < 0.3
+    assert stats["wait_total_s"] == pytest.approx(stats["wait_max_s"], abs=0.01)
+    assert stats["wait_avg_s"] == pytest.approx(stats["wait_total_s"] / 2, abs=0.001)
@@ -0,0 +1,66 @@
+# tests/test_load_source.py
+
+import pytest
+
+import padel_logic
+from fixtures import padelshot_day
+from padel_cache import provider_cache
+from padel_shared_cache import SQLiteCache
+
+DATE = "2026-10-20"
+
+
+@pytest.fixture
+def shared(tmp_path, stub_providers):
+    cache = SQLiteCache(str(tmp_path / "shared.sqlite3"))
+    stub_providers.setattr(padel_logic, "shared_cache", cache)
+    return cache
+
+
+def counting_fetch(monkeypatch, payload):
+    calls = []
+
+    def fetch(date_iso):
+        calls.append(date_iso)
+        return payload
+
+    monkeypatch.setattr(padel_logic, "fetch_padelshot_day", fetch)
+    return calls
+
+
+def test_unparsable_payload_is_not_cached(shared, monkeypatch):
+    counting_fetch(monkeypatch, {"d": None})
+    source = padel_logic.padelshot_source(DATE)
+    with pytest.raises(AttributeError):
+        padel_logic._load_source(source)
+    assert shared.get_entry(padel_logic.shared_key("padelshot", source["club"], DATE)) is None
+
+
+def test_parsed_payload_goes_to_shared_cache(shared, monkeypatch):
+    counting_fetch(monkeypatch, padelshot_day())
+    source = padel_logic.padelshot_source(DATE)
+    index, age = padel_logic._load_source(source)
+    assert age == 0.0 and index.offers()
+    assert shared.get_entry(padel_logic.shared_key("padelshot", source["club"], DATE)) is not None
+
+
+def test_refresh_reuses_a_fresh_shared_payload(shared, monkeypatch):
+    calls = counting_fetch(monkeypatch, padelshot_day())
+    source = padel_logic.padelshot_source(DATE)
+    shared.set(padel_logic.shared_key("padelshot", source["club"], DATE), padelshot_day(), age=10)
+
+    padel_logic.refresh_source(source, shared_max_age=60)
+    assert calls == []
+    _, age = provider_cache.get_entry(("padelshot:index", source["club"], DATE))
+    assert age >= 10
+
+    padel_logic.refresh_source(source, shared_max_age=5)
+    assert calls == [DATE]
+
+
+def test_refresh_without_max_age_always_fetches(shared, monkeypatch):
+    calls = counting_fetch(monkeypatch, padelshot_day())
+    source = padel_logic.padelshot_source(DATE)
+    shared.set(padel_logic.shared_key("padelshot", source["club"], DATE), padelshot_day())
+    padel_logic.refresh_source(source)
+    assert calls == [DATE]
@@ -0,0 +1,58 @@
+# tests/test_padelshot_key.py
+
+import json
+import os
+
+import pytest
+import requests
+
+import padel_logic
+from padel_logic import _padelshot_key_rejected
+
+
+def response(status, body):
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = body if isinstance(body, bytes) else json.dumps(body).encode()
+    return resp
+
+
+@pytest.mark.parametrize("status, body", [
+    (401, b""),
+    (403, b"Forbidden"),
+    (200, {"d": None}),
+    (200, {"d": {}}),
+    (200, {}),
+])
+def test_key_rejected(status, body):
+    assert _padelshot_key_rejected(response(status, body))
+
+
+@pytest.mark.parametrize("status, body", [
+    (200, {"d": {"Columnas": []}}),
+    (500, b"Internal Server Error"),
+    (503, b"Service Unavailable"),
+    (404, b"Not Found"),
+    (200, b"<html>maintenance</html>"),
+])
+def test_key_not_rejected(status, body):
+    assert not _padelshot_key_rejected(response(status, body))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork indisponible")
+def test_forked_worker_forgets_the_inherited_key(monkeypatch):
+    monkeypatch.setattr(padel_logic, "_padelshot_key", "cle-du-parent")
+    monkeypatch.setattr(padel_logic, "_padelshot_key_at", 1.0)
+    lock = padel_logic._padelshot_key_lock
+    lock.acquire()
+    try:
+        pid = os.fork()
+        if pid == 0:
+            ok = (padel_logic._padelshot_key is None
+                  and padel_logic._padelshot_key_lock.acquire(timeout=1))
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+    finally:
+        lock.release()
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+    assert padel_logic._padelshot_key == "cle-du-parent"
@@ -0,0 +1,18 @@
+# tests/test_profile.py
+
+import os
+
+import padel_profile
+from padel_profile import ProfileSession
+
+
+def test_profiles_saved_in_the_same_second_do_not_collide(tmp_path, monkeypatch):
+    monkeypatch.setattr(padel_profile, "PROFILE_DIR", str(tmp_path))
+    tags = {"endpoint": "api_search", "date": "2026-10-20", "from_time": "18:00", "to_time": "19:30"}
+    paths = []
+    for _ in range(5):
+        session = ProfileSession("sample", dict(tags))
+        session.duration = 0.01
+        paths.append(session.save())
+    assert len(set(paths)) == 5
+    assert len([n for n in os.listdir(tmp_path) if n.endswith(".json")]) == 5
@@ -0,0 +1,48 @@
+# tests/test_search_params.py
+
+import pytest
+
+import app as app_module
+import padel_logic
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+@pytest.mark.parametrize("query", [
+    "date=foo&date_end=bar",
+    "date=2026-1-5",
+    "date=2026-02-30",
+    "date=2026-10-20&date_end=2026-13-01",
+    "date=2026-10-20&from_time=ab:cd",
+    "date=2026-10-20&to_time=25:00",
+])
+def test_api_search_rejects_invalid_params(client, query):
+    resp = client.get("/api/search?" + query)
+    assert resp.status_code == 400
+    assert resp.get_json()["errors"]
+
+
+def test_form_rejects_invalid_range_with_form_error(client):
+    resp = client.post("/", data={"date": "foo", "date_end": "bar"})
+    assert resp.status_code == 400
+    assert "Date invalide" in resp.get_data(as_text=True)
+
+
+def test_search_functions_refuse_invalid_params_before_any_fetch(monkeypatch):
+    def no_fetch(*args):
+        raise AssertionError("fetch appelé malgré des paramètres invalides")
+
+    monkeypatch.setattr(padel_logic, "fetch_doinsport_day", no_fetch)
+    with pytest.raises(padel_logic.InvalidSearch):
+        padel_logic.search_all("2026-1-5", "18:00", "19:30", [90])
+    with pytest.raises(padel_logic.InvalidSearch):
+        padel_logic.search_range("2026-10-20", "bar", "18:00", "19:30", [90])
+    with pytest.raises(padel_logic.InvalidSearch):
+        next(padel_logic.iter_search("2026-10-20", "ab:cd", "19:30", [90]))
+
+
+def test_valid_params_have_no_errors():
+    assert padel_logic.search_param_errors("2026-10-20", "18:00", "19:30:00", "") == []
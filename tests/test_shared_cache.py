@@ -0,0 +1,38 @@
+# tests/test_shared_cache.py
+
+import os
+
+import pytest
+
+import padel_shared_cache
+from padel_shared_cache import _open_shared_cache
+
+
+@pytest.mark.parametrize("setting", ["off", "OFF", "0", ""])
+def test_disabled(monkeypatch, setting):
+    monkeypatch.setattr(padel_shared_cache, "SHARED_CACHE_SETTING", setting)
+    assert _open_shared_cache() is None
+
+
+def test_default_is_off():
+    # tests/conftest.py ne fait qu'un setdefault : sans variable, "off" aussi
+    assert padel_shared_cache.SHARED_CACHE_SETTING == os.environ.get("PADEL_SHARED_CACHE", "off")
+    assert not padel_shared_cache.SHARED_CACHE_DEFAULT_PATH.startswith("/tmp")
+
+
+@pytest.mark.parametrize("setting", ["1", "on"])
+def test_enabled_uses_the_app_directory(tmp_path, monkeypatch, setting):
+    path = tmp_path / "cache" / "padel.sqlite3"
+    monkeypatch.setattr(padel_shared_cache, "SHARED_CACHE_SETTING", setting)
+    monkeypatch.setattr(padel_shared_cache, "SHARED_CACHE_DEFAULT_PATH", str(path))
+    cache = _open_shared_cache()
+    assert cache.path == str(path)
+    assert (path.parent.stat().st_mode & 0o777) == 0o700
+    cache.set("k", {"v": 1})
+    assert cache.get_entry("k")[0] == {"v": 1}
+
+
+def test_explicit_path(tmp_path, monkeypatch):
+    path = tmp_path / "ailleurs.sqlite3"
+    monkeypatch.setattr(padel_shared_cache, "SHARED_CACHE_SETTING", str(path))
+    assert _open_shared_cache().path == str(path)
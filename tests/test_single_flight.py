@@ -0,0 +1,79 @@
+# tests/test_single_flight.py
+
+import threading
+import time
+
+import pytest
+
+from padel_cache import SingleFlight
+from padel_http import SearchDeadlineExceeded
+
+
+def run_with_follower(flight, leader_fn, follower_fn):
+    """Lance le meneur, attend qu'il soit en vol, puis un suivant sur la même clé."""
+    started, release = threading.Event(), threading.Event()
+    outcome = {}
+
+    def leader():
+        def fn():
+            started.set()
+            release.wait(2)
+            return leader_fn()
+        try:
+            outcome["leader"] = flight.do("k", fn)
+        except Exception as e:
+            outcome["leader"] = e
+
+    def follower():
+        try:
+            outcome["follower"] = flight.do("k", follower_fn)
+        except Exception as e:
+            outcome["follower"] = e
+
+    t1 = threading.Thread(target=leader)
+    t1.start()
+    started.wait(2)
+    t2 = threading.Thread(target=follower)
+    t2.start()
+    while flight.stats()["saved"] == 0:
+        time.sleep(0.001)
+    release.set()
+    t1.join(2)
+    t2.join(2)
+    return outcome
+
+
+def fail(error):
+    def fn():
+        raise error
+    return fn
+
+
+def test_follower_shares_the_leader_result():
+    flight = SingleFlight(unshared=(SearchDeadlineExceeded,))
+    outcome = run_with_follower(flight, lambda: "payload", lambda: "autre")
+    assert outcome == {"leader": "payload", "follower": "payload"}
+    assert flight.stats() == {"calls": 1, "saved": 1, "inflight": 0}
+
+
+def test_follower_retries_after_leader_deadline():
+    flight = SingleFlight(unshared=(SearchDeadlineExceeded,))
+    outcome = run_with_follower(flight, fail(SearchDeadlineExceeded("budget")), lambda: "payload")
+    assert isinstance(outcome["leader"], SearchDeadlineExceeded)
+    assert outcome["follower"] == "payload"
+    assert flight.stats() == {"calls": 2, "saved": 0, "inflight": 0}
+
+
+def test_provider_errors_are_shared():
+    flight = SingleFlight(unshared=(SearchDeadlineExceeded,))
+    error = ConnectionError("refused")
+    outcome = run_with_follower(flight, fail(error), lambda: "payload")
+    assert outcome == {"leader": error, "follower": error}
+    assert flight.stats()["calls"] == 1
+
+
+def test_leader_error_is_raised():
+    flight = SingleFlight(unshared=(SearchDeadlineExceeded,))
+    with pytest.raises(SearchDeadlineExceeded):
+        flight.do("k", fail(SearchDeadlineExceeded("budget")))
+    assert flight.stats()["inflight"] == 0
@@ -0,0 +1,17 @@
+# tests/test_static.py
+
+import app as app_module
+
+
+def test_fingerprinted_css_is_cached_for_a_year():
+    client = app_module.app.test_client()
+    resp = client.get(f"/static/app.css?v={app_module.CSS_VERSION}")
+    assert resp.status_code == 200
+    assert "immutable" in resp.headers["Cache-Control"]
+
+
+def test_unversioned_css_is_revalidated():
+    client = app_module.app.test_client()
+    resp = client.get("/static/app.css")
+    assert resp.status_code == 200
+    assert "max-age=31536000" not in resp.headers.get("Cache-Control", "")
@@ -0,0 +1,90 @@
+# tests/test_stream.py
+
+import re
+import threading
+import time
+
+import pytest
+from markupsafe import escape
+
+import padel_logic
+from fixtures import rpadel_day
+from padel_cache import upstream_flights
+
+FORM = {"date": "2026-10-20", "from_time": "17:00", "to_time": "22:00", "durations": "60,90", "mode": "window"}
+ITEM_RE = re.compile(r'<div class="stream-item" style="order: (\d+);">')
+
+RPADEL_ORDER = len(padel_logic.DOINSPORT_CLUBS)
+PADELSHOT_ORDER = RPADEL_ORDER + 1
+
+
+@pytest.fixture
+def slow_rpadel(stub_providers):
+    """R Padel répond après `delay` secondes (relâché en fin de test)."""
+    release = threading.Event()
+    delay = {"s": 0.3}
+
+    def fetch(date_iso):
+        release.wait(delay["s"])
+        return rpadel_day()
+
+    stub_providers.setattr(padel_logic, "fetch_rpadel_day", fetch)
+    yield delay
+    release.set()
+    # le fetch abandonné finit avant que stub_providers vide les caches
+    end = time.monotonic() + 2
+    while upstream_flights.stats()["inflight"] and time.monotonic() < end:
+        time.sleep(0.01)
+
+
+def stream_items(client):
+    """[(order, html du bloc)] dans l'ordre où les morceaux sont arrivés."""
+    resp = client.post("/", data=FORM)
+    assert resp.status_code == 200 and resp.is_streamed
+    body = b"".join(resp.response).decode("utf-8")
+    assert body.rstrip().endswith("</html>")
+    starts = list(ITEM_RE.finditer(body))
+    return [(int(m.group(1)), body[m.end():starts[i + 1].start() if i + 1 < len(starts) else len(body)])
+            for i, m in enumerate(starts)]
+
+
+def test_stream_sends_the_slow_provider_last(client, slow_rpadel):
+    items = stream_items(client)
+    orders = [order for order, _ in items]
+    assert orders[-1] == RPADEL_ORDER
+    assert sorted(orders) == list(range(PADELSHOT_ORDER + 1))
+    # `order` (flexbox) remet R Padel entre Doinsport et Padelshot
+    by_order = dict(items)
+    assert "R Padel Arena" in by_order[RPADEL_ORDER]
+    assert "Padelshot" in by_order[PADELSHOT_ORDER]
+
+
+def test_late_provider_is_pending_after_the_budget(client, slow_rpadel, monkeypatch):
+    slow_rpadel["s"] = 2.0
+    monkeypatch.setattr(padel_logic, "SEARCH_BUDGET_S", 0.3)
+
+    start = time.monotonic()
+    items = stream_items(client)
+    assert time.monotonic() - start < 1.5
+
+    pending = [(order, html) for order, html in items if order >= 1000]
+    assert [order for order, _ in pending] == [1000 + RPADEL_ORDER]
+    assert "R Padel Arena" in pending[0][1]
+    assert str(escape(padel_logic.PENDING_MESSAGE)) in pending[0][1]
+
+
+def test_iter_search_yields_by_completion_with_display_order(slow_rpadel):
+    events = list(padel_logic.iter_search("2026-10-20", "17:00", "22:00", [60, 90], "window", budget_s=2.0))
+    assert [e["key"] for e in events][-1] == "rpadel"
+    assert {e["order"]: e["key"] for e in events} == {
+        **{i: "doinsport" for i in range(RPADEL_ORDER)}, RPADEL_ORDER: "rpadel", PADELSHOT_ORDER: "padelshot"}
+    assert not any(e["pending"] or e["error"] for e in events)
+
+
+def test_iter_search_marks_late_providers_pending(slow_rpadel):
+    slow_rpadel["s"] = 2.0
+    events = list(padel_logic.iter_search("2026-10-20", "17:00", "22:00", [60, 90], "window", budget_s=0.3))
+    late = [e for e in events if e["pending"]]
+    assert [(e["order"], e["key"]) for e in late] == [(RPADEL_ORDER, "rpadel")]
+    assert late[0]["result"] is None
+    assert late[0]["error"] == f"R Padel Arena: {padel_logic.PENDING_MESSAGE}"
@@ -0,0 +1,106 @@
+# tests/test_swr.py
+
+import threading
+import time
+
+import pytest
+import requests
+
+from padel_breaker import CircuitOpenError
+from padel_cache import (PROVIDER_CACHE_LAST_GOOD_MAX, PROVIDER_CACHE_STALE_MAX, PROVIDER_CACHE_TTL, cached_swr,
+                         provider_cache)
+
+KEY = ("doinsport:index", "club", "2026-10-20")
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    provider_cache.clear()
+    yield
+    provider_cache.clear()
+
+
+def cached(age, value="ancien"):
+    provider_cache.set(KEY, value, age)
+
+
+def loader(value="nouveau", error=None, release=None):
+    """load_fn qui compte ses appels ; bloque sur `release` s'il est donné."""
+    calls = []
+
+    def load():
+        calls.append(threading.current_thread().name)
+        if release is not None:
+            release.wait(2)
+        if error is not None:
+            raise error
+        return value, 0.0
+
+    return load, calls
+
+
+def wait_for(predicate, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "délai dépassé"
+        time.sleep(0.005)
+
+
+def test_fresh_value_is_served_without_loading():
+    cached(age=PROVIDER_CACHE_TTL / 2)
+    load, calls = loader()
+    value, age = cached_swr(*KEY, load)
+    assert value == "ancien" and age <= PROVIDER_CACHE_TTL
+    assert calls == []
+
+
+def test_stale_value_is_served_at_once_with_one_background_refresh():
+    cached(age=PROVIDER_CACHE_TTL + 10)
+    release = threading.Event()
+    load, calls = loader(release=release)
+
+    start = time.monotonic()
+    for _ in range(5):
+        value, age = cached_swr(*KEY, load)
+        assert value == "ancien" and age > PROVIDER_CACHE_TTL
+    assert time.monotonic() - start < 0.5
+
+    wait_for(lambda: calls)
+    assert len(calls) == 1
+    assert calls[0].startswith("padel-refresh")
+
+    release.set()
+    wait_for(lambda: provider_cache.get_entry(KEY)[0] == "nouveau")
+    assert cached_swr(*KEY, load)[0] == "nouveau"
+    assert len(calls) == 1
+
+
+def test_too_old_value_blocks_on_the_provider():
+    cached(age=PROVIDER_CACHE_STALE_MAX + 10)
+    load, calls = loader()
+    value, age = cached_swr(*KEY, load)
+    assert (value, age) == ("nouveau", 0.0)
+    assert calls == [threading.current_thread().name]
+    assert provider_cache.get_entry(KEY)[0] == "nouveau"
+
+
+@pytest.mark.parametrize("error", [
+    requests.ConnectionError("refused"),
+    CircuitOpenError("service indisponible (circuit ouvert après 3 échecs)"),
+])
+def test_last_good_value_is_served_when_the_provider_fails(error):
+    cached(age=PROVIDER_CACHE_STALE_MAX + 10)
+    load, calls = loader(error=error)
+    value, age = cached_swr(*KEY, load)
+    assert value == "ancien" and age > PROVIDER_CACHE_STALE_MAX
+    assert len(calls) == 1
+
+
+def test_failure_without_last_good_value_is_raised():
+    load, _ = loader(error=requests.ConnectionError("refused"))
+    with pytest.raises(requests.ConnectionError):
+        cached_swr(*KEY, load)
+
+    cached(age=PROVIDER_CACHE_LAST_GOOD_MAX + 10)
+    with pytest.raises(requests.ConnectionError):
+        cached_swr(*KEY, load)